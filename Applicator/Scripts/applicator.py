@@ -5,6 +5,29 @@
 # Verision 1.2
 #
 # History:
+# 1.3: A cast manifest as the Mapping File applies one capture to several actors (each with its own mapping and action) in one pass
+# 1.3: Applies run in chunks with a progress monitor and can be cancelled, rolling back or keeping the keys written (On Cancel)
+# 1.3: Added Preview (every Nth frame, optionally the selected items only, on a temporary action) and Promote to the full bake
+# 1.3: Capture In and Out apply a section of a take (timecodes or frames), read through an index of the capture file
+# 1.3: The rotation axes of each item are baked together as one track and keyed in the item's rotation order
+# 1.3: Each distinct curve is evaluated (and scaled and reduced) once per apply and shared by every target that uses it
+# 1.3: Re-applying only re-keys the channels whose inputs changed, and clears channels no longer mapped
+# 1.3: Face Cap TXT takes can be applied, the capture format is read from the file (the Capture App setting is gone)
+# 1.3: Each apply writes a JSON report of its stage times and counters next to the scene, with an optional cProfile dump
+# 1.3: Added Live mode: drive the target from the Live Link Face stream and record the take (applicator_live.py)
+# 1.3: Added Detect Neutral, to find the neutral in the capture itself
+# 1.3: Neutrals are worked out as a mean, median or trimmed mean and can be saved as named profiles
+# 1.3: Parsed capture and neutral files are cached (applicator_core.cache)
+# 1.3: Added batch apply of a folder or manifest of takes, baked across worker processes
+# 1.3: Split into applicator_core (no Modo dependency) and the Modo adapter, added curve file baking
+# 1.3: Mapped targets are resolved in one pass over the scene, unmatched targets are reported
+# 1.3: Mapping file is compiled into indexed lookups, malformed rows are reported
+# 1.3: Capture frames are resampled by timecode to any scene frame rate
+# 1.3: Added optional key reduction (Tolerance column)
+# 1.3: Keys are written per channel in bulk through the envelope API
+# 1.3: Smooth accepts a filter name and width (mean, gauss, savgol, oneeuro)
+# 1.3: Curves are evaluated as whole arrays before keying
+# 1.3: Capture files are parsed once into a columnar NumPy store
 # 1.2: Tested with Modo 15.0v1
 # 1.2: Added support for both Python 2.7 and 3.7
 # 1.1: Added logic to apply data to User Channels (to support RMC3)
@@ -33,380 +56,84 @@
 # 
 # © Copyright 2020 All Rights Reserved: Chameleon-Workshop.com 
 #######################################################################
-import csv
+import cProfile
 import lx
-import math
 import modo
 import os.path
+import sys
+
+#make the kit's Scripts folder importable
+scripts_path = lx.eval('query platformservice alias ? {kit_Applicator:Scripts}')
+if scripts_path not in sys.path:
+	sys.path.append(scripts_path)
+
+try:
+	import numpy
+except ImportError:
+	numpy = None
+else:
+	from applicator_core import CAPTURE_VALUE_WIDTH, DATA_ITEM_NAMES, DATA_MORPH_NAMES, get_capture_format
+	from applicator_core import NEUTRAL_MEAN, NEUTRAL_STATISTIC_LABELS
+	from applicator_core import APPLICATOR_VERSION, ApplyManifest, ApplyReport, get_file_hash, get_input_hash, get_profile_path, get_report_path, get_target_key
+	from applicator_core import get_capture_index, is_blank_position, load_capture_range
+	from applicator_core import CANCEL_ROLL_BACK, ApplyCancelled, ApplyProgress
+	from applicator_core import CurveCache, is_cast_manifest, list_cast_targets
+	from applicator_core import CaptureCache, CurveEvaluator, DecimatedCurves, KeyframeSink, bake_takes, get_capture_timeline, get_face_neutral, get_maps, is_batch_manifest, list_batch_takes, list_csv_data, list_neutral_profiles, load_curve_file
+	from applicator_modo import MODE_ACTOR, MODE_ITEM, ModoKeyframeBackend, apply_bindings, plan_incremental_apply, resolve_bindings
+	from applicator_modo import ModoMonitor, PreviewBake, get_item_bindings, get_preview_bake, get_scene_channel, set_preview_bake
 
 #Declare CONSTANTS (so to speak)
-CAPTURE_FILE_TYPE = 'capture_file_type'
 CAPTURE_FILE_PATH = 'capture_file_path'
 NEUTRAL_FILE_PATH = 'neutral_file_path'
+NEUTRAL_PROFILE = 'neutral_profile'
+NEUTRAL_STATISTIC = 'neutral_statistic'
+NEUTRAL_AUTO = 'neutral_auto'
 MAPPING_FILE_PATH= 'mapping_file_path'
 ACTOR_NAME = 'actor_name'
 ACTION_NAME = 'action_name'
 START_FRAME = 'start_frame'
 SKIP_FRAMES = 'skip_frames'
+CAPTURE_IN = 'capture_in'
+CAPTURE_OUT = 'capture_out'
 FILE_TYPE_CAPTURE ='Capture File'
 FILE_TYPE_NEUTRAL ='Neutral File'
 FILE_TYPE_MAPPING ='Mapping File'
-MODE_ACTOR = 'Actor Mode'
-MODE_ITEM = 'Item Mode'
+FILE_EXTENSION_CURVE = '.npz'
+FILE_EXTENSIONS_CAPTURE = ('.csv', '.txt')
 BLEND_TARGET_TYPE = 'blend_target_type'
-BLEND_TARGET_MORPH = 'Morph'
-BLEND_TARGET_CHANNEL = 'Channel'
-
-#######################################################################
-# Gets the frames as list of dictionary items
-#######################################################################
-def list_csv_data(capture_path):
-	result = []
-	with open(capture_path) as csv_file:
-		csv_reader = csv.DictReader(csv_file, delimiter=',')
-		for row in csv_reader:
-			result.append(row)
-	return result
-
-#######################################################################
-# Determines which capture frames are applied to scene based on the scenes frame rate
-# This function return a list of booleans representing which capture frames to apply
-#######################################################################
-def list_apply_capture_frames_to(fps, capture_frame_count):
-	result = []
-	apply_pattern = []
-
-	#set the apply pattern
-	if fps == 24.0:
-		#YnYnYnnnYnYnnnYnYnYn|YnYnYnnnYnYnnnYnYnYn|YnYnYnnnYnYnnnYnYnYn|...
-		apply_pattern = [True, False, True, False, True, False, False, False, True, False, True, False, False, False, True, False, True, False, True, False]	
-	elif fps == 25.0:		
-		#YnYnYnYnYnnn|YnYnYnYnYnnn|YnYnYnYnYnnn|....
-		apply_pattern = [True, False, True, False, True, False, True, False, True, False, False, False]
-	elif fps == 29.97:
-		#Yn
-		apply_pattern = [True, False]
-	elif fps == 30.0:
-		#Yn|Yn|Yn|...
-		apply_pattern = [True, False]
-	elif fps == 48.0:
-		#YYYnYYnYYY|YYYnYYnYYY|YYYnYYnYYY|...
-		apply_pattern = [True, True, True, False, True, True, False, True, True, True]	
-	elif fps == 50.0:
-		#YYYYYn|YYYYYn|YYYYYn|...
-		apply_pattern = [True, True, True, True, True, False]
-	else: #60
-		#Y|Y|Y|...
-		apply_pattern = [True]
-
-	#string together to make the apply_capture_frames list to cover the length of the capture frames
-	while len(result) <= capture_frame_count:
-		result.extend(apply_pattern)
-	
-	#return the results
-	return result
-
-#######################################################################
-# gets the face zero data 
-# ARKit picks up the captured face's neautral weights differently
-# so this is used to offset thoes charcteristics and give a more natral result
-# the zero value is calulated by vareraging the middle thrid of frame values
-# if no zero face frames are provide, then it will default to 0
-#######################################################################
-def get_face_neutral_from_frames(data_morph_names, face_neutral_frames):
-	result = { data_morph_name : 0.0 for data_morph_name in data_morph_names }
-	morph_tally = { data_morph_name : 0.0 for data_morph_name in data_morph_names }
-	
-	#calculate if we have data
-	if face_neutral_frames != None:		
-		#get the middle third
-		frame_count = len(face_neutral_frames)
-		frame_start = int(frame_count / 3)
-		frame_end = int(frame_start) * 2		
-		
-		#tally up the rows
-		for x in range(frame_start, frame_end):
-			face_neutral_frame = face_neutral_frames[x]
-			for data_morph_name in data_morph_names:
-				morph_value = float(face_neutral_frame[data_morph_name])
-				if morph_value > 1:
-					morph_value = 1
-				elif morph_value < 0:
-					morph_value = 0	
-				morph_tally[data_morph_name] += morph_value
-		
-		#divde by number of frames in the range (i.e. frame_start)
-		for data_morph_name in data_morph_names:
-			result[data_morph_name] = round(morph_tally[data_morph_name] / frame_start, 10)
-		
-	return result
-	
-#######################################################################
-# Transforms the mapping data into the map file
-#######################################################################
-def get_maps(data_morph_names, data_item_names, mapping_data, blend_target_type):
-	morph_result = []
-	item_result = []
-	channel_result = []
-	
-	#If not mapping file provided, create mapping data that will just pass the data through as is
-	if mapping_data == None:
-		#add the BlendShapes
-		for data_morph_name in data_morph_names:
-			mapping_row = {'Type':'BlendShape', 'Name': data_morph_name, 'Target':data_morph_name, 'Enabled':'Y', 'Multiplier':'1', 'ValueShift':'0', 'Smooth':'N'}
-			morph_result.append(mapping_row)
-
-		#add the items
-		for data_item_name in data_item_names:
-			target_name = data_item_name.replace('Yaw', '').replace('Pitch', '').replace('Roll', '')
-			axis = data_item_name.replace('Head','').replace('LeftEye','').replace('RightEye','').replace('Yaw', 'Y').replace('Pitch', 'X').replace('Roll', 'Z')														
-			mapping_row = {'Type':'Item', 'Name': data_item_name, 'Target':target_name, 'Axis':axis, 'Enabled':'Y', 'Multiplier':'1', 'ValueShift':'0', 'Smooth':'N'}
-			item_result.append(mapping_row)
-
-	else:
-		#add the BlendShapes
-		blend_shapes = [mapping for mapping in mapping_data if mapping['Type'] == 'BlendShape']
-		for blend_shape in blend_shapes:
-			if blend_shape['Target'] != '':
-				if blend_target_type == BLEND_TARGET_MORPH:
-					#we can target the same item to multiple targets morphs
-					targets =  blend_shape['Target'].split('|')
-					for target in targets:
-						mapping_row = {'Type':'BlendShape', 'Name': blend_shape['Name'], 'Target':target, 'Enabled':blend_shape['Enabled'], 'Multiplier':blend_shape['Multiplier'], 'ValueShift':blend_shape['ValueShift'], 'Smooth':blend_shape['Smooth']}
-						morph_result.append(mapping_row)
-				elif blend_target_type == BLEND_TARGET_CHANNEL:
-					targets =  blend_shape['Target'].split('|')
-					for target in targets:
-						channel_parts = target.split('.')
-						if len(channel_parts) == 2: #got to make sure it is in the format <item>.<channel>
-							channel_row = {'Type':'BlendShape', 'Name': blend_shape['Name'], 'TargetItem':channel_parts[0], 'TargetChannel':channel_parts[1], 'Enabled':blend_shape['Enabled'], 'Multiplier':blend_shape['Multiplier'], 'ValueShift':blend_shape['ValueShift'], 'Smooth':blend_shape['Smooth']}
-							channel_result.append(channel_row)
-		#add the items
-		item_list = [mapping for mapping in mapping_data if mapping['Type'] == 'Item']	
-		for item_row in item_list:
-			item_name = item_row['Target']
-			if len(item_name) > 0:
-				item_row['Axis'] = item_name[-1:].upper()
-				item_row['Target'] = item_name[:len(item_name)-2]
-				item_result.append(item_row)
-
-	return morph_result, item_result, channel_result
-
-#######################################################################
-# Apply capture values to the target channel
-#######################################################################
-def apply_channel(item, channel_name, capture_frames, capture_morph_name, strength_multiplier, value_shift, smooth, face_neutral, apply_capture_frames_to, start_frame, skip_frames, action_name):
-	#print(item.type + ': ' + capture_morph_name + ' > ' + item.name)
-	frame_to_time = lx.service.Value().FrameToTime
-	current_frame_no = start_frame
-	channel = item.channel(channel_name)
-	
-	#loop the capture frames and apply the morph strength
-	capture_frames_count = len(capture_frames)
-	if capture_frames_count > skip_frames:
-		for y in range(skip_frames, capture_frames_count):
-			capture_frame = capture_frames[y]
-
-			#first test if we are applying this frame??
-			if apply_capture_frames_to[y] == True:
-				#get the strength (smooth style)
-				if smooth == True:
-					#smoothing applies a rolling 7 frame averages using the current frame, previous 3 frames, and next 3 frames
-					range_count = 0
-					range_sum = 0.0
-					for x in range(y-3, y+4):
-						if x >=0 and x < capture_frames_count:
-							range_frame = capture_frames[x]
-							range_count += 1
-							range_sum += float(range_frame[capture_morph_name][:6])
-					strength = range_sum / range_count
-				else:
-					strength = float(capture_frame[capture_morph_name][:6])
-				
-				#make sure the strength is within the range 0-1			
-				if strength > 1:
-					strength = 1
-				elif strength < 0:
-					strength = 0
-				
-				#apply the value shift
-				strength = strength + value_shift
-				
-				#apply the miltiplier
-				strength = strength * strength_multiplier
-					
-				#apply the Neutralizer
-				#(Actual - Neutral)/(1-Neutral)
-				strength = (strength - face_neutral[capture_morph_name]) / (1 - face_neutral[capture_morph_name])
-				strength = round(strength ,4)
-		
-				#if the target type is an angle, covert value to be based between 0° & 45°
-				if channel.evalType == 'angle':
-					strength =  strength * 0.785398163397
-
-				#set the keyframe
-				if action_name != None:
-					channel.set(strength, time=frame_to_time(current_frame_no), key=True, action=action_name)
-				else:
-					channel.set(strength, time=frame_to_time(current_frame_no), key=True)
-				
-				#incrament the frame counter
-				current_frame_no += 1
-
-#######################################################################
-# Apply capture rotations to the item
-#######################################################################
-def apply_rotation(item, capture_frames, capture_morph_name, target_axis, strength_multiplier, value_shift, smooth, face_neutral, apply_capture_frames_to, start_frame, skip_frames, action_name):
-	#print(item.type + ': ' + capture_morph_name + ' > ' + item.name + '.' + target_axis)
-	frame_to_time = lx.service.Value().FrameToTime
-	current_frame_no = start_frame
-
-	#loop the capture frames and apply the morph strength
-	capture_frames_count = len(capture_frames)
-	if capture_frames_count > skip_frames:
-		for y in range(skip_frames, capture_frames_count):
-			capture_frame = capture_frames[y]
-
-			#first test if we are applying this frame??
-			if apply_capture_frames_to[y] == True:			
-				#get the strength (smooth style)
-				if smooth == True:
-					#smoothing applies a rolling 7 frame averages using the current frame, previous 3 frames, and next 3 frames
-					range_count = 0
-					range_sum = 0.0
-					for x in range(y-3, y+4):
-						if x >=0 and x < capture_frames_count:
-							range_frame = capture_frames[x]
-							range_count += 1
-							range_sum += float(range_frame[capture_morph_name][:6])
-					strength = range_sum / range_count
-				else:
-					strength = float(capture_frame[capture_morph_name][:6])
-				
-				#make sure the strength is within the range 0-1			
-				if strength > 1:
-					strength = 1
-				elif strength < -1:
-					strength = -1
-				
-				#apply the value shift
-				strength = strength + value_shift
-				
-				#convert to degrees
-				strength = strength * 90
-				
-				#apply the miltiplier
-				strength = strength * strength_multiplier
-								
-				#Note: No Neutralizer for rotations
-				#set the rotation
-				if target_axis.upper() == 'X':
-					if action_name != None:
-						item.rotation.x.set(math.radians(strength), time=frame_to_time(current_frame_no), key=True, action=action_name)
-					else:
-						item.rotation.x.set(math.radians(strength), time=frame_to_time(current_frame_no), key=True)
-				elif target_axis.upper() == 'Y':
-					if action_name != None:
-						item.rotation.y.set(math.radians(strength), time=frame_to_time(current_frame_no), key=True, action=action_name)
-					else:
-						item.rotation.y.set(math.radians(strength), time=frame_to_time(current_frame_no), key=True)
-				elif target_axis.upper() == 'Z':
-					if action_name != None:
-						item.rotation.z.set(math.radians(strength), time=frame_to_time(current_frame_no), key=True, action=action_name)
-					else:
-						item.rotation.z.set(math.radians(strength), time=frame_to_time(current_frame_no), key=True)
-				
-				#incrament the frame counter
-				current_frame_no += 1
-
-#######################################################################
-# Process the items
-#######################################################################
-def process_item(item, capture_frames, face_neutral, morph_map, item_map, channel_map, apply_capture_frames, start_frame, skip_frames, action_name, mode, blend_target_type):
-	#############################
-	# Morph Mapping logic
-	#############################
-	#get the morph_map items that match the item's name (that are enabled)
-	if blend_target_type == BLEND_TARGET_MORPH:
-		morph_maps = [mapping for mapping in morph_map if mapping['Target'].upper() == item.name.upper() and mapping['Enabled'].upper() == 'Y']
-		if item.type == 'morphDeform' and len(morph_maps) > 0:
-			#get the Multiplier
-			strength_multiplier = float(morph_maps[0]['Multiplier'])
-			value_shift = float(morph_maps[0]['ValueShift'])
-			smooth = (morph_maps[0]['Smooth'].upper() == 'Y')
-			
-			#apply the morph maps
-			#we only apply one item to the morph as multiple will just override previous runs
-			apply_channel(item, 'strength', capture_frames, morph_maps[0]['Name'], strength_multiplier, value_shift, smooth, face_neutral, apply_capture_frames_to, start_frame, skip_frames, action_name)
-
-	#############################
-	# Channel Mapping logic
-	#############################
-	elif blend_target_type == BLEND_TARGET_CHANNEL:
-		channel_maps = [channel for channel in channel_map if channel['TargetItem'].upper() == item.name.upper() and channel['Enabled'].upper() == 'Y']
-		if len(channel_maps) > 0:
-			for map in channel_maps:
-				if map['TargetChannel'] in item.channelNames:
-					strength_multiplier = float(map['Multiplier'])
-					value_shift = float(map['ValueShift'])
-					smooth = (map['Smooth'].upper() == 'Y')
-					#print(item.name + ' \ ' + map['TargetChannel'] + ' \ ' + map['Name'])
-					apply_channel(item, map['TargetChannel'], capture_frames, map['Name'], strength_multiplier, value_shift, smooth, face_neutral, apply_capture_frames_to, start_frame, skip_frames, action_name)
-
-	#############################
-	# Item Mapping logic
-	#############################
-	#get the item_map items that match the item's name (that are enabled)
-	item_maps = [mapping for mapping in item_map if mapping['Target'] == item.name and mapping['Enabled'].upper() == 'Y']
-	if (item.type == 'locator' or item.type == 'mesh') and len(item_maps) > 0:	
-		for map in item_maps:
-			#get the Multiplier
-			strength_multiplier = float(map['Multiplier'])
-			value_shift = float(map['ValueShift'])
-			smooth = (map['Smooth'].upper() == 'Y')
-			
-			#apply the rotations
-			#we only apply one item to the morph as multiple will just override previous runs
-			apply_rotation(item, capture_frames, map['Name'], map['Axis'], strength_multiplier, value_shift, smooth, face_neutral, apply_capture_frames_to, start_frame, skip_frames, action_name)
-
-	#############################
-	# process the morph deformers for meshes 
-	# (Item Mode Only)
-	#############################
-	if item.type == 'mesh' and mode == MODE_ITEM:
-		for deformer in item.deformers:
-			if deformer.type == 'morphDeform':
-				process_item(deformer, capture_frames, face_neutral, morph_map, item_map, channel_map, apply_capture_frames, start_frame, skip_frames, action_name, mode, blend_target_type)
-
-	#############################
-	# process the child items 
-	# (Item Mode Only)
-	#############################
-	if mode == MODE_ITEM:
-		child_items = item.children()
-		for child_item in child_items:
-			process_item(child_item, capture_frames, face_neutral, morph_map, item_map, channel_map, apply_capture_frames, start_frame, skip_frames, action_name, mode, blend_target_type)
+APPLY_REPORT = 'apply_report'
+APPLY_PROFILE = 'apply_profile'
+INCREMENTAL_APPLY = 'incremental_apply'
+PREVIEW_STEP = 'preview_step'
+PREVIEW_SELECTED = 'preview_selected'
+CANCEL_ACTION = 'cancel_action'
+#the script argument (Apply, Preview and Promote buttons)
+APPLY_MODE_FULL = 'apply'
+APPLY_MODE_PREVIEW = 'preview'
+APPLY_MODE_PROMOTE = 'promote'
+PREVIEW_ACTION_NAME = 'Applicator Preview'
+PREVIOUS_PREVIEW_ACTION_NAME = 'Applicator Preview (Previous)'
 
 #######################################################################
 # Validate the file
 #######################################################################
-def validate_file(file_path, file_type, file_required, capture_file_type):
+def validate_file(file_path, file_type, file_required):
 	result = True
 	validation_message = ''
 
-	#set file extension type
-	if capture_file_type == 'Live Link Face':
-		required_file_extension = '.csv'
+	#set file extension type (capture and neutral files can be Live Link Face or Face Cap, the format is read from the file)
+	if file_type == FILE_TYPE_MAPPING:
+		required_file_extensions = ('.csv',)
 		required_file_extension_name = 'CSV'
-	elif capture_file_type == 'Face Cap':
-		required_file_extension = '.txt'
-		required_file_extension_name = 'TXT'
-	file_extension = file_path[-4:].lower()
+	else:
+		required_file_extensions = FILE_EXTENSIONS_CAPTURE
+		required_file_extension_name = 'Live Link Face CSV or Face Cap TXT'
 
 	#fiel path clean-up
 	if file_path == None:
 		file_path = ''
 	file_path = file_path.strip()
+	file_extension = file_path[-4:].lower()
 
 	#file path can be blank if not required	
 	if file_path == '' and file_required == False:
@@ -419,8 +146,8 @@ def validate_file(file_path, file_type, file_required, capture_file_type):
 	elif os.path.exists(file_path) == False:
 		validation_message = 'Specified ' + file_type + ' does not exist:' + '\n' + file_path
 		result = False
-	#make sure the file ahs the right extension
-	elif file_extension != required_file_extension:
+	#make sure the file ahs the right extension (capture files can also be baked curve files or batch folders)
+	elif file_extension not in required_file_extensions and not (file_type == FILE_TYPE_CAPTURE and (file_extension == FILE_EXTENSION_CURVE or os.path.isdir(file_path))):
 		validation_message = 'Incorrect ' + file_type + ' type. Please select a ' + required_file_extension_name + ' file.'
 		result = False
 
@@ -430,18 +157,116 @@ def validate_file(file_path, file_type, file_required, capture_file_type):
 
 	return result
 
+#######################################################################
+# Validate the format of a capture or neutral file (read from its header)
+#######################################################################
+def validate_capture_format(file_path, file_type):
+	if get_capture_format(file_path) != None:
+		return True
+	modo.dialogs.alert('Validation error', 'Specified ' + file_type + ' is not a Live Link Face or Face Cap capture:' + '\n' + file_path, dtype='warning')
+	return False
+
+#######################################################################
+# Validate the capture range (Capture In and Out)
+# A range is applied from a single capture file (capture_index is its
+# index, None for a batch or curve file) and must hold frames of the take
+#######################################################################
+def validate_capture_range(capture_index, capture_in, capture_out):
+	result = True
+	validation_message = ''
+
+	if is_blank_position(capture_in) and is_blank_position(capture_out):
+		result = True
+	elif capture_index == None:
+		validation_message = 'Capture In and Out only apply to a single capture file.' + '\n' + 'Please clear them to apply a batch or curve file.'
+		result = False
+	else:
+		try:
+			capture_index.get_frame_range(capture_in, capture_out)
+		except ValueError as error:
+			validation_message = ('Capture In and Out must be timecodes (HH:MM:SS:FF) or frame numbers of the take.' + '\n'
+				+ str(error))
+			result = False
+
+	if result == False:
+		modo.dialogs.alert('Validation error', validation_message, dtype='warning')
+
+	return result
+
+#######################################################################
+# Validate the apply mode
+# A preview keys one take to one target (a batch or cast is applied in full)
+#######################################################################
+def validate_apply_mode(apply_mode, is_batch, is_cast):
+	result = True
+	validation_message = ''
+
+	if apply_mode == APPLY_MODE_PREVIEW and is_batch == True:
+		validation_message = 'Batches cannot be previewed.' + '\n' + 'Please preview a single capture file, or Apply the batch.'
+		result = False
+	elif apply_mode == APPLY_MODE_PREVIEW and is_cast == True:
+		validation_message = 'Casts cannot be previewed.' + '\n' + 'Please preview one actor with its own mapping file, or Apply the cast.'
+		result = False
+
+	if result == False:
+		modo.dialogs.alert('Validation error', validation_message, dtype='warning')
+
+	return result
+
 #######################################################################
 # Validate the scene's frame rate
 #######################################################################
-def validate_fps(supported_fps, fps):
+def validate_fps(fps):
 	result = True
 
-	if fps not in supported_fps:
+	if fps <= 0:
 		result = False
 
 	if result == False:
-		modo.dialogs.alert('Unsupported frame rate', 'Unsupported Frame Rate' + '\n' 
-			+ 'Supported Frame Rates: ' + ', '.join(str(x) for x in supported_fps), dtype='warning')
+		modo.dialogs.alert('Unsupported frame rate', 'Unsupported Frame Rate: ' + str(fps), dtype='warning')
+
+	return result
+
+#######################################################################
+# Validate the neutral profile
+# A named profile is used when there is no neutral file and no neutral detection
+# (otherwise the neutral is saved as the profile)
+#######################################################################
+def validate_neutral_profile(neutral_profile, neutral_file_path, neutral_auto):
+	result = True
+
+	if neutral_profile.strip() != '' and neutral_file_path.strip() == '' and neutral_auto == False:
+		profile_names = list_neutral_profiles()
+		if neutral_profile.strip() not in profile_names:
+			result = False
+			modo.dialogs.alert('Validation error', 'Neutral profile "' + neutral_profile.strip() + '" not found.' + '\n'
+				+ 'Available Neutral Profiles: ' + '; '.join(profile_names), dtype='warning')
+
+	return result
+
+#######################################################################
+# Validate the baked curve file against the scene
+#######################################################################
+def validate_curve_file(baked_curves, fps):
+	result = True
+
+	if baked_curves != None and abs(baked_curves.settings['fps'] - fps) > 0.0001:
+		result = False
+		modo.dialogs.alert('Curve file frame rate', 'The curve file was baked at ' + str(baked_curves.settings['fps']) + ' fps.' + '\n'
+			+ 'The scene is at ' + str(fps) + ' fps. Please bake the capture at the scene frame rate.', dtype='warning')
+
+	return result
+
+#######################################################################
+# Validate that NumPy is available to Modo's Python
+#######################################################################
+def validate_numpy():
+	result = True
+
+	if numpy == None:
+		result = False
+		modo.dialogs.alert('NumPy not found', 'Applicator Kit requires NumPy.' + '\n'
+			+ 'Please install NumPy for the Python used by Modo.', dtype='warning')
 
 	return result
 
@@ -462,35 +287,204 @@ def validate_action(item, action_name):
 				break
 	return result
 
+#######################################################################
+# Validate the batch
+# Every take is keyed to its own action, so the target must be an actor
+#######################################################################
+def validate_batch(item, takes):
+	result = True
+	validation_message = ''
+	missing_files = [take.capture_path for take in takes if os.path.isfile(take.capture_path) == False]
+
+	if item.type != 'actor':
+		validation_message = 'Batches are applied to the actions of an actor.' + '\n' + 'Please select or enter an Actor.'
+		result = False
+	elif len(takes) == 0:
+		validation_message = 'No Live Link Face takes found in the batch.'
+		result = False
+	elif len(missing_files) > 0:
+		validation_message = ('Batch capture files do not exist:' + '\n'
+			+ '\n'.join(missing_files[:10]) + ('\n...' if len(missing_files) > 10 else ''))
+		result = False
+
+	if result == False:
+		modo.dialogs.alert('Validation error', validation_message, dtype='warning')
+
+	return result
+
+#######################################################################
+# Gets the hash of the settings a take is keyed with (the files by path,
+# size and modified time), so Promote can tell if they are still those
+# of the preview
+#######################################################################
+def get_settings_hash(params, fps, action_name):
+	file_signatures = []
+	for file_path in (params[CAPTURE_FILE_PATH].strip(), params[NEUTRAL_FILE_PATH].strip(), params[MAPPING_FILE_PATH].strip()):
+		if os.path.isfile(file_path):
+			source_stat = os.stat(file_path)
+			file_signatures.append([os.path.abspath(file_path), source_stat.st_size, source_stat.st_mtime])
+		else:
+			file_signatures.append(file_path)
+	return get_input_hash(file_signatures, params[NEUTRAL_PROFILE].strip(), params[NEUTRAL_STATISTIC], params[NEUTRAL_AUTO], params[START_FRAME], params[SKIP_FRAMES],
+		params[CAPTURE_IN].strip(), params[CAPTURE_OUT].strip(), fps, params[BLEND_TARGET_TYPE], action_name)
+
+#######################################################################
+# Find the actor's action (None if it has none of that name)
+#######################################################################
+def find_action(actor, action_name):
+	for child_item in actor.items:
+		if child_item.type == 'actionclip' and action_name.strip().lower() == child_item.name.lower():
+			return child_item
+	return None
+
+#######################################################################
+# Validate the cast
+# One capture file is applied to every actor, each with its own mapping file
+#######################################################################
+def validate_cast(cast_targets, is_batch, is_curve_file):
+	result = True
+	validation_message = ''
+	missing_files = [target.mapping_path for target in cast_targets if target.mapping_path == '' or os.path.isfile(target.mapping_path) == False]
+
+	if is_batch == True or is_curve_file == True:
+		validation_message = 'A cast applies a single capture file.' + '\n' + 'Please select a Live Link Face or Face Cap take (not a batch or curve file).'
+		result = False
+	elif len(missing_files) > 0:
+		validation_message = ('Cast mapping files do not exist:' + '\n'
+			+ '\n'.join(path if path != '' else '(blank)' for path in missing_files[:10]) + ('\n...' if len(missing_files) > 10 else ''))
+		result = False
+
+	if result == False:
+		modo.dialogs.alert('Validation error', validation_message, dtype='warning')
+
+	return result
+
+#######################################################################
+# Get the actor's action, adding it if new
+#######################################################################
+def get_action(scene, actor, action_name):
+	action = find_action(actor, action_name)
+	if action != None:
+		return action
+
+	action = scene.addItem('actionclip', name=action_name)
+	actor.addItems(action)
+	return action
+
+#######################################################################
+# Remove the actor's preview action (and its keys), if it has one
+#######################################################################
+def remove_preview_action(scene, actor):
+	action = find_action(actor, PREVIEW_ACTION_NAME)
+	if action != None:
+		scene.removeItems(action)
+		return True
+	return False
+
+#######################################################################
+# Set the actor's preview action aside (renamed) while a new preview is keyed,
+# so it can be put back if the new one is rolled back
+# Returns the action (None if the actor has no preview)
+#######################################################################
+def set_aside_preview_action(scene, actor):
+	#left by an apply that did not finish
+	previous_action = find_action(actor, PREVIOUS_PREVIEW_ACTION_NAME)
+	if previous_action != None:
+		scene.removeItems(previous_action)
+
+	action = find_action(actor, PREVIEW_ACTION_NAME)
+	if action != None:
+		action.name = PREVIOUS_PREVIEW_ACTION_NAME
+	return action
+
+#######################################################################
+# Save the apply report (and the cProfile dump when profiling)
+# Returns the line for the completion message
+#######################################################################
+def save_apply_report(apply_report, profiler, scene_path, save_report):
+	if profiler != None:
+		profiler.disable()
+	if save_report == False and profiler == None:
+		return ''
+
+	report_path = get_report_path(scene_path)
+	try:
+		apply_report.save(report_path)
+		if profiler != None:
+			profiler.dump_stats(get_profile_path(report_path))
+	except (IOError, OSError) as error:
+		return '  - Report not saved: ' + str(error) + '\n'
+	return '  - Report: ' + report_path + '\n'
+
+#######################################################################
+# Save the apply manifest (it is only there to skip work, so a manifest
+# that cannot be written is not an error)
+#######################################################################
+def save_apply_manifest(manifest):
+	if manifest == None:
+		return
+	try:
+		manifest.save()
+	except (IOError, OSError):
+		pass
+
 #######################################################################
 # Main Execution
 #######################################################################
 scene = modo.Scene()
 mesh_item = None
-supported_fps = (60.0, 50.0, 48.0, 30.0, 29.97, 25.0, 24.0)
-data_morph_names = ['eyeBlinkRight', 'eyeLookDownRight', 'eyeLookInRight', 'eyeLookOutRight', 'eyeLookUpRight', 'eyeSquintRight', 'eyeWideRight', 'eyeBlinkLeft', 'eyeLookDownLeft', 'eyeLookInLeft', 'eyeLookOutLeft', 'eyeLookUpLeft', 'eyeSquintLeft', 'eyeWideLeft', 'jawForward', 'jawRight', 'jawLeft', 'jawOpen', 'mouthClose', 'mouthFunnel', 'mouthPucker', 'mouthRight', 'mouthLeft', 'mouthSmileRight', 'mouthSmileLeft', 'mouthFrownRight', 'mouthFrownLeft', 'mouthDimpleRight', 'mouthDimpleLeft', 'mouthStretchRight', 'mouthStretchLeft', 'mouthRollLower', 'mouthRollUpper', 'mouthShrugLower', 'mouthShrugUpper', 'mouthPressRight', 'mouthPressLeft', 'mouthLowerDownRight', 'mouthLowerDownLeft', 'mouthUpperUpRight', 'mouthUpperUpLeft', 'browDownRight', 'browDownLeft', 'browInnerUp', 'browOuterUpRight', 'browOuterUpLeft', 'cheekPuff', 'cheekSquintRight', 'cheekSquintLeft', 'noseSneerRight', 'noseSneerLeft', 'tongueOut']
-data_item_names = ['HeadYaw', 'HeadPitch', 'HeadRoll', 'LeftEyeYaw', 'LeftEyePitch', 'LeftEyeRoll', 'RightEyeYaw', 'RightEyePitch', 'RightEyeRoll']
 root_item = None
 
 #############################
 # get the parameter values
 #############################
 params = {}
-params[CAPTURE_FILE_TYPE] = lx.eval('user.value applicator.capture_file_type ?')
 params[CAPTURE_FILE_PATH] = lx.eval('user.value applicator.capture_file_path ?')
 params[NEUTRAL_FILE_PATH] = lx.eval('user.value applicator.neutral_file_path ?')
+params[NEUTRAL_PROFILE] = lx.eval('user.value applicator.neutral_profile ?')
+params[NEUTRAL_STATISTIC] = lx.eval('user.value applicator.neutral_statistic ?')
+params[NEUTRAL_AUTO] = bool(lx.eval('user.value applicator.neutral_auto ?'))
 params[MAPPING_FILE_PATH] = lx.eval('user.value applicator.mapping_file_path ?')
 params[ACTOR_NAME] = lx.eval('user.value applicator.actor_name ?')
 params[ACTION_NAME] = lx.eval('user.value applicator.action_name ?')
 params[START_FRAME] = lx.eval('user.value applicator.start_frame ?')
 params[SKIP_FRAMES] = lx.eval('user.value applicator.skip_frames ?')
+params[CAPTURE_IN] = lx.eval('user.value applicator.capture_in ?')
+params[CAPTURE_OUT] = lx.eval('user.value applicator.capture_out ?')
 params[BLEND_TARGET_TYPE] = lx.eval('user.value applicator.blend_target_type ?')
+params[APPLY_REPORT] = bool(lx.eval('user.value applicator.apply_report ?'))
+params[APPLY_PROFILE] = bool(lx.eval('user.value applicator.apply_profile ?'))
+params[INCREMENTAL_APPLY] = bool(lx.eval('user.value applicator.incremental_apply ?'))
+params[PREVIEW_STEP] = lx.eval('user.value applicator.preview_step ?')
+params[PREVIEW_SELECTED] = bool(lx.eval('user.value applicator.preview_selected ?'))
+params[CANCEL_ACTION] = lx.eval('user.value applicator.cancel_action ?')
+
+#Apply (no argument), Preview or Promote
+script_args = lx.args()
+apply_mode = script_args[0].strip().lower() if len(script_args) > 0 else APPLY_MODE_FULL
 
 #############################
 # Get the root item
 #############################
+#a cast manifest (as the Mapping File) applies the capture to each of its actors (the first is the root item)
+is_cast = False
+cast_targets = []
+cast_actors = []
+if numpy != None and is_cast_manifest(params[MAPPING_FILE_PATH].strip()):
+	is_cast = True
+	cast_targets = list_cast_targets(params[MAPPING_FILE_PATH].strip())
+	actors = dict((actor.name.lower(), actor) for actor in scene.getGroups(gtype='actor'))
+	missing_actors = [target.actor_name for target in cast_targets if target.actor_name.lower() not in actors]
+	if len(cast_targets) == 0:
+		modo.dialogs.alert('Bad Cast', 'No actors in the cast manifest:' + '\n' + params[MAPPING_FILE_PATH], dtype='error')
+	elif len(missing_actors) > 0:
+		modo.dialogs.alert('Bad Actor', 'Cast actors not in scene: ' + '; '.join(missing_actors) + '\n'
+			+ 'Available Actors: ' + '; '.join(actor.name for actor in actors.values()), dtype='error')
+	else:
+		cast_actors = [actors[target.actor_name.lower()] for target in cast_targets]
+		root_item = cast_actors[0]
 #get the actor (if specified)
-if len(params[ACTOR_NAME].strip()) > 0:
+elif len(params[ACTOR_NAME].strip()) > 0:
 	has_actor = False
 	actor_names = []
 	for actor in scene.getGroups(gtype='actor'):
@@ -524,14 +518,51 @@ if root_item != None:
 				break
 
 	#validate the input
-	valid_fps = validate_fps(supported_fps, scene.fps)
-	valid_capture_file = validate_file(params[CAPTURE_FILE_PATH], FILE_TYPE_CAPTURE, True, params[CAPTURE_FILE_TYPE])
-	valid_mapping_file = validate_file(params[MAPPING_FILE_PATH], FILE_TYPE_MAPPING, True, params[CAPTURE_FILE_TYPE])
-	valid_neutral_file = validate_file(params[NEUTRAL_FILE_PATH], FILE_TYPE_NEUTRAL, False, params[CAPTURE_FILE_TYPE])
-	valid_action = validate_action(root_item, params[ACTION_NAME])
+	valid_numpy = validate_numpy()
+	valid_fps = validate_fps(scene.fps)
+	valid_capture_file = validate_file(params[CAPTURE_FILE_PATH], FILE_TYPE_CAPTURE, True)
+	is_curve_file = params[CAPTURE_FILE_PATH].strip().lower().endswith(FILE_EXTENSION_CURVE)
+	valid_mapping_file = validate_file(params[MAPPING_FILE_PATH], FILE_TYPE_MAPPING, not is_curve_file)
+	valid_neutral_file = validate_file(params[NEUTRAL_FILE_PATH], FILE_TYPE_NEUTRAL, False)
+	if valid_numpy == True and valid_neutral_file == True and params[NEUTRAL_FILE_PATH].strip() != '':
+		valid_neutral_file = validate_capture_format(params[NEUTRAL_FILE_PATH].strip(), FILE_TYPE_NEUTRAL)
+	if valid_numpy == True and valid_neutral_file == True:
+		valid_neutral_file = validate_neutral_profile(params[NEUTRAL_PROFILE], params[NEUTRAL_FILE_PATH], params[NEUTRAL_AUTO])
+
+	#a folder or manifest of takes is applied as a batch
+	is_batch = False
+	takes = []
+	if valid_numpy == True and valid_capture_file == True and is_curve_file == False:
+		capture_path = params[CAPTURE_FILE_PATH].strip()
+		if os.path.isdir(capture_path) or is_batch_manifest(capture_path):
+			is_batch = True
+			takes = list_batch_takes(capture_path, [params[NEUTRAL_FILE_PATH], params[MAPPING_FILE_PATH]])
+		else:
+			valid_capture_file = validate_capture_format(capture_path, FILE_TYPE_CAPTURE)
+
+	#a section of the take is read through the capture file's index (built the first time)
+	capture_index = None
+	valid_capture_range = True
+	if valid_numpy == True and valid_capture_file == True:
+		if is_batch == False and is_curve_file == False and (is_blank_position(params[CAPTURE_IN]) == False or is_blank_position(params[CAPTURE_OUT]) == False):
+			capture_index = get_capture_index(params[CAPTURE_FILE_PATH].strip())
+		valid_capture_range = validate_capture_range(capture_index, params[CAPTURE_IN], params[CAPTURE_OUT])
+
+	valid_apply_mode = validate_apply_mode(apply_mode, is_batch, is_cast)
+	if is_cast == True:
+		#the actions of the cast are listed in the confirmation
+		valid_action = validate_cast(cast_targets, is_batch, is_curve_file)
+	elif is_batch == True:
+		valid_action = validate_batch(root_item, takes)
+	elif apply_mode == APPLY_MODE_PREVIEW:
+		#the preview has an action of its own
+		valid_action = True
+	else:
+		valid_action = validate_action(root_item, params[ACTION_NAME])
 
 	#validation passed
-	if valid_fps == True and valid_capture_file == True and valid_neutral_file == True and valid_mapping_file == True and valid_action == True:
+	if (valid_numpy == True and valid_fps == True and valid_capture_file == True and valid_capture_range == True and valid_neutral_file == True and valid_mapping_file == True
+		and valid_apply_mode == True and valid_action == True):
 		#final confirm
 		if params[NEUTRAL_FILE_PATH] == None:
 			neutral_caption = '(none)'
@@ -543,98 +574,440 @@ if root_item != None:
 		else:
 			mapping_file_caption = params[MAPPING_FILE_PATH]
 		
+		#the stage times and counters of the run
+		apply_report = ApplyReport({'scene': scene.filename, 'target': root_item.name, 'target_type': root_item.type, 'fps': scene.fps,
+			'capture_file': params[CAPTURE_FILE_PATH], 'mapping_file': params[MAPPING_FILE_PATH], 'neutral_file': params[NEUTRAL_FILE_PATH],
+			'neutral_profile': params[NEUTRAL_PROFILE], 'neutral_statistic': params[NEUTRAL_STATISTIC], 'neutral_auto': params[NEUTRAL_AUTO],
+			'blend_target_type': params[BLEND_TARGET_TYPE], 'start_frame': params[START_FRAME], 'skip_frames': params[SKIP_FRAMES],
+			'capture_in': params[CAPTURE_IN], 'capture_out': params[CAPTURE_OUT], 'batch': is_batch, 'cast': [target.actor_name for target in cast_targets], 'apply_mode': apply_mode,
+			'preview_step': params[PREVIEW_STEP] if apply_mode == APPLY_MODE_PREVIEW else None})
+
+		#the neutral file is worked out with the chosen statistic
+		neutral_statistic = NEUTRAL_STATISTIC_LABELS.get(params[NEUTRAL_STATISTIC], NEUTRAL_MEAN)
+		neutral_profile = params[NEUTRAL_PROFILE].strip()
+
+		#curve files are baked with their mapping (see applicator_core)
+		baked_curves = None
+		if is_curve_file == True:
+			with apply_report.stage('parse'):
+				baked_curves = load_curve_file(params[CAPTURE_FILE_PATH].strip())
+			mapping = baked_curves.mapping
+			params[BLEND_TARGET_TYPE] = baked_curves.settings['blend_target_type']
+			params[SKIP_FRAMES] = baked_curves.settings['skip_frames']
+			params[MAPPING_FILE_PATH] = '(baked) ' + str(baked_curves.settings['mapping_file'])
+			params[NEUTRAL_FILE_PATH] = '(baked) ' + str(baked_curves.settings['neutral_file'])
+			params[NEUTRAL_STATISTIC] = '(baked) ' + str(baked_curves.settings.get('neutral_statistic'))
+			neutral_profile = '(baked) ' + str(baked_curves.settings.get('neutral_profile'))
+			params[NEUTRAL_AUTO] = baked_curves.settings.get('neutral_auto', False)
+		else:
+			with apply_report.stage('mapping'):
+				if is_cast == True:
+					#each actor of the cast has its own mapping
+					cast_mappings = [get_maps(DATA_MORPH_NAMES, DATA_ITEM_NAMES, list_csv_data(target.mapping_path), params[BLEND_TARGET_TYPE]) for target in cast_targets]
+				else:
+					#get the mapping data
+					mapping_data = None
+					if params[MAPPING_FILE_PATH] != '':
+						mapping_data = list_csv_data(params[MAPPING_FILE_PATH])
+
+					#compile the mapping (malformed rows are reported before applying)
+					mapping = get_maps(DATA_MORPH_NAMES, DATA_ITEM_NAMES, mapping_data, params[BLEND_TARGET_TYPE])
+		if is_cast == True:
+			mapping_row_count = sum(cast_mapping.row_count() for cast_mapping in cast_mappings)
+			mapping_errors = [os.path.basename(target.mapping_path) + ': ' + error for target, cast_mapping in zip(cast_targets, cast_mappings) for error in cast_mapping.errors]
+		else:
+			mapping_row_count = mapping.row_count()
+			mapping_errors = mapping.errors
+		apply_report.set_count('mapping_rows', mapping_row_count)
+		apply_report.set_count('mapping_errors', len(mapping_errors))
+		mapping_message = ''
+		if len(mapping_errors) > 0:
+			mapping_message = ('  - Skipped mapping rows: ' + str(len(mapping_errors)) + '\n'
+				+ ''.join('      ' + error + '\n' for error in mapping_errors[:10])
+				+ ('      ...' + '\n' if len(mapping_errors) > 10 else ''))
+
 		action_message = ''
-		if root_item.type == 'actor':
+		#each actor of a cast is keyed to its own action (a blank one is the Action)
+		cast_action_names = [target.action_name if target.action_name != '' else params[ACTION_NAME].strip() for target in cast_targets]
+		if is_cast == True:
+			target_type = 'Cast'
+			action_message = ('  - Actors: ' + str(len(cast_targets)) + '\n'
+				+ ''.join('      ' + actor.name + ' (' + os.path.basename(target.mapping_path) + ') > ' + (action_name if action_name != '' else '(active action)')
+					+ (' (add to existing)' if action_name != '' and find_action(actor, action_name) != None else '') + '\n'
+					for target, actor, action_name in list(zip(cast_targets, cast_actors, cast_action_names))[:20])
+				+ ('      ...' + '\n' if len(cast_targets) > 20 else ''))
+		elif is_batch == True:
+			target_type = 'Actor'
+			action_names = [child_item.name.lower() for child_item in root_item.items if child_item.type == 'actionclip']
+			action_message = ('  - Takes: ' + str(len(takes)) + '\n'
+				+ ''.join('      ' + os.path.basename(take.capture_path) + ' > ' + take.action_name
+					+ (' (add to existing)' if take.action_name.lower() in action_names else '') + '\n' for take in takes[:20])
+				+ ('      ...' + '\n' if len(takes) > 20 else ''))
+		elif root_item.type == 'actor':
 			target_type = 'Actor'
-			action_message = '  - Action: ' + params[ACTION_NAME] + '\n'
+			action_message = '  - Action: ' + (params[ACTION_NAME] if apply_mode != APPLY_MODE_PREVIEW else PREVIEW_ACTION_NAME + ' (temporary)') + '\n'
 		else:
 			target_type = 'Item'
 
+		preview_message = ''
+		if apply_mode == APPLY_MODE_PREVIEW:
+			preview_message = ('  - Preview: every ' + str(params[PREVIEW_STEP]) + ' frames'
+				+ (', selected items only' if params[PREVIEW_SELECTED] == True else '') + '\n')
+
+		capture_range_message = ''
+		if capture_index != None:
+			capture_start, capture_stop = capture_index.get_frame_range(params[CAPTURE_IN], params[CAPTURE_OUT])
+			capture_range_message = ('  - Capture range: ' + (params[CAPTURE_IN].strip() if is_blank_position(params[CAPTURE_IN]) == False else 'start')
+				+ ' to ' + (params[CAPTURE_OUT].strip() if is_blank_position(params[CAPTURE_OUT]) == False else 'end')
+				+ ' (capture frames ' + str(capture_start) + '-' + str(capture_stop - 1) + ')' + '\n')
+
 		confirmation_message = ('Selected values: ' + '\n'
-			+ '  - Target ' + target_type + ': ' + root_item.name + '\n'
+			+ '  - Target ' + target_type + ': ' + (root_item.name if is_cast == False else os.path.basename(params[MAPPING_FILE_PATH])) + '\n'
 			+ action_message
 			+ '  - Target type: ' + root_item.type + '\n'
 			+ '  - BlendShape target type: ' + str(params[BLEND_TARGET_TYPE]) + '\n'
 			+ '  - Start frame: ' + str(params[START_FRAME]) + '\n'
 			+ '  - Skip capture frames: ' + str(params[SKIP_FRAMES]) + '\n'
+			+ capture_range_message
+			+ preview_message
 			+ '  - Capture file: ' + params[CAPTURE_FILE_PATH] + '\n'
 			+ '  - Mapping file: ' + params[MAPPING_FILE_PATH] + '\n'
-			+ '  - Neutral file: ' + params[NEUTRAL_FILE_PATH] + '\n \n'
+			+ '  - Neutral file: ' + params[NEUTRAL_FILE_PATH] + '\n'
+			+ '  - Neutral profile: ' + (neutral_profile if neutral_profile != '' else '(none)') + '\n'
+			+ '  - Neutral statistic: ' + str(params[NEUTRAL_STATISTIC]) + '\n'
+			+ '  - Detect neutral: ' + ('Yes' if params[NEUTRAL_AUTO] == True else 'No') + '\n'
+			+ '  - Mapped targets: ' + str(mapping_row_count) + '\n'
+			+ mapping_message + ' \n'
 			+ 'Apply data?'
 		)
 			
-		if(modo.dialogs.yesNo('Apply Data?', confirmation_message) == 'yes'):
+		#promote applies the settings of the preview that was confirmed (no confirmation),
+		#without a preview of the target or once the settings have changed it is confirmed as an apply
+		settings_hash = get_settings_hash(params, scene.fps, params[ACTION_NAME].strip() if root_item.type == 'actor' else '')
+		promote_message = ''
+		if apply_mode == APPLY_MODE_PROMOTE:
+			preview_bake = get_preview_bake(root_item.id)
+			if preview_bake == None:
+				promote_message = 'There is no preview of ' + root_item.name + ' to promote.'
+			elif preview_bake.settings_hash != settings_hash:
+				promote_message = 'The settings have changed since ' + root_item.name + ' was previewed.'
+			if promote_message != '':
+				confirmation_message = promote_message + '\n' + 'Apply the full take with these settings?' + '\n \n' + confirmation_message
+		if validate_curve_file(baked_curves, scene.fps) == True and ((apply_mode == APPLY_MODE_PROMOTE and promote_message == '') or modo.dialogs.yesNo('Apply Data?', confirmation_message) == 'yes'):
 			#############################
 			# Apply the data to the scene
 			#############################
+			profiler = None
+			if params[APPLY_PROFILE] == True:
+				profiler = cProfile.Profile()
+				profiler.enable()
 			
-			#get the capture frames from the file
-			capture_frames = list_csv_data(params[CAPTURE_FILE_PATH])
-
-			#get face neutral frames
-			face_neutral_frames = None
-			if params[NEUTRAL_FILE_PATH] != '':
-				face_neutral_frames = list_csv_data(params[NEUTRAL_FILE_PATH])
-			
-			#get the face zero values
-			face_neutral = get_face_neutral_from_frames(data_morph_names, face_neutral_frames)
+			frame_to_time = lx.service.Value().FrameToTime
+
+			#the channels keyed by the last apply of the saved scene (unsaved scenes have no manifest)
+			manifest = ApplyManifest.load(scene.filename) if scene.filename else None
+			if is_batch == True:
+				#the takes are baked across worker processes and keyed as they come back (in take order)
+				with apply_report.stage('resolve'):
+					bindings, unmatched_targets = resolve_bindings(root_item, mapping, MODE_ACTOR, params[BLEND_TARGET_TYPE], apply_report)
+				capture_cache = CaptureCache()
+				if params[NEUTRAL_FILE_PATH] != '' and neutral_profile != '':
+					#save the neutral profile once for the whole batch
+					with apply_report.stage('neutral'):
+						get_face_neutral(DATA_MORPH_NAMES, params[NEUTRAL_FILE_PATH], neutral_profile, neutral_statistic, capture_cache=capture_cache)
+				take_messages = []
+				failed_messages = []
+				key_count = 0
+				#each take is evaluated and written in chunks (a unit per binding each), and can be cancelled between them
+				progress = ApplyProgress(2 * len(bindings) * len(takes), ModoMonitor())
+				#the sink and action (if added) of each take keyed, to roll back
+				take_sinks = []
+				cancelled = False
+				#the batch stage is the whole bake and key loop (key is the keying within it)
+				with apply_report.stage('batch'):
+					#one backend keys every take (its channel reads are kept per action)
+					keyframe_backend = ModoKeyframeBackend(report=apply_report)
+					take_results = bake_takes(takes, params[MAPPING_FILE_PATH], params[NEUTRAL_FILE_PATH], scene.fps, params[SKIP_FRAMES], params[BLEND_TARGET_TYPE],
+						capture_cache=capture_cache, neutral_profile=neutral_profile, neutral_statistic=neutral_statistic, neutral_auto=params[NEUTRAL_AUTO])
+					try:
+						for take, take_curves, error in take_results:
+							if take_curves == None:
+								failed_messages.append('      ' + os.path.basename(take.capture_path) + ': ' + error)
+								progress.advance(2 * len(bindings))
+								continue
+
+							with apply_report.stage('key'):
+								take_curves.set_key_times(params[START_FRAME], frame_to_time)
+								keyframe_sink = KeyframeSink(keyframe_backend, take.action_name, progress=progress, keep_snapshots=params[CANCEL_ACTION] == CANCEL_ROLL_BACK)
+								new_action = None
+								action = find_action(root_item, take.action_name)
+								if action == None:
+									action = new_action = get_action(scene, root_item, take.action_name)
+								take_sinks.append((keyframe_sink, new_action))
+								keyframe_backend.activate_action(root_item, action)
+								apply_bindings(bindings, take_curves, keyframe_sink, apply_report, progress=progress)
+								keyframe_sink.flush()
+
+							key_count += keyframe_sink.key_count
+							apply_report.count('capture_frames', take_curves.frame_count)
+							apply_report.count('channels_keyed', keyframe_sink.channel_count)
+							apply_report.count('keys_written', keyframe_sink.key_count)
+							apply_report.count('keys_dropped', keyframe_sink.dropped_key_count)
+							take_messages.append('      ' + os.path.basename(take.capture_path) + ' > ' + take.action_name + ': '
+								+ str(take_curves.frame_count) + ' frames, ' + str(keyframe_sink.key_count) + ' keys')
+						progress.finish()
+					except ApplyCancelled:
+						cancelled = True
+					finally:
+						#stops the workers still baking
+						take_results.close()
+
+				cancel_message = ''
+				if cancelled == True:
+					if params[CANCEL_ACTION] == CANCEL_ROLL_BACK:
+						#the takes keyed go back to how they were (actions added by the batch are removed)
+						for keyframe_sink, action in reversed(take_sinks):
+							if action != None:
+								scene.removeItems(action)
+							else:
+								keyframe_sink.roll_back()
+						take_messages = []
+						key_count = 0
+						cancel_message = 'The batch was cancelled and rolled back, the actions are as they were before the apply'
+					else:
+						cancel_message = ('The batch was cancelled, the keys written are kept (' + str(len(take_messages)) + ' takes keyed in full, '
+							+ str(max(len(take_sinks) - len(take_messages), 0)) + ' partly)')
+				apply_report.set_count('cancelled', 1 if cancelled == True else 0)
+				apply_report.set_count('takes_applied', len(take_messages))
+				apply_report.set_count('takes_failed', len(failed_messages))
+
+				#the batch keys every channel, so the next apply to these actions starts afresh
+				if manifest != None:
+					for take in takes:
+						manifest.forget(get_target_key(root_item.id, take.action_name))
+					save_apply_manifest(manifest)
+				report_message = save_apply_report(apply_report, profiler, scene.filename, params[APPLY_REPORT])
+
+				#alert complete
+				modo.dialogs.alert('Processing cancelled' if cancelled == True else 'Processing complete',
+					(cancel_message if cancelled == True else 'Processing completed. The batch has been applied') + '\n \n'
+					+ '  - Takes applied: ' + str(len(take_messages)) + ' of ' + str(len(takes)) + '\n'
+					+ ''.join(message + '\n' for message in take_messages[:20])
+					+ ('      ...' + '\n' if len(take_messages) > 20 else '')
+					+ '  - Takes failed: ' + str(len(failed_messages)) + '\n'
+					+ ''.join(message + '\n' for message in failed_messages[:10])
+					+ ('      ...' + '\n' if len(failed_messages) > 10 else '')
+					+ '  - Keys written: ' + str(key_count) + '\n'
+					+ report_message
+					+ '  - Unmatched targets: ' + str(len(unmatched_targets))
+					+ ''.join('\n      ' + target for target in unmatched_targets[:10])
+					+ ('\n      ...' if len(unmatched_targets) > 10 else ''), dtype='info' if len(failed_messages) == 0 and cancelled == False else 'warning')
 
-			#get the mapping data
-			mapping_data = None
-			if params[MAPPING_FILE_PATH] != '':
-				mapping_data = list_csv_data(params[MAPPING_FILE_PATH])
-			
-			#get the morph map
-			morph_map, item_map, channel_map = get_maps(data_morph_names, data_item_names, mapping_data, params[BLEND_TARGET_TYPE])
-			
-			#see which frames we are apply the capture data to
-			#these are the frames from the file we are to apply to the scene 
-			apply_capture_frames_to = list_apply_capture_frames_to(scene.fps, len(capture_frames))
-
-			#apply the data
-			if root_item.type == 'actor':
-				action_name = None
-				if params[ACTION_NAME].strip() != '':
-					action = None
-					action_exists = False
-					action_name = params[ACTION_NAME].strip()
-
-					#check if the action exists
-					for child_item in root_item.items:
-						if child_item.type == 'actionclip' and action_name.strip().lower() == child_item.name.lower():
-							action_exists = True
-							action = child_item
-							break
-					
-					#add an action if new
-					#print("action_exists: " + str(action_exists))
-					if action_exists == False:
-						action = scene.addItem('actionclip', name=action_name)
-						root_item.addItems(action)
-
-					#active the action
-					action.active = True
-					lx.eval('select.item {%s} set' % root_item.id)
-					lx.eval('layer.active {%s} type:actr' % action.id)
-
-				#for actors, we loop through it's items collection
-				for actor_item in root_item.items:
-					process_item(actor_item, capture_frames, face_neutral, morph_map, item_map, channel_map, apply_capture_frames_to, params[START_FRAME], params[SKIP_FRAMES], action_name, MODE_ACTOR, params[BLEND_TARGET_TYPE])
-				
-				#for channel mode, we loop the actors's group channels and apply the data
-				if params[BLEND_TARGET_TYPE] == BLEND_TARGET_CHANNEL:
-					for groupChannel in actor.groupChannels:
-						channel_maps = [channel for channel in channel_map if channel['TargetItem'].upper() == groupChannel.item.name.upper() and channel['TargetChannel'].upper() == groupChannel.name.upper() and channel['Enabled'].upper() == 'Y']
-						if len(channel_maps) > 0:
-							for map in channel_maps:
-								strength_multiplier = float(map['Multiplier'])
-								value_shift = float(map['ValueShift'])
-								smooth = (map['Smooth'].upper() == 'Y')
-								apply_channel(groupChannel.item, groupChannel.name, capture_frames, map['Name'], strength_multiplier, value_shift, smooth, face_neutral, apply_capture_frames_to, params[START_FRAME], params[SKIP_FRAMES], action_name)
 			else:
-				#process the selected item
-				process_item(root_item, capture_frames, face_neutral, morph_map, item_map, channel_map, apply_capture_frames_to, params[START_FRAME], params[SKIP_FRAMES], None, MODE_ITEM, params[BLEND_TARGET_TYPE])
+				neutral_message = ''
+				if baked_curves != None:
+					#the curves are ready to key
+					baked_curves.set_key_times(params[START_FRAME], frame_to_time)
+					curve_source = baked_curves
+					neutral_values = None
+					#the curve file has been read in full already
+					capture_hash = get_file_hash(params[CAPTURE_FILE_PATH].strip())
+				else:
+					#get the capture frames from the file (parsed files are cached between runs)
+					capture_cache = CaptureCache()
+					with apply_report.stage('parse'):
+						if capture_index != None:
+							#only the frames of the capture range are read
+							capture_frames = load_capture_range(params[CAPTURE_FILE_PATH].strip(), params[CAPTURE_IN], params[CAPTURE_OUT], CAPTURE_VALUE_WIDTH,
+								params[SKIP_FRAMES], capture_index)
+						else:
+							capture_frames = capture_cache.load(params[CAPTURE_FILE_PATH], CAPTURE_VALUE_WIDTH, params[SKIP_FRAMES])
+					apply_report.set_count('capture_frames', len(capture_frames))
+
+					#get the face zero values (from the neutral file or found in the capture, saved as the neutral profile if named, or from the neutral profile)
+					with apply_report.stage('neutral'):
+						face_neutral = get_face_neutral(DATA_MORPH_NAMES, params[NEUTRAL_FILE_PATH], neutral_profile, neutral_statistic, capture_cache=capture_cache,
+							neutral_auto=params[NEUTRAL_AUTO], capture_frames=capture_frames)
+					apply_report.set_count('capture_cache_hits', capture_cache.hit_count)
+					apply_report.set_count('capture_cache_misses', capture_cache.miss_count)
+					if params[NEUTRAL_FILE_PATH] == '' and params[NEUTRAL_AUTO] == True:
+						neutral_message = '  - Neutral detected at capture frames: ' + str(face_neutral.window[0]) + '-' + str(face_neutral.window[1] - 1) + '\n'
+
+					#see which frames we are apply the capture data to
+					#these are the frames from the file we are to apply to the scene 
+					with apply_report.stage('timeline'):
+						capture_timeline = get_capture_timeline(capture_frames, scene.fps, params[START_FRAME], params[SKIP_FRAMES], frame_to_time)
+					curve_source = CurveEvaluator(capture_frames, face_neutral.values, capture_timeline)
+					neutral_values = face_neutral.values
+					#the content hash kept with the capture's index or cache entry (the file is only hashed again once it changes)
+					if capture_index != None:
+						capture_hash = capture_index.source['hash']
+					else:
+						capture_hash = capture_cache.get_source_hash(params[CAPTURE_FILE_PATH], CAPTURE_VALUE_WIDTH)
+
+				#a preview keys every Nth frame of the curves
+				if apply_mode == APPLY_MODE_PREVIEW:
+					curve_source = DecimatedCurves(curve_source, params[PREVIEW_STEP])
+
+				#keys are collected per channel and written in bulk (in chunks, see KeyframeSink)
+				keyframe_backend = ModoKeyframeBackend(report=apply_report)
+
+				#each target is keyed with its own mapping to its own action (a cast has one per actor)
+				if is_cast == True:
+					apply_targets = list(zip(cast_actors, cast_mappings, cast_action_names))
+				else:
+					apply_targets = [(root_item, mapping, params[ACTION_NAME].strip())]
+
+				#plan the apply of each target
+				target_applies = []
+				unmatched_targets = []
+				#target item id > the preview action a new preview replaces (removed once it is keyed)
+				previous_preview_actions = {}
+				for target_item, target_mapping, target_action_name in apply_targets:
+					keyframe_sink = KeyframeSink(keyframe_backend, keep_snapshots=params[CANCEL_ACTION] == CANCEL_ROLL_BACK)
+
+					new_action = None
+					if target_item.type == 'actor':
+						action_name = None
+						if apply_mode == APPLY_MODE_PREVIEW:
+							#the last preview is replaced
+							previous_preview_actions[target_item.id] = set_aside_preview_action(scene, target_item)
+							action_name = PREVIEW_ACTION_NAME
+						elif target_action_name != '':
+							action_name = target_action_name
+
+						if action_name != None:
+							#active the action (added if new, and removed again if the apply is rolled back)
+							action = find_action(target_item, action_name)
+							if action == None:
+								action = new_action = get_action(scene, target_item, action_name)
+							keyframe_backend.activate_action(target_item, action)
+							keyframe_sink.action_name = action_name
+
+					#find the mapped channels in the scene and apply the data
+					with apply_report.stage('resolve'):
+						if target_item.type == 'actor':
+							bindings, target_unmatched = resolve_bindings(target_item, target_mapping, MODE_ACTOR, params[BLEND_TARGET_TYPE], apply_report)
+						else:
+							bindings, target_unmatched = resolve_bindings(target_item, target_mapping, MODE_ITEM, params[BLEND_TARGET_TYPE], apply_report)
+						if apply_mode == APPLY_MODE_PREVIEW and params[PREVIEW_SELECTED] == True:
+							bindings = get_item_bindings(bindings, scene.selected)
+					unmatched_targets.extend(target_unmatched if is_cast == False else [target_item.name + ': ' + target for target in target_unmatched])
+
+					#only the channels whose inputs changed since the last apply to the target are keyed again,
+					#channels that are no longer mapped are cleared
+					with apply_report.stage('plan'):
+						target_key = get_target_key(target_item.id, keyframe_sink.action_name)
+						input_hash = get_input_hash(APPLICATOR_VERSION, capture_hash, neutral_values,
+							params[START_FRAME], params[SKIP_FRAMES], params[CAPTURE_IN].strip(), params[CAPTURE_OUT].strip(), scene.fps, params[BLEND_TARGET_TYPE])
+						if apply_mode == APPLY_MODE_PREVIEW:
+							#the preview keys every bound channel afresh, with hashes a full apply never matches
+							input_hash = get_input_hash(input_hash, APPLY_MODE_PREVIEW, params[PREVIEW_STEP])
+							incremental_apply = plan_incremental_apply(scene, bindings, input_hash, {}, keyframe_backend, keyframe_sink.action_name, False)
+							if keyframe_sink.action_name == None:
+								keyframe_sink.clear_channels([channel for channel in (get_scene_channel(scene, preview_channel.item_id, preview_channel.channel_name)
+									for preview_channel in incremental_apply.channels.values()) if channel != None])
+						else:
+							incremental_apply = plan_incremental_apply(scene, bindings, input_hash, manifest.channels(target_key) if manifest != None else {},
+								keyframe_backend, keyframe_sink.action_name, params[INCREMENTAL_APPLY])
+							#the keys of the item's last preview go (an actor's go with its preview action)
+							preview_bake = get_preview_bake(target_item.id)
+							if preview_bake != None and preview_bake.action_name == None:
+								keyframe_sink.clear_channels([channel for channel in (get_scene_channel(scene, preview_channel.item_id, preview_channel.channel_name)
+									for preview_channel in preview_bake.channels.values()) if channel != None])
+						keyframe_sink.clear_channels(incremental_apply.clear_channels)
+					target_applies.append((target_item, keyframe_sink, new_action, target_key, incremental_apply))
+
+				#the curves are evaluated and written in chunks (a unit per binding each), and can be cancelled between them
+				#every distinct curve is evaluated once, and shared by all the targets it is mapped to
+				progress = ApplyProgress(2 * sum(len(incremental_apply.bindings) for target_item, keyframe_sink, new_action, target_key, incremental_apply in target_applies), ModoMonitor())
+				curve_cache = CurveCache()
+				cancelled = False
+				try:
+					for target_item, keyframe_sink, new_action, target_key, incremental_apply in target_applies:
+						keyframe_sink.progress = progress
+						with apply_report.stage('evaluate'):
+							apply_bindings(incremental_apply.bindings, curve_source, keyframe_sink, apply_report, curve_cache=curve_cache, progress=progress)
+
+						#write the keys
+						with apply_report.stage('write'):
+							keyframe_sink.flush()
+					progress.finish()
+				except ApplyCancelled:
+					cancelled = True
+
+				cancel_message = ''
+				for target_item, keyframe_sink, new_action, target_key, incremental_apply in target_applies:
+					if cancelled == True and params[CANCEL_ACTION] == CANCEL_ROLL_BACK:
+						#the target goes back to how it was before the apply (as do the manifest and preview)
+						if new_action != None:
+							scene.removeItems(new_action)
+						else:
+							keyframe_sink.roll_back()
+						if previous_preview_actions.get(target_item.id) != None:
+							previous_preview_actions[target_item.id].name = PREVIEW_ACTION_NAME
+						cancel_message = 'The apply was cancelled and rolled back, the ' + ('actors are as they were' if is_cast == True else 'target is as it was') + ' before the apply'
+					elif apply_mode == APPLY_MODE_PREVIEW:
+						if previous_preview_actions.get(target_item.id) != None:
+							scene.removeItems(previous_preview_actions[target_item.id])
+						set_preview_bake(PreviewBake(target_item.id, keyframe_sink.action_name, incremental_apply.channels, params[PREVIEW_STEP], settings_hash))
+						if manifest != None and keyframe_sink.action_name == None:
+							#the next apply to the item re-keys the previewed channels
+							preview_channels = dict(manifest.channels(target_key))
+							preview_channels.update(incremental_apply.channels)
+							manifest.set_channels(target_key, preview_channels)
+					else:
+						#the full apply replaces the preview
+						if target_item.type == 'actor':
+							remove_preview_action(scene, target_item)
+						if get_preview_bake(target_item.id) != None:
+							set_preview_bake(None)
+						if manifest != None:
+							#the channels not keyed in full (if cancelled) are keyed again by the next apply
+							manifest.set_channels(target_key, incremental_apply.channels if cancelled == False else incremental_apply.partial_channels(keyframe_sink.written_channels))
+				if manifest != None and (cancelled == False or params[CANCEL_ACTION] != CANCEL_ROLL_BACK):
+					save_apply_manifest(manifest)
+
+				#the counts of all the targets
+				channel_count = sum(keyframe_sink.channel_count for target_item, keyframe_sink, new_action, target_key, incremental_apply in target_applies)
+				key_count = sum(keyframe_sink.key_count for target_item, keyframe_sink, new_action, target_key, incremental_apply in target_applies)
+				dropped_key_count = sum(keyframe_sink.dropped_key_count for target_item, keyframe_sink, new_action, target_key, incremental_apply in target_applies)
+				key_channel_count = sum(len(incremental_apply.key_channels) for target_item, keyframe_sink, new_action, target_key, incremental_apply in target_applies)
+				unchanged_count = sum(incremental_apply.unchanged_count for target_item, keyframe_sink, new_action, target_key, incremental_apply in target_applies)
+				removed_count = sum(incremental_apply.removed_count for target_item, keyframe_sink, new_action, target_key, incremental_apply in target_applies)
+				if cancelled == True and params[CANCEL_ACTION] != CANCEL_ROLL_BACK:
+					cancel_message = ('The apply was cancelled, the keys written are kept (' + str(channel_count) + ' of '
+						+ str(key_channel_count) + ' channels keyed in full)')
+				apply_report.set_count('cancelled', 1 if cancelled == True else 0)
+				apply_report.set_count('channels_unchanged', unchanged_count)
+				apply_report.set_count('channels_removed', removed_count)
+				apply_report.set_count('channels_keyed', channel_count)
+				apply_report.set_count('keys_written', key_count)
+				apply_report.set_count('keys_dropped', dropped_key_count)
+				report_message = save_apply_report(apply_report, profiler, scene.filename, params[APPLY_REPORT])
+
+				cast_message = ''
+				if is_cast == True:
+					cast_message = ('  - Actors: ' + str(len(target_applies)) + '\n'
+						+ ''.join('      ' + target_item.name + ' > ' + (keyframe_sink.action_name if keyframe_sink.action_name != None else '(active action)')
+							+ ': ' + str(keyframe_sink.channel_count) + ' channels keyed' + '\n'
+							for target_item, keyframe_sink, new_action, target_key, incremental_apply in target_applies[:20])
+						+ ('      ...' + '\n' if len(target_applies) > 20 else '')
+						+ '  - Curves shared between actors: ' + str(curve_cache.hit_count) + '\n')
 			
-			#alert complete
-			modo.dialogs.alert('Processing complete', 'Processing completed. Face capture data has been applied', dtype='info')
-		
\ No newline at end of file
+				#alert complete
+				modo.dialogs.alert('Processing cancelled' if cancelled == True else 'Processing complete',
+					(cancel_message if cancelled == True else 'Processing completed. Face capture data has been applied') + '\n \n'
+					+ cast_message
+					+ '  - Channels keyed: ' + str(channel_count) + '\n'
+					+ '  - Keys written: ' + str(key_count) + '\n'
+					+ '  - Keys dropped: ' + str(dropped_key_count) + '\n'
+					+ ('  - Channels unchanged (not re-keyed): ' + str(unchanged_count) + '\n' if unchanged_count > 0 else '')
+					+ ('  - Channels no longer mapped (keys removed): ' + str(removed_count) + '\n' if removed_count > 0 else '')
+					+ neutral_message
+					+ ('  - Preview: every ' + str(params[PREVIEW_STEP]) + ' frames on to ' + (keyframe_sink.action_name if keyframe_sink.action_name != None else 'the edit layer')
+						+ ', Promote to apply the full take' + '\n' if apply_mode == APPLY_MODE_PREVIEW else '')
+					+ report_message
+					+ '  - Unmatched targets: ' + str(len(unmatched_targets))
+					+ ''.join('\n      ' + target for target in unmatched_targets[:10])
+					+ ('\n      ...' if len(unmatched_targets) > 10 else ''), dtype='info')
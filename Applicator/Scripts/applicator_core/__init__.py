@@ -0,0 +1,25 @@
+# python
+#######################################################################
+# Applicator Kit for Modo: core
+# Capture parsing, neutralizing, mapping, resampling, smoothing and curve
+# evaluation. Pure Python (with NumPy), no Modo dependency: the Modo side
+# lives in applicator_modo.py
+#
+# © Copyright 2020 All Rights Reserved: Chameleon-Workshop.com 
+#######################################################################
+from .bake import BakedCurves, CURVE_FILE_EXTENSION, bake_curves, load_curve_file, save_curve_file
+from .batch import BatchTake, bake_takes, get_python_executable, is_batch_manifest, list_batch_takes
+from .cache import CAPTURE_CACHE_PATH, CaptureCache, get_file_hash
+from .capture import CAPTURE_FORMAT_EXTENSIONS, CAPTURE_FORMAT_FACE_CAP, CAPTURE_FORMAT_LIVE_LINK_FACE, CAPTURE_FPS, CAPTURE_VALUE_WIDTH, DATA_ITEM_NAMES, DATA_MORPH_NAMES, CaptureData, CaptureReader, FaceCapReader, get_capture_format, get_capture_times, get_timecode_seconds, get_timecode_times, load_capture_data, open_capture_reader
+from .cast import CAST_ACTION, CAST_ACTOR, CAST_MAPPING_FILE, CastTarget, is_cast_manifest, list_cast_targets
+from .curves import ANGLE_SCALE, CAPTURE_ROTATION_ORDER, CURVE_CACHE_BYTES, ROTATION_AXES, ROTATION_ORDERS, CurveCache, CurveEvaluator, DecimatedCurves, convert_rotation_order, evaluate_channel_curve, evaluate_rotation_curve, evaluate_rotation_track, get_channel_values, get_decimated_frames, get_rotation_matrices, get_rotation_track, get_rotation_values, reduce_curve, round_values, stack_rotation_track
+from .index import CAPTURE_INDEX_PATH, CaptureIndex, get_capture_index, is_blank_position, load_capture_range
+from .keys import KeyframeSink, get_channel_id
+from .manifest import MANIFEST_PATH, ApplyManifest, ManifestChannel, get_input_hash, get_target_key
+from .mapping import BLEND_TARGET_CHANNEL, BLEND_TARGET_MORPH, CompiledMapping, MappingRow, get_maps, get_tolerance, list_csv_data
+from .neutral import NEUTRAL_AUTO_FRAMES, NEUTRAL_MEAN, NEUTRAL_MEDIAN, NEUTRAL_STATISTIC_LABELS, NEUTRAL_STATISTICS, NEUTRAL_TRIMMED_MEAN, NeutralProfile, find_neutral_window, get_face_neutral, get_face_neutral_from_frames, list_neutral_profiles, load_neutral_profile, save_neutral_profile
+from .progress import CANCEL_KEEP_APPLIED, CANCEL_ROLL_BACK, PROGRESS_STEPS, WRITE_CHUNK_KEYS, ApplyCancelled, ApplyProgress
+from .report import APPLICATOR_VERSION, ApplyReport, get_profile_path, get_report_path
+from .smoothing import get_smooth_spec, smooth_values
+from .stream import LIVE_CAPTURE_NAMES, LIVE_LINK_MAX_LATENCY, LIVE_LINK_NAMES, LIVE_LINK_PORT, FrameRingBuffer, LiveCurveEvaluator, LiveLinkFrame, LiveLinkReceiver, TakeRecorder, decode_live_link_packet, encode_live_link_packet
+from .timeline import CaptureTimeline, get_capture_timeline
@@ -0,0 +1,72 @@
+# python
+#######################################################################
+# Applicator Kit for Modo: command line curve baking
+#
+# Usage (from the Applicator/Scripts folder):
+#   python -m applicator_core <capture.csv> -m <mapping.csv> [-n <neutral.csv>] [--fps 24] [--in 10:00:04:00 --out 10:00:08:00] [-o <curves.npz>]
+#
+# © Copyright 2020 All Rights Reserved: Chameleon-Workshop.com 
+#######################################################################
+import argparse
+import os.path
+import sys
+
+from .bake import CURVE_FILE_EXTENSION, bake_curves, save_curve_file
+from .cache import CaptureCache
+from .capture import CAPTURE_FPS
+from .index import get_capture_index
+from .mapping import BLEND_TARGET_CHANNEL, BLEND_TARGET_MORPH
+from .neutral import NEUTRAL_MEAN, NEUTRAL_STATISTICS
+
+#######################################################################
+# Bakes a capture file into a curve file
+#######################################################################
+def main(argv=None):
+	parser = argparse.ArgumentParser(prog='applicator_core', description='Bake a face capture file into an Applicator Kit curve file.')
+	parser.add_argument('capture_file', help='Live Link Face capture csv')
+	parser.add_argument('-m', '--mapping-file', help='mapping csv (all BlendShapes and Items pass through when not given)')
+	parser.add_argument('-n', '--neutral-file', help='neutral capture csv')
+	parser.add_argument('--neutral-auto', action='store_true', help='find the neutral in the capture itself when there is no neutral file')
+	parser.add_argument('--neutral-profile', help='saved neutral profile to use, or to save the neutral as when -n or --neutral-auto is given')
+	parser.add_argument('--neutral-statistic', choices=NEUTRAL_STATISTICS, default=NEUTRAL_MEAN, help='neutral file statistic (default: %(default)s)')
+	parser.add_argument('--neutral-window', type=int, nargs=2, metavar=('START', 'END'), help='neutral file frames to use (default: the middle third)')
+	parser.add_argument('-o', '--output', help='curve file to write (defaults to the capture file with a ' + CURVE_FILE_EXTENSION + ' extension)')
+	parser.add_argument('--fps', type=float, default=CAPTURE_FPS, help='scene frame rate (default: %(default)s)')
+	parser.add_argument('--skip-frames', type=int, default=0, help='capture frames to skip (default: %(default)s)')
+	parser.add_argument('--in', dest='capture_in', help='first capture frame to bake: a timecode (HH:MM:SS:FF) or a frame number (default: the start of the take)')
+	parser.add_argument('--out', dest='capture_out', help='last capture frame to bake: a timecode (HH:MM:SS:FF) or a frame number (default: the end of the take)')
+	parser.add_argument('--cache-dir', help='capture cache folder (parsed capture and neutral files are cached there)')
+	parser.add_argument('--blend-target-type', choices=(BLEND_TARGET_MORPH, BLEND_TARGET_CHANNEL), default=BLEND_TARGET_MORPH, help='BlendShape target type (default: %(default)s)')
+	args = parser.parse_args(argv)
+
+	if args.fps <= 0:
+		parser.error('--fps must be greater than 0')
+	if args.skip_frames < 0:
+		parser.error('--skip-frames must be 0 or more')
+
+	output = args.output
+	if output == None:
+		output = os.path.splitext(args.capture_file)[0] + CURVE_FILE_EXTENSION
+
+	capture_cache = None
+	if args.cache_dir != None:
+		capture_cache = CaptureCache(args.cache_dir)
+
+	if args.capture_in != None or args.capture_out != None:
+		try:
+			get_capture_index(args.capture_file).get_frame_range(args.capture_in, args.capture_out)
+		except ValueError as error:
+			parser.error(str(error))
+
+	baked_curves = bake_curves(args.capture_file, args.mapping_file, args.neutral_file, args.fps, args.skip_frames, args.blend_target_type, capture_cache,
+		args.neutral_profile, args.neutral_statistic, args.neutral_window, args.neutral_auto, args.capture_in, args.capture_out)
+	for error in baked_curves.mapping.errors:
+		sys.stderr.write('Skipped mapping row: ' + error + '\n')
+	save_curve_file(output, baked_curves)
+
+	sys.stdout.write('Baked ' + str(len(baked_curves.curves)) + ' curves (' + str(baked_curves.mapping.row_count()) + ' mapped targets, '
+		+ str(baked_curves.frame_count) + ' frames at ' + str(args.fps) + ' fps) to ' + output + '\n')
+	return 0
+
+if __name__ == '__main__':
+	sys.exit(main())
@@ -0,0 +1,123 @@
+# python
+#######################################################################
+# Applicator Kit for Modo: curve baking
+# Runs the parse > neutralize > map > resample > smooth > evaluate pipeline
+# without Modo and saves the curves to a curve file (.npz) that the
+# Applicator can key straight on to a scene
+#
+# © Copyright 2020 All Rights Reserved: Chameleon-Workshop.com 
+#######################################################################
+import json
+import numpy
+
+from .capture import CAPTURE_FPS, CAPTURE_VALUE_WIDTH, DATA_ITEM_NAMES, DATA_MORPH_NAMES, load_capture_data
+from .curves import CurveEvaluator
+from .index import is_blank_position, load_capture_range
+from .mapping import BLEND_TARGET_MORPH, CompiledMapping, MappingRow, get_maps, list_csv_data
+from .neutral import NEUTRAL_MEAN, get_face_neutral
+from .timeline import get_capture_timeline
+
+#Declare CONSTANTS (so to speak)
+CURVE_FILE_EXTENSION = '.npz'
+CURVE_FILE_VERSION = 1
+
+#######################################################################
+# Baked curves
+# Has the same curve lookup as CurveEvaluator, the curves are shared by
+# every mapping row with the same curve key
+# key_times start at frame 0 until set_key_times is called
+#######################################################################
+class BakedCurves(object):
+	def __init__(self, settings, mapping, curves, frame_count):
+		self.settings = settings
+		self.mapping = mapping
+		self.curves = curves
+		self.frame_count = frame_count
+		self.key_times = numpy.arange(frame_count) / float(settings['fps'])
+
+	def __len__(self):
+		return self.frame_count
+
+	#keys the curves from start_frame, using frame_to_time to get each frame's time
+	def set_key_times(self, start_frame, frame_to_time):
+		self.key_times = numpy.array([frame_to_time(start_frame + x) for x in range(self.frame_count)], dtype=numpy.float64)
+
+	def curve(self, mapping_row):
+		return self.key_times, self.curves[mapping_row.curve_key()]
+
+#######################################################################
+# Bakes the curves of every mapped row of a capture
+# The capture and neutral files are read through capture_cache when given
+# The neutral comes from neutral_path, the capture itself (neutral_auto) or the saved neutral_profile (see get_face_neutral)
+# Only the frames from capture_in to capture_out are baked when either is set (see load_capture_range)
+#######################################################################
+def bake_curves(capture_path, mapping_path=None, neutral_path=None, fps=CAPTURE_FPS, skip_frames=0, blend_target_type=BLEND_TARGET_MORPH, capture_cache=None,
+	neutral_profile=None, neutral_statistic=NEUTRAL_MEAN, neutral_window=None, neutral_auto=False, capture_in=None, capture_out=None):
+	if not is_blank_position(capture_in) or not is_blank_position(capture_out):
+		capture_frames = load_capture_range(capture_path, capture_in, capture_out, CAPTURE_VALUE_WIDTH, skip_frames)
+	elif capture_cache != None:
+		capture_frames = capture_cache.load(capture_path, CAPTURE_VALUE_WIDTH, skip_frames)
+	else:
+		capture_frames = load_capture_data(capture_path, CAPTURE_VALUE_WIDTH, skip_frames)
+
+	face_neutral = get_face_neutral(DATA_MORPH_NAMES, neutral_path, neutral_profile, neutral_statistic, neutral_window, capture_cache, neutral_auto, capture_frames)
+
+	mapping_data = None
+	if mapping_path:
+		mapping_data = list_csv_data(mapping_path)
+	mapping = get_maps(DATA_MORPH_NAMES, DATA_ITEM_NAMES, mapping_data, blend_target_type)
+
+	capture_timeline = get_capture_timeline(capture_frames, fps, 0, skip_frames)
+	curve_evaluator = CurveEvaluator(capture_frames, face_neutral.values, capture_timeline)
+	curves = {}
+	for mapping_row in mapping.rows():
+		curve_key = mapping_row.curve_key()
+		if curve_key not in curves:
+			curves[curve_key] = curve_evaluator.curve(mapping_row)[1]
+
+	settings = {'fps': float(fps), 'skip_frames': int(skip_frames), 'capture_in': capture_in, 'capture_out': capture_out, 'blend_target_type': blend_target_type,
+		'capture_file': capture_path, 'mapping_file': mapping_path, 'neutral_file': neutral_path,
+		'neutral_profile': neutral_profile, 'neutral_statistic': neutral_statistic, 'neutral_auto': bool(neutral_auto),
+		'neutral_window': list(face_neutral.window) if face_neutral.window != None else None, 'mapping_errors': mapping.errors}
+	return BakedCurves(settings, mapping, curves, len(capture_timeline))
+
+#######################################################################
+# Saves the baked curves to a curve file
+#######################################################################
+def save_curve_file(curve_path, baked_curves):
+	curve_keys = list(baked_curves.curves.keys())
+	curve_indexes = { curve_key : index for index, curve_key in enumerate(curve_keys) }
+
+	rows = []
+	for mapping_row in baked_curves.mapping.rows():
+		row = mapping_row.to_dict()
+		row['Curve'] = curve_indexes[mapping_row.curve_key()]
+		rows.append(row)
+	metadata = {'version': CURVE_FILE_VERSION, 'settings': baked_curves.settings, 'frame_count': baked_curves.frame_count, 'rows': rows}
+
+	curves = numpy.zeros((len(curve_keys), baked_curves.frame_count), dtype=numpy.float64)
+	for index, curve_key in enumerate(curve_keys):
+		curves[index] = baked_curves.curves[curve_key]
+
+	with open(curve_path, 'wb') as curve_file:
+		numpy.savez_compressed(curve_file, curves=curves, metadata=numpy.array(json.dumps(metadata)))
+
+#######################################################################
+# Loads the baked curves from a curve file
+#######################################################################
+def load_curve_file(curve_path):
+	with numpy.load(curve_path, allow_pickle=False) as curve_data:
+		metadata = json.loads(str(curve_data['metadata']))
+		curve_values = curve_data['curves']
+	if metadata.get('version') != CURVE_FILE_VERSION:
+		raise ValueError('Unsupported curve file version: ' + str(metadata.get('version')))
+
+	mapping = CompiledMapping()
+	mapping.errors = list(metadata['settings'].get('mapping_errors') or [])
+	curves = {}
+	for row in metadata['rows']:
+		mapping_row = MappingRow.from_dict(row)
+		mapping.add_row(mapping_row)
+		curves[mapping_row.curve_key()] = curve_values[row['Curve']]
+
+	return BakedCurves(metadata['settings'], mapping, curves, metadata['frame_count'])
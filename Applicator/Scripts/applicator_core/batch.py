@@ -0,0 +1,184 @@
+# python
+#######################################################################
+# Applicator Kit for Modo: multi-take batches
+# Lists the takes of a batch folder or manifest and bakes them across a
+# pool of worker processes (each one runs the applicator_core curve baker),
+# handing the baked curves back in take order
+#
+# © Copyright 2020 All Rights Reserved: Chameleon-Workshop.com
+#######################################################################
+import csv
+import multiprocessing
+import os
+import os.path
+import shutil
+import subprocess
+import sys
+import tempfile
+from collections import deque
+
+from .bake import CURVE_FILE_EXTENSION, bake_curves, load_curve_file
+from .capture import CAPTURE_FORMAT_EXTENSIONS, CAPTURE_FPS, get_capture_format
+from .mapping import BLEND_TARGET_MORPH
+from .neutral import NEUTRAL_MEAN
+
+#Declare CONSTANTS (so to speak)
+BATCH_CAPTURE_FILE = 'Capture File'
+BATCH_ACTION = 'Action'
+CREATE_NO_WINDOW = 0x08000000
+
+#######################################################################
+# A take of the batch: the capture file and the action to key it to
+#######################################################################
+class BatchTake(object):
+	def __init__(self, capture_path, action_name):
+		self.capture_path = capture_path
+		self.action_name = action_name
+
+#######################################################################
+# Gets the header row of a csv file
+#######################################################################
+def get_csv_header(csv_path):
+	with open(csv_path) as csv_file:
+		return [name.strip() for name in next(csv.reader(csv_file, delimiter=','), [])]
+
+#######################################################################
+# Checks whether the csv file is a batch manifest
+# (a csv with Capture File and Action columns)
+#######################################################################
+def is_batch_manifest(csv_path):
+	return os.path.isfile(csv_path) and BATCH_CAPTURE_FILE in get_csv_header(csv_path)
+
+#######################################################################
+# Gets the takes of a batch
+# batch_path is either a folder (every Live Link Face csv or Face Cap txt in it is a take,
+# keyed to an action named after the file) or a batch manifest (capture
+# paths are relative to the manifest, a blank Action uses the file name)
+# exclude_paths are left out of a folder batch (e.g. the neutral file)
+#######################################################################
+def list_batch_takes(batch_path, exclude_paths=()):
+	takes = []
+	exclude_paths = set(os.path.normcase(os.path.abspath(path)) for path in exclude_paths if path)
+
+	if os.path.isdir(batch_path):
+		for file_name in sorted(os.listdir(batch_path)):
+			capture_path = os.path.join(batch_path, file_name)
+			if (os.path.splitext(file_name)[1].lower() not in CAPTURE_FORMAT_EXTENSIONS.values() or not os.path.isfile(capture_path)
+				or os.path.normcase(os.path.abspath(capture_path)) in exclude_paths):
+				continue
+			if get_capture_format(capture_path) != None:
+				takes.append(BatchTake(capture_path, os.path.splitext(file_name)[0]))
+	else:
+		manifest_folder = os.path.dirname(os.path.abspath(batch_path))
+		with open(batch_path) as csv_file:
+			for row in csv.DictReader(csv_file, delimiter=','):
+				capture_path = (row.get(BATCH_CAPTURE_FILE) or '').strip()
+				if capture_path == '':
+					continue
+				capture_path = os.path.join(manifest_folder, capture_path)
+				action_name = (row.get(BATCH_ACTION) or '').strip()
+				if action_name == '':
+					action_name = os.path.splitext(os.path.basename(capture_path))[0]
+				takes.append(BatchTake(capture_path, action_name))
+
+	return takes
+
+#######################################################################
+# Gets a Python interpreter to run the worker processes
+# When Python is embedded (as in Modo) sys.executable is the host
+# application, so look for the interpreter next to the Python install
+#######################################################################
+def get_python_executable():
+	if os.path.basename(sys.executable).lower().startswith('python'):
+		return sys.executable
+	for executable in (os.path.join(sys.exec_prefix, 'python.exe'), os.path.join(sys.exec_prefix, 'bin', 'python3'), os.path.join(sys.exec_prefix, 'bin', 'python')):
+		if os.path.isfile(executable):
+			return executable
+	return None
+
+#######################################################################
+# Bakes the takes of a batch, yields (take, baked_curves, error) in take order
+# Up to processes takes are baked at once, each by its own worker process,
+# while the caller works through the finished ones. A take that fails to
+# bake is yielded with baked_curves None and the error message.
+# Without a Python interpreter (or with processes 1) the takes are baked here
+# The capture and neutral files are read through capture_cache when given
+# The neutral comes from neutral_path, each take itself (neutral_auto) or the saved neutral_profile
+# (see get_face_neutral), the takes never save the neutral profile
+#######################################################################
+def bake_takes(takes, mapping_path=None, neutral_path=None, fps=CAPTURE_FPS, skip_frames=0, blend_target_type=BLEND_TARGET_MORPH, processes=None, python_executable=None, capture_cache=None,
+	neutral_profile=None, neutral_statistic=NEUTRAL_MEAN, neutral_auto=False):
+	if neutral_path or neutral_auto:
+		neutral_profile = None
+	if processes == None:
+		processes = multiprocessing.cpu_count()
+	if python_executable == None:
+		python_executable = get_python_executable()
+
+	if processes <= 1 or python_executable == None:
+		for take in takes:
+			try:
+				yield take, bake_curves(take.capture_path, mapping_path, neutral_path, fps, skip_frames, blend_target_type, capture_cache,
+					neutral_profile, neutral_statistic, None, neutral_auto), None
+			except Exception as error:
+				yield take, None, str(error)
+		return
+
+	#the workers run "python -m applicator_core" from the Scripts folder
+	scripts_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+	worker_args = ['--fps', repr(float(fps)), '--skip-frames', str(int(skip_frames)), '--blend-target-type', blend_target_type]
+	if mapping_path:
+		worker_args += ['-m', os.path.abspath(mapping_path)]
+	if neutral_path:
+		worker_args += ['-n', os.path.abspath(neutral_path), '--neutral-statistic', neutral_statistic]
+	elif neutral_auto:
+		worker_args += ['--neutral-auto', '--neutral-statistic', neutral_statistic]
+	elif neutral_profile:
+		worker_args += ['--neutral-profile', neutral_profile]
+	if capture_cache != None:
+		worker_args += ['--cache-dir', os.path.abspath(capture_cache.cache_path)]
+	popen_args = {}
+	if sys.platform == 'win32':
+		popen_args['creationflags'] = CREATE_NO_WINDOW
+
+	temp_path = tempfile.mkdtemp(prefix='applicator_batch_')
+	workers = deque()
+	take_queue = deque(enumerate(takes))
+
+	def start_worker():
+		index, take = take_queue.popleft()
+		curve_path = os.path.join(temp_path, str(index) + CURVE_FILE_EXTENSION)
+		log_file = open(os.path.join(temp_path, str(index) + '.log'), 'w')
+		try:
+			process = subprocess.Popen([python_executable, '-m', 'applicator_core', os.path.abspath(take.capture_path), '-o', curve_path] + worker_args,
+				cwd=scripts_path, stdout=log_file, stderr=log_file, **popen_args)
+		except OSError as error:
+			process = None
+			log_file.write(str(error) + '\n')
+		workers.append((take, process, curve_path, log_file))
+
+	try:
+		while len(workers) < processes and len(take_queue) > 0:
+			start_worker()
+		while len(workers) > 0:
+			take, process, curve_path, log_file = workers.popleft()
+			return_code = process.wait() if process != None else -1
+			log_file.close()
+			#keep the pool full while the finished take is keyed
+			if len(take_queue) > 0:
+				start_worker()
+
+			if return_code == 0:
+				yield take, load_curve_file(curve_path), None
+				os.remove(curve_path)
+			else:
+				with open(log_file.name) as log:
+					log_lines = [line.strip() for line in log if line.strip() != '']
+				yield take, None, log_lines[-1] if len(log_lines) > 0 else 'Worker exited with code ' + str(return_code)
+	finally:
+		for take, process, curve_path, log_file in workers:
+			if process != None and process.poll() == None:
+				process.kill()
+				process.wait()
+			log_file.close()
+		shutil.rmtree(temp_path, ignore_errors=True)
@@ -0,0 +1,170 @@
+# python
+#######################################################################
+# Applicator Kit for Modo: capture cache
+# Keeps the parsed columnar data of capture and neutral files in a cache
+# folder (as .npy files), so re-applying the same take skips the parse
+#
+# © Copyright 2020 All Rights Reserved: Chameleon-Workshop.com
+#######################################################################
+import hashlib
+import json
+import numpy
+import os
+import os.path
+import shutil
+
+from .capture import CaptureData, get_capture_times, load_capture_data
+
+#Declare CONSTANTS (so to speak)
+CAPTURE_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.applicator_kit', 'cache')
+CAPTURE_CACHE_SIZE = 1073741824
+CAPTURE_CACHE_VERSION = 2
+CAPTURE_CACHE_ENTRY = 'entry.json'
+CAPTURE_CACHE_VALUES = 'values.npy'
+CAPTURE_CACHE_TIMES = 'times.npy'
+CAPTURE_CACHE_TIMECODES = 'timecodes.npy'
+
+#######################################################################
+# Gets the content hash (SHA-1) of a file
+#######################################################################
+def get_file_hash(file_path):
+	file_hash = hashlib.sha1()
+	with open(file_path, 'rb') as source_file:
+		for block in iter(lambda: source_file.read(1048576), b''):
+			file_hash.update(block)
+	return file_hash.hexdigest()
+
+#######################################################################
+# Capture cache
+# Each capture file (and value width) has an entry folder named after the
+# hash of its path. An entry is used while the file's size and modified
+# time match. If only the modified time changed the content hash decides,
+# anything else re-parses the file. The values are memory-mapped when
+# loaded rather than read. Entries are evicted least recently used first
+# once the cache folder is larger than max_size.
+#######################################################################
+class CaptureCache(object):
+	def __init__(self, cache_path=None, max_size=CAPTURE_CACHE_SIZE):
+		self.cache_path = cache_path if cache_path != None else CAPTURE_CACHE_PATH
+		self.max_size = max_size
+		self.hit_count = 0
+		self.miss_count = 0
+
+	def _entry_path(self, capture_path, value_width):
+		entry_key = '|'.join([str(CAPTURE_CACHE_VERSION), os.path.normcase(os.path.abspath(capture_path)), str(value_width)])
+		return os.path.join(self.cache_path, hashlib.sha1(entry_key.encode('utf-8')).hexdigest())
+
+	#gets the capture frames from the cache, parsing (and caching) the file when the entry is missing or stale
+	def load(self, capture_path, value_width=None, start_frame=0):
+		entry_path = self._entry_path(capture_path, value_width)
+		capture_data = self._read_entry(entry_path, capture_path)
+		if capture_data == None:
+			self.miss_count += 1
+			capture_data = load_capture_data(capture_path, value_width)
+			self._write_entry(entry_path, capture_path, value_width, capture_data)
+			self.evict()
+		else:
+			self.hit_count += 1
+
+		if start_frame <= 0:
+			return capture_data
+
+		#start part way through (the data is a view on the cached values)
+		start_frame = min(start_frame, len(capture_data))
+		capture_data = CaptureData(capture_data.names, capture_data.values[start_frame:], capture_data.timecodes[start_frame:], start_frame)
+		capture_data.times = get_capture_times(capture_data)
+		return capture_data
+
+	#gets the content hash of the capture file from its entry while the file's size and modified
+	#time match (the entry's is kept up to date by load), hashing the file only when they do not
+	def get_source_hash(self, capture_path, value_width=None):
+		try:
+			with open(os.path.join(self._entry_path(capture_path, value_width), CAPTURE_CACHE_ENTRY)) as entry_file:
+				entry = json.load(entry_file)
+			source_stat = os.stat(capture_path)
+			if entry['source_size'] == source_stat.st_size and entry['source_mtime'] == source_stat.st_mtime:
+				return entry['source_hash']
+		except (IOError, OSError, ValueError, KeyError):
+			pass
+		return get_file_hash(capture_path)
+
+	def _read_entry(self, entry_path, capture_path):
+		try:
+			with open(os.path.join(entry_path, CAPTURE_CACHE_ENTRY)) as entry_file:
+				entry = json.load(entry_file)
+			source_stat = os.stat(capture_path)
+			if entry['source_size'] != source_stat.st_size:
+				return None
+			if entry['source_mtime'] != source_stat.st_mtime:
+				#touched or copied, but the content may be the same
+				if entry['source_hash'] != get_file_hash(capture_path):
+					return None
+				entry['source_mtime'] = source_stat.st_mtime
+				with open(os.path.join(entry_path, CAPTURE_CACHE_ENTRY), 'w') as entry_file:
+					json.dump(entry, entry_file)
+
+			values = numpy.load(os.path.join(entry_path, CAPTURE_CACHE_VALUES), mmap_mode='r')
+			times = numpy.load(os.path.join(entry_path, CAPTURE_CACHE_TIMES))
+			timecodes = numpy.load(os.path.join(entry_path, CAPTURE_CACHE_TIMECODES))
+		except (IOError, OSError, ValueError, KeyError):
+			return None
+
+		#mark the entry as used
+		os.utime(os.path.join(entry_path, CAPTURE_CACHE_ENTRY), None)
+
+		capture_data = CaptureData(entry['names'], values, timecodes.tolist())
+		capture_data.times = times
+		return capture_data
+
+	#writes the entry to a temporary folder first, so a half written entry is never read
+	def _write_entry(self, entry_path, capture_path, value_width, capture_data):
+		temp_path = entry_path + '.' + str(os.getpid()) + '.tmp'
+		try:
+			source_stat = os.stat(capture_path)
+			entry = {'source_path': os.path.abspath(capture_path), 'source_size': source_stat.st_size, 'source_mtime': source_stat.st_mtime,
+				'source_hash': get_file_hash(capture_path), 'value_width': value_width, 'names': capture_data.names}
+			if not os.path.isdir(temp_path):
+				os.makedirs(temp_path)
+			numpy.save(os.path.join(temp_path, CAPTURE_CACHE_VALUES), capture_data.values)
+			numpy.save(os.path.join(temp_path, CAPTURE_CACHE_TIMES), capture_data.times)
+			numpy.save(os.path.join(temp_path, CAPTURE_CACHE_TIMECODES), numpy.array(capture_data.timecodes, dtype=numpy.str_))
+			with open(os.path.join(temp_path, CAPTURE_CACHE_ENTRY), 'w') as entry_file:
+				json.dump(entry, entry_file)
+
+			if os.path.isdir(entry_path):
+				shutil.rmtree(entry_path)
+			os.rename(temp_path, entry_path)
+		except (IOError, OSError):
+			#the cache is only an optimisation (e.g. read-only home folder or another process wrote the entry)
+			shutil.rmtree(temp_path, ignore_errors=True)
+
+	#gets the entries (entry path, last used, size), least recently used first
+	def entries(self):
+		entries = []
+		if not os.path.isdir(self.cache_path):
+			return entries
+		for entry_name in os.listdir(self.cache_path):
+			entry_path = os.path.join(self.cache_path, entry_name)
+			try:
+				last_used = os.path.getmtime(os.path.join(entry_path, CAPTURE_CACHE_ENTRY))
+				entry_size = sum(os.path.getsize(os.path.join(entry_path, file_name)) for file_name in os.listdir(entry_path))
+			except (IOError, OSError):
+				continue
+			entries.append((entry_path, last_used, entry_size))
+		entries.sort(key=lambda entry: entry[1])
+		return entries
+
+	#removes the least recently used entries until the cache fits in max_size (the latest entry is always kept)
+	def evict(self):
+		entries = self.entries()
+		cache_size = sum(entry[2] for entry in entries)
+		for entry_path, last_used, entry_size in entries[:-1]:
+			if cache_size <= self.max_size:
+				break
+			shutil.rmtree(entry_path, ignore_errors=True)
+			if not os.path.isdir(entry_path):
+				cache_size -= entry_size
+
+	def clear(self):
+		for entry_path, last_used, entry_size in self.entries():
+			shutil.rmtree(entry_path, ignore_errors=True)
@@ -0,0 +1,394 @@
+# python
+#######################################################################
+# Applicator Kit for Modo: capture file loading
+#
+# © Copyright 2020 All Rights Reserved: Chameleon-Workshop.com 
+#######################################################################
+import codecs
+import csv
+import mmap
+import numpy
+import sys
+
+#Declare CONSTANTS (so to speak)
+CAPTURE_TIMECODE = 'Timecode'
+CAPTURE_VALUE_WIDTH = 6
+CAPTURE_FPS = 60.0
+TIMECODE_RATES = (24.0, 25.0, 30.0, 48.0, 50.0, 60.0)
+#the longest step (in seconds) between the timecodes of consecutive capture frames
+CAPTURE_MAX_STEP = 1.0
+CAPTURE_CHUNK_FRAMES = 4096
+CAPTURE_INDEX_BYTES = 16777216
+CAPTURE_SNIFF_BYTES = 65536
+CAPTURE_FORMAT_LIVE_LINK_FACE = 'Live Link Face'
+CAPTURE_FORMAT_FACE_CAP = 'Face Cap'
+CAPTURE_FORMAT_EXTENSIONS = {CAPTURE_FORMAT_LIVE_LINK_FACE: '.csv', CAPTURE_FORMAT_FACE_CAP: '.txt'}
+FACE_CAP_INFO = 'info'
+FACE_CAP_BLENDSHAPES = 'bs'
+FACE_CAP_KEY = 'k'
+FACE_CAP_ROTATION_SCALE = 1 / 90.0
+DATA_MORPH_NAMES = ['eyeBlinkRight', 'eyeLookDownRight', 'eyeLookInRight', 'eyeLookOutRight', 'eyeLookUpRight', 'eyeSquintRight', 'eyeWideRight', 'eyeBlinkLeft', 'eyeLookDownLeft', 'eyeLookInLeft', 'eyeLookOutLeft', 'eyeLookUpLeft', 'eyeSquintLeft', 'eyeWideLeft', 'jawForward', 'jawRight', 'jawLeft', 'jawOpen', 'mouthClose', 'mouthFunnel', 'mouthPucker', 'mouthRight', 'mouthLeft', 'mouthSmileRight', 'mouthSmileLeft', 'mouthFrownRight', 'mouthFrownLeft', 'mouthDimpleRight', 'mouthDimpleLeft', 'mouthStretchRight', 'mouthStretchLeft', 'mouthRollLower', 'mouthRollUpper', 'mouthShrugLower', 'mouthShrugUpper', 'mouthPressRight', 'mouthPressLeft', 'mouthLowerDownRight', 'mouthLowerDownLeft', 'mouthUpperUpRight', 'mouthUpperUpLeft', 'browDownRight', 'browDownLeft', 'browInnerUp', 'browOuterUpRight', 'browOuterUpLeft', 'cheekPuff', 'cheekSquintRight', 'cheekSquintLeft', 'noseSneerRight', 'noseSneerLeft', 'tongueOut']
+DATA_ITEM_NAMES = ['HeadYaw', 'HeadPitch', 'HeadRoll', 'LeftEyeYaw', 'LeftEyePitch', 'LeftEyeRoll', 'RightEyeYaw', 'RightEyePitch', 'RightEyeRoll']
+#Face Cap k row fields (after the timestamp) > item name: head position x, y, z, head rotation x, y, z, left eye x, y, right eye x, y
+FACE_CAP_ITEM_FIELDS = {'HeadPitch': 4, 'HeadYaw': 5, 'HeadRoll': 6, 'LeftEyePitch': 7, 'LeftEyeYaw': 8, 'RightEyePitch': 9, 'RightEyeYaw': 10}
+FACE_CAP_BLENDSHAPE_FIELD = 11
+
+#######################################################################
+# Columnar store of the capture frames
+# values is a float64 (frames x channels) array, columns maps a
+# channel name to its column index, timecodes holds the Timecode column
+# and times the capture time of each frame (in seconds)
+# first_frame is the capture file row of the first frame (when read from an offset)
+#######################################################################
+class CaptureData(object):
+	def __init__(self, names, values, timecodes, first_frame=0):
+		self.names = names
+		self.first_frame = first_frame
+		self.columns = { name : index for index, name in enumerate(names) }
+		self.values = values
+		self.timecodes = timecodes
+		self.times = None
+
+	def __len__(self):
+		return self.values.shape[0]
+
+	def __contains__(self, name):
+		return name in self.columns
+
+	def column(self, name):
+		return self.values[:, self.columns[name]]
+
+#######################################################################
+# Memory-mapped capture file reader
+# The file is mapped rather than read, and the byte offset of every row is
+# indexed when it is opened, so any frame range can be read without
+# touching the rows before it. Rows are converted chunk_frames at a time,
+# so only one chunk of text is held at once.
+# The frames are only streamed as far as read(): smoothing, resampling and
+# curve evaluation work on whole columns (the filters need the frames
+# either side of each frame), so read() gathers the chunks into one
+# float64 array. Peak memory is that array, 8 bytes per channel per
+# frame of the range read (about 29 KB per second of a 60 fps Live Link
+# Face take, 105 MB per hour), plus one chunk of text and the line index
+# (8 bytes per row), not the whole file's text. Capture In / Out keeps it
+# to the section applied.
+# Every value is converted exactly once. When value_width is set the text
+# is cut to that many characters before conversion (as the capture
+# values have always been read)
+# line_offsets (e.g. from a CaptureIndex) saves indexing the file again
+#######################################################################
+class CaptureReader(object):
+	def __init__(self, capture_path, value_width=None, chunk_frames=CAPTURE_CHUNK_FRAMES, line_offsets=None):
+		self.capture_path = capture_path
+		self.value_width = value_width
+		self.chunk_frames = max(int(chunk_frames), 1)
+		self._file = open(capture_path, 'rb')
+		try:
+			self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+		except ValueError:
+			#empty file (cannot be mapped)
+			self._map = None
+
+		#byte offset of each line, and of each row (after the header), plus the end of the file
+		self.line_offsets = line_offsets if line_offsets is not None and self._map != None else self._index_lines()
+		self.row_offsets = self._read_header(self.line_offsets)
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		self.close()
+
+	def __len__(self):
+		return len(self.row_offsets) - 1
+
+	def close(self):
+		if self._map != None:
+			self._map.close()
+			self._map = None
+		self._file.close()
+
+	#offsets of the start of every line (and the end of the file), found a block at a time
+	def _index_lines(self):
+		if self._map == None:
+			return numpy.zeros(1, dtype=numpy.int64)
+		file_size = len(self._map)
+		line_offsets = [numpy.zeros(1, dtype=numpy.int64)]
+		position = 0
+		while position < file_size:
+			block = self._map[position:position + CAPTURE_INDEX_BYTES]
+			line_offsets.append(numpy.flatnonzero(numpy.frombuffer(block, dtype=numpy.uint8) == 10).astype(numpy.int64) + position + 1)
+			position += len(block)
+		line_offsets = numpy.concatenate(line_offsets)
+		if line_offsets[-1] != file_size:
+			line_offsets = numpy.append(line_offsets, file_size)
+		return line_offsets
+
+	def _read_lines(self, start_offset, end_offset):
+		text = self._map[start_offset:end_offset]
+		#files saved by some editors start with a byte order mark
+		if start_offset == 0 and text.startswith(codecs.BOM_UTF8):
+			text = text[len(codecs.BOM_UTF8):]
+		if sys.version_info[0] >= 3:
+			text = text.decode('utf-8')
+		return text.splitlines()
+
+	#reads the header (row 0) and returns the offsets of the rows after it
+	def _read_header(self, line_offsets):
+		header = next(csv.reader(self._read_lines(line_offsets[0], line_offsets[1]), delimiter=','), []) if len(line_offsets) > 1 else []
+		self.header = header
+		self.timecode_index = header.index(CAPTURE_TIMECODE) if CAPTURE_TIMECODE in header else None
+		self.names = [name for index, name in enumerate(header) if index != self.timecode_index]
+		return line_offsets[1:] if len(line_offsets) > 1 else line_offsets
+
+	#converts the lines of a chunk to (timecodes, float64 values)
+	#(the values are the float of the text, as the capture values have always been read)
+	def _read_rows(self, lines):
+		name_count = len(self.names)
+		timecodes = []
+		rows = []
+		for row in csv.reader(lines, delimiter=','):
+			#ignore blank and partial rows
+			if len(row) < len(self.header):
+				continue
+			if self.timecode_index != None:
+				timecodes.append(row[self.timecode_index])
+				row = row[:self.timecode_index] + row[self.timecode_index + 1:]
+			rows.append(row[:name_count])
+
+		#let numpy do the text to float conversion in one go
+		if self.value_width != None:
+			text = numpy.array(rows, dtype='U%d' % self.value_width).reshape(len(rows), name_count)
+		else:
+			text = numpy.array(rows, dtype=numpy.str_).reshape(len(rows), name_count)
+		text[text == ''] = '0'
+		return timecodes, text.astype(numpy.float64)
+
+	#gets the timecode of each of the lines (None for the rows _read_rows leaves out)
+	def _read_timecodes(self, lines):
+		timecodes = []
+		for row in csv.reader(lines, delimiter=','):
+			if len(row) < len(self.header):
+				timecodes.append(None)
+			else:
+				timecodes.append(row[self.timecode_index] if self.timecode_index != None else '')
+		return timecodes
+
+	#gets the timecode of every row without converting the values (None for rows that are not frames)
+	def read_timecodes(self):
+		timecodes = []
+		for chunk_start in range(0, len(self), self.chunk_frames):
+			chunk_stop = min(chunk_start + self.chunk_frames, len(self))
+			timecodes.extend(self._read_timecodes(self._read_lines(self.row_offsets[chunk_start], self.row_offsets[chunk_stop])))
+		return timecodes
+
+	#yields the frames from start to stop (file rows after the header) as CaptureData chunks
+	#(blank and partial rows are left out, times are not set)
+	def chunks(self, start=0, stop=None):
+		row_count = len(self)
+		stop = row_count if stop == None else min(stop, row_count)
+		start = min(max(start, 0), stop)
+		for chunk_start in range(start, stop, self.chunk_frames):
+			chunk_stop = min(chunk_start + self.chunk_frames, stop)
+			timecodes, values = self._read_rows(self._read_lines(self.row_offsets[chunk_start], self.row_offsets[chunk_stop]))
+			yield CaptureData(self.names, values, timecodes, chunk_start)
+
+	#reads the frames from start to stop into one CaptureData store
+	def read(self, start=0, stop=None):
+		row_count = len(self)
+		stop = row_count if stop == None else min(stop, row_count)
+		start = min(max(start, 0), stop)
+		values = numpy.zeros((stop - start, len(self.names)), dtype=numpy.float64)
+		timecodes = []
+		frame_count = 0
+		for chunk in self.chunks(start, stop):
+			values[frame_count:frame_count + len(chunk)] = chunk.values
+			timecodes.extend(chunk.timecodes)
+			frame_count += len(chunk)
+
+		capture_data = CaptureData(self.names, values[:frame_count], timecodes, start)
+		capture_data.times = get_capture_times(capture_data)
+		return capture_data
+
+#######################################################################
+# Gets the kit's BlendShape name of a Face Cap BlendShape
+# Face Cap names the sides with a _L / _R suffix (eyeBlink_L is eyeBlinkLeft)
+#######################################################################
+def get_face_cap_morph_name(face_cap_name):
+	face_cap_name = face_cap_name.strip()
+	if face_cap_name.endswith('_L'):
+		return face_cap_name[:-2] + 'Left'
+	if face_cap_name.endswith('_R'):
+		return face_cap_name[:-2] + 'Right'
+	return face_cap_name
+
+#######################################################################
+# Memory-mapped Face Cap TXT reader
+# The header lines (info and bs, the BlendShape names) come before the
+# frames, one k row each: k, timestamp (ms), head position x, y, z, head
+# rotation x, y, z (degrees), left eye x, y, right eye x, y (degrees),
+# then the BlendShape values. Frames go into the same columns as a Live
+# Link Face take (DATA_MORPH_NAMES then DATA_ITEM_NAMES), rotations
+# scaled as Live Link Face's (1 is 90 degrees), eye roll and BlendShapes
+# the file does not have are 0, and the timestamps are the timecodes.
+# Indexing and chunking are as CaptureReader. value_width is not used,
+# the values are read in full.
+#######################################################################
+class FaceCapReader(CaptureReader):
+	def _read_header(self, line_offsets):
+		self.header = []
+		self.names = DATA_MORPH_NAMES + DATA_ITEM_NAMES
+		face_cap_names = []
+		header_count = 0
+		for line_index in range(len(line_offsets) - 1):
+			line = self._read_lines(line_offsets[line_index], line_offsets[line_index + 1])
+			line = line[0].split(',') if len(line) > 0 else ['']
+			if line[0] == FACE_CAP_KEY:
+				break
+			if line[0] == FACE_CAP_BLENDSHAPES:
+				face_cap_names = [get_face_cap_morph_name(name) for name in line[1:] if name.strip() != '']
+			self.header.append(line)
+			header_count += 1
+
+		#the k row field of each column (the last field of the padded row is 0)
+		self.field_count = FACE_CAP_BLENDSHAPE_FIELD + len(face_cap_names)
+		source_fields = []
+		for name in DATA_MORPH_NAMES:
+			source_fields.append(FACE_CAP_BLENDSHAPE_FIELD + face_cap_names.index(name) if name in face_cap_names else self.field_count)
+		for name in DATA_ITEM_NAMES:
+			source_fields.append(FACE_CAP_ITEM_FIELDS.get(name, self.field_count))
+		self.source_fields = numpy.array(source_fields, dtype=numpy.int64)
+		self.scales = numpy.array([1.0] * len(DATA_MORPH_NAMES) + [FACE_CAP_ROTATION_SCALE] * len(DATA_ITEM_NAMES), dtype=numpy.float64)
+		return line_offsets[header_count:]
+
+	def _read_rows(self, lines):
+		#ignore blank, partial and non frame rows
+		rows = []
+		for line in lines:
+			row = line.split(',')
+			if row[0] == FACE_CAP_KEY and len(row) > self.field_count:
+				rows.append(row[1:self.field_count + 1])
+
+		#let numpy do the text to float conversion in one go, then gather the columns
+		text = numpy.array(rows, dtype=numpy.str_).reshape(len(rows), self.field_count)
+		text[text == ''] = '0'
+		fields = numpy.zeros((len(rows), self.field_count + 1), dtype=numpy.float64)
+		fields[:, :self.field_count] = text.astype(numpy.float64)
+		return text[:, 0].tolist(), fields[:, self.source_fields] * self.scales
+
+	def _read_timecodes(self, lines):
+		timecodes = []
+		for line in lines:
+			row = line.split(',')
+			timecodes.append(row[1] if row[0] == FACE_CAP_KEY and len(row) > self.field_count else None)
+		return timecodes
+
+#######################################################################
+# Gets the format of a capture file from its header
+# Returns CAPTURE_FORMAT_LIVE_LINK_FACE, CAPTURE_FORMAT_FACE_CAP or None
+# (not a capture file)
+#######################################################################
+def get_capture_format(capture_path):
+	try:
+		with open(capture_path, 'rb') as capture_file:
+			header = capture_file.read(CAPTURE_SNIFF_BYTES)
+	except (IOError, OSError):
+		return None
+	if header.startswith(codecs.BOM_UTF8):
+		header = header[len(codecs.BOM_UTF8):]
+	if sys.version_info[0] >= 3:
+		header = header.decode('utf-8', 'replace')
+	header = header.splitlines()
+	header = header[0].split(',') if len(header) > 0 else ['']
+	if header[0].strip() in (FACE_CAP_INFO, FACE_CAP_BLENDSHAPES, FACE_CAP_KEY):
+		return CAPTURE_FORMAT_FACE_CAP
+	if CAPTURE_TIMECODE in [name.strip() for name in header] or len(set(name.strip() for name in header) & set(DATA_MORPH_NAMES)) > 0:
+		return CAPTURE_FORMAT_LIVE_LINK_FACE
+	return None
+
+#######################################################################
+# Opens the reader for the capture file's format
+#######################################################################
+def open_capture_reader(capture_path, value_width=None, chunk_frames=CAPTURE_CHUNK_FRAMES, line_offsets=None):
+	if get_capture_format(capture_path) == CAPTURE_FORMAT_FACE_CAP:
+		return FaceCapReader(capture_path, value_width, chunk_frames, line_offsets)
+	return CaptureReader(capture_path, value_width, chunk_frames, line_offsets)
+
+#######################################################################
+# Gets the capture frames as a CaptureData store
+# start_frame frames are skipped by seeking past them
+#######################################################################
+def load_capture_data(capture_path, value_width=None, start_frame=0):
+	with open_capture_reader(capture_path, value_width) as capture_reader:
+		return capture_reader.read(start_frame)
+
+#######################################################################
+# Gets the capture time (in seconds from the first frame) of every capture frame
+# Live Link Face timecodes are HH:MM:SS:FF.sss, the timecode rate is taken as the
+# lowest standard rate that fits the largest FF value in the take.
+# Face Cap timecodes are milliseconds from the start of the recording.
+# If the timecodes are missing or unusable (running backwards, repeating or
+# jumping more than CAPTURE_MAX_STEP) the capture is taken as evenly spaced at CAPTURE_FPS
+#######################################################################
+def get_capture_times(capture_frames):
+	if len(capture_frames.timecodes) != len(capture_frames):
+		return numpy.arange(len(capture_frames), dtype=numpy.float64) / CAPTURE_FPS
+	return get_timecode_times(capture_frames.timecodes)
+
+#######################################################################
+# Gets the capture time (in seconds from the first frame) of each timecode (see get_capture_times)
+#######################################################################
+def get_timecode_times(timecodes):
+	capture_frames_count = len(timecodes)
+	even_times = numpy.arange(capture_frames_count, dtype=numpy.float64) / CAPTURE_FPS
+	if capture_frames_count < 2:
+		return even_times
+
+	try:
+		timecode_parts = numpy.array([timecode.replace(';', ':').split(':') for timecode in timecodes], dtype=numpy.float64)
+	except ValueError:
+		return even_times
+	if timecode_parts.ndim == 2 and timecode_parts.shape[1] == 1:
+		capture_times = (timecode_parts[:, 0] - timecode_parts[0, 0]) / 1000.0
+	elif timecode_parts.ndim == 2 and timecode_parts.shape[1] == 4:
+		timecode_rate = get_timecode_rate(timecode_parts)
+		capture_times = timecode_parts[:, 0] * 3600 + timecode_parts[:, 1] * 60 + timecode_parts[:, 2] + timecode_parts[:, 3] / timecode_rate
+
+		#the take may run past midnight
+		day_wraps = numpy.cumsum(numpy.diff(capture_times) < -43200)
+		capture_times[1:] += day_wraps * 86400
+		capture_times -= capture_times[0]
+	else:
+		return even_times
+
+	#the timecodes must run forward (whatever the rate the take was recorded at),
+	#without repeats or gaps longer than CAPTURE_MAX_STEP
+	capture_steps = numpy.diff(capture_times)
+	if (capture_steps <= 0).any() or (capture_steps > CAPTURE_MAX_STEP).any():
+		return even_times
+	return capture_times
+
+#######################################################################
+# Gets the rate of HH:MM:SS:FF timecodes (split into a frames x 4 array)
+# The lowest standard rate that fits the largest FF value in the take
+# (CAPTURE_FPS for takes too short to tell)
+#######################################################################
+def get_timecode_rate(timecode_parts):
+	max_timecode_frame = numpy.floor(timecode_parts[:, 3].max())
+	timecode_rates = [rate for rate in TIMECODE_RATES if rate > max_timecode_frame]
+	if len(timecode_parts) < max(TIMECODE_RATES) or len(timecode_rates) == 0:
+		return CAPTURE_FPS
+	return timecode_rates[0]
+
+#######################################################################
+# Gets the time of day (in seconds) of a timecode: HH:MM:SS:FF(.sss) at the
+# timecode rate, or milliseconds (Face Cap)
+# Raises ValueError for anything else
+#######################################################################
+def get_timecode_seconds(timecode, timecode_rate=CAPTURE_FPS):
+	timecode_parts = [float(part) for part in timecode.strip().replace(';', ':').split(':')]
+	if len(timecode_parts) == 1:
+		return timecode_parts[0] / 1000.0
+	if len(timecode_parts) != 4:
+		raise ValueError('Not a timecode: ' + timecode)
+	return timecode_parts[0] * 3600 + timecode_parts[1] * 60 + timecode_parts[2] + timecode_parts[3] / timecode_rate
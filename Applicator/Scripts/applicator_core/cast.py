@@ -0,0 +1,55 @@
+# python
+#######################################################################
+# Applicator Kit for Modo: casts
+# Lists the targets of a cast manifest: the actors one capture is
+# applied to, each with its own mapping file and action
+#
+# © Copyright 2020 All Rights Reserved: Chameleon-Workshop.com
+#######################################################################
+import csv
+import os.path
+
+from .batch import get_csv_header
+
+#Declare CONSTANTS (so to speak)
+CAST_ACTOR = 'Actor'
+CAST_MAPPING_FILE = 'Mapping File'
+CAST_ACTION = 'Action'
+
+#######################################################################
+# A target of the cast: the actor, its mapping file and the action to key
+# (blank for the apply's Action)
+#######################################################################
+class CastTarget(object):
+	def __init__(self, actor_name, mapping_path, action_name=''):
+		self.actor_name = actor_name
+		self.mapping_path = mapping_path
+		self.action_name = action_name
+
+#######################################################################
+# Checks whether the csv file is a cast manifest
+# (a csv with Actor and Mapping File columns)
+#######################################################################
+def is_cast_manifest(csv_path):
+	if not os.path.isfile(csv_path):
+		return False
+	header = get_csv_header(csv_path)
+	return CAST_ACTOR in header and CAST_MAPPING_FILE in header
+
+#######################################################################
+# Gets the targets of a cast manifest, in file order
+# (mapping paths are relative to the manifest, rows without an actor are skipped)
+#######################################################################
+def list_cast_targets(cast_path):
+	targets = []
+	manifest_folder = os.path.dirname(os.path.abspath(cast_path))
+	with open(cast_path) as csv_file:
+		for row in csv.DictReader(csv_file, delimiter=','):
+			actor_name = (row.get(CAST_ACTOR) or '').strip()
+			if actor_name == '':
+				continue
+			mapping_path = (row.get(CAST_MAPPING_FILE) or '').strip()
+			if mapping_path != '':
+				mapping_path = os.path.join(manifest_folder, mapping_path)
+			targets.append(CastTarget(actor_name, mapping_path, (row.get(CAST_ACTION) or '').strip()))
+	return targets
@@ -0,0 +1,310 @@
+# python
+#######################################################################
+# Applicator Kit for Modo: curve evaluation and key reduction
+#
+# © Copyright 2020 All Rights Reserved: Chameleon-Workshop.com 
+#######################################################################
+import numpy
+from collections import OrderedDict
+
+from .smoothing import smooth_values
+
+#Declare CONSTANTS (so to speak)
+#channel values keyed on angle channels are scaled to be based between 0° & 45°
+ANGLE_SCALE = 0.785398163397
+CURVE_CACHE_BYTES = 268435456
+ROTATION_AXES = ['X', 'Y', 'Z']
+ROTATION_ORDERS = ['xyz', 'xzy', 'yxz', 'yzx', 'zxy', 'zyx']
+#the order the mapped rotations are keyed in as they are (Modo's default)
+CAPTURE_ROTATION_ORDER = 'xyz'
+
+#######################################################################
+# Rounds the values to the decimal places exactly as Python's round does
+# (numpy.round scales by a power of ten first, so a value a hair from a
+# rounding boundary can round the other way, those are rounded one at a time)
+#######################################################################
+def round_values(values, places):
+	values = numpy.asarray(values, dtype=numpy.float64)
+	if values.ndim == 0:
+		return numpy.float64(round(float(values), places))
+	result = numpy.round(values, places)
+	scaled = numpy.abs(values) * 10 ** places
+	near_ties = numpy.abs(scaled - numpy.floor(scaled) - 0.5) < 1e-6
+	if near_ties.any():
+		result[near_ties] = [round(value, places) for value in values[near_ties].tolist()]
+	return result
+
+#######################################################################
+# Gets the channel values for capture strengths
+# (the mapping settings can be single values or one per strength)
+#######################################################################
+def get_channel_values(strength, strength_multiplier, value_shift, neutral):
+	#make sure the strength is within the range 0-1, then apply the value shift and the miltiplier
+	strength = (numpy.clip(strength, 0, 1) + value_shift) * strength_multiplier
+
+	#apply the Neutralizer
+	#(Actual - Neutral)/(1-Neutral)
+	return round_values((strength - neutral) / (1 - neutral), 4)
+
+#######################################################################
+# Gets the rotation values (in radians) for capture strengths
+# (the mapping settings can be single values or one per strength)
+#######################################################################
+def get_rotation_values(strength, strength_multiplier, value_shift):
+	#make sure the strength is within the range -1 to 1, then apply the value shift
+	strength = numpy.clip(strength, -1, 1) + value_shift
+
+	#convert to degrees and apply the miltiplier
+	#Note: No Neutralizer for rotations
+	strength = strength * 90 * strength_multiplier
+
+	return numpy.radians(strength)
+
+#######################################################################
+# Evaluates the whole channel curve for a capture value
+# Returns the key times and the key values
+# (for angle channels the values are still to be multiplied by ANGLE_SCALE)
+#######################################################################
+def evaluate_channel_curve(capture_frames, capture_morph_name, strength_multiplier, value_shift, smooth, face_neutral, capture_timeline):
+	key_times = capture_timeline.key_times
+	strength = capture_frames.column(capture_morph_name).astype(numpy.float64)
+	
+	#get the strength (smooth style) at each scene frame
+	strength = smooth_values(strength, smooth)
+	strength = capture_timeline.sample(strength)
+	
+	return key_times, get_channel_values(strength, strength_multiplier, value_shift, face_neutral[capture_morph_name])
+
+#######################################################################
+# Evaluates the whole rotation curve (in radians) for a capture value
+# Returns the key times and the key values
+#######################################################################
+def evaluate_rotation_curve(capture_frames, capture_morph_name, strength_multiplier, value_shift, smooth, capture_timeline):
+	key_times = capture_timeline.key_times
+	strength = capture_frames.column(capture_morph_name).astype(numpy.float64)
+	
+	#get the strength (smooth style) at each scene frame
+	strength = smooth_values(strength, smooth)
+	strength = capture_timeline.sample(strength)
+	
+	return key_times, get_rotation_values(strength, strength_multiplier, value_shift)
+
+#######################################################################
+# Evaluates the rotation track (radians) of an item in one pass
+# axis_rows are the mapping rows of the X, Y and Z axes (None for an
+# unmapped axis, keyed as 0). The axes are sampled together and converted
+# in one go, then unwrapped so the track never jumps by a full turn.
+# Returns the key times and the rotation values (a row per axis)
+#######################################################################
+def evaluate_rotation_track(capture_frames, axis_rows, capture_timeline):
+	key_times = capture_timeline.key_times
+	strength = numpy.zeros((len(ROTATION_AXES), len(key_times)), dtype=numpy.float64)
+	strength_multipliers = numpy.zeros((len(ROTATION_AXES), 1), dtype=numpy.float64)
+	value_shifts = numpy.zeros((len(ROTATION_AXES), 1), dtype=numpy.float64)
+	for axis_index, mapping_row in enumerate(axis_rows):
+		if mapping_row == None:
+			continue
+		#get the strength (smooth style) of the axis at each scene frame
+		strength[axis_index] = capture_timeline.sample(smooth_values(capture_frames.column(mapping_row.name).astype(numpy.float64), mapping_row.smooth))
+		strength_multipliers[axis_index] = mapping_row.multiplier
+		value_shifts[axis_index] = mapping_row.value_shift
+
+	return key_times, unwrap_rotation_track(get_rotation_values(strength, strength_multipliers, value_shifts))
+
+#######################################################################
+# Gets the rotation track of an item from the curves of a curve source
+# (as evaluate_rotation_track, for curve sources without rotation_track)
+#######################################################################
+def stack_rotation_track(curve_source, axis_rows):
+	curves = [curve_source.curve(mapping_row) if mapping_row != None else None for mapping_row in axis_rows]
+	key_times = next(curve[0] for curve in curves if curve != None)
+	track = numpy.zeros((len(ROTATION_AXES), len(key_times)), dtype=numpy.float64)
+	for axis_index, curve in enumerate(curves):
+		if curve != None:
+			track[axis_index] = curve[1]
+	return key_times, unwrap_rotation_track(track)
+
+#######################################################################
+# Unwraps a rotation track (steps of more than half a turn between
+# frames are taken the short way round), as it is when it needs none
+#######################################################################
+def unwrap_rotation_track(track):
+	if track.shape[1] < 2 or not (numpy.abs(numpy.diff(track, axis=1)) > numpy.pi).any():
+		return track
+	return numpy.unwrap(track, axis=1)
+
+#######################################################################
+# Gets the rotation matrices (frames x 3 x 3) of a rotation track
+# order is the order the axes are applied in (xyz: X first, then Y, then Z)
+#######################################################################
+def get_rotation_matrices(track, order):
+	frame_count = track.shape[1]
+	matrices = numpy.tile(numpy.eye(3), (frame_count, 1, 1))
+	for axis_name in order:
+		axis_index = 'xyz'.index(axis_name)
+		first, second = [index for index in range(3) if index != axis_index]
+		cosines = numpy.cos(track[axis_index])
+		sines = numpy.sin(track[axis_index])
+		axis_matrices = numpy.tile(numpy.eye(3), (frame_count, 1, 1))
+		axis_matrices[:, first, first] = cosines
+		axis_matrices[:, second, second] = cosines
+		#the sign of the sine flips for the Y axis (right handed)
+		sign = -1.0 if axis_index == 1 else 1.0
+		axis_matrices[:, first, second] = -sign * sines
+		axis_matrices[:, second, first] = sign * sines
+		matrices = numpy.matmul(axis_matrices, matrices)
+	return matrices
+
+#######################################################################
+# Gets the rotation track (a row per axis, X Y Z) of rotation matrices in the order
+#######################################################################
+def get_rotation_track(matrices, order):
+	first, second, third = ['xyz'.index(axis_name) for axis_name in order]
+	parity = 1.0 if order in ('xyz', 'yzx', 'zxy') else -1.0
+	track = numpy.zeros((3, len(matrices)), dtype=numpy.float64)
+	track[second] = numpy.arcsin(numpy.clip(-parity * matrices[:, third, first], -1, 1))
+	track[first] = numpy.arctan2(parity * matrices[:, third, second], matrices[:, third, third])
+	track[third] = numpy.arctan2(parity * matrices[:, second, first], matrices[:, first, first])
+	return track
+
+#######################################################################
+# Converts a rotation track from one rotation order to another
+# (the same orientation at every frame, unwrapped)
+#######################################################################
+def convert_rotation_order(track, from_order, to_order):
+	if from_order == to_order or track.shape[1] == 0:
+		return track
+	return unwrap_rotation_track(get_rotation_track(get_rotation_matrices(track, from_order), to_order))
+
+#######################################################################
+# Reduces the keys of a curve (Ramer-Douglas-Peucker)
+# Keys are dropped while the linear curve through the kept keys stays within
+# the tolerance of every dropped value
+#######################################################################
+def reduce_curve(key_times, key_values, tolerance):
+	key_count = len(key_values)
+	if tolerance <= 0 or key_count < 3:
+		return key_times, key_values
+
+	keep = numpy.zeros(key_count, dtype=bool)
+	keep[0] = True
+	keep[-1] = True
+	segments = [(0, key_count - 1)]
+	while len(segments) > 0:
+		start, end = segments.pop()
+		if end - start < 2:
+			continue
+		#distance of the inner keys from the line between the start and end keys
+		slope = (key_values[end] - key_values[start]) / (key_times[end] - key_times[start])
+		line_values = key_values[start] + slope * (key_times[start + 1:end] - key_times[start])
+		errors = numpy.abs(key_values[start + 1:end] - line_values)
+		split = int(numpy.argmax(errors))
+		if errors[split] > tolerance:
+			split += start + 1
+			keep[split] = True
+			segments.append((start, split))
+			segments.append((split, end))
+
+	return key_times[keep], key_values[keep]
+
+#######################################################################
+# Evaluated curve cache
+# Keeps evaluated curves (a tuple of arrays and counts) by key, so every
+# distinct curve is worked out once however many targets share it. The
+# least recently used curves are dropped once the arrays held pass
+# max_bytes (a curve larger than that is never kept).
+#######################################################################
+class CurveCache(object):
+	def __init__(self, max_bytes=CURVE_CACHE_BYTES):
+		self.max_bytes = max_bytes
+		self.curves = OrderedDict()
+		self.size = 0
+		self.hit_count = 0
+		self.miss_count = 0
+
+	def __len__(self):
+		return len(self.curves)
+
+	#gets the curve for the key, working it out with evaluate() when not cached
+	def get(self, curve_key, evaluate):
+		if curve_key in self.curves:
+			self.hit_count += 1
+			#mark the curve as used
+			curve, curve_size = self.curves.pop(curve_key)
+			self.curves[curve_key] = (curve, curve_size)
+			return curve
+
+		self.miss_count += 1
+		curve = evaluate()
+		curve_size = sum(part.nbytes for part in curve if isinstance(part, numpy.ndarray))
+		if curve_size <= self.max_bytes:
+			self.curves[curve_key] = (curve, curve_size)
+			self.size += curve_size
+			while self.size > self.max_bytes:
+				self.size -= self.curves.popitem(last=False)[1][1]
+		return curve
+
+	def clear(self):
+		self.curves.clear()
+		self.size = 0
+
+#######################################################################
+# Evaluates the curves of mapping rows from the capture
+# Curves are cached by the mapping row's curve key (the neutral and
+# timeline are the evaluator's own), so the rows of a multi-target
+# mapping, or several bindings of one row, share one evaluation
+#######################################################################
+class CurveEvaluator(object):
+	def __init__(self, capture_frames, face_neutral, capture_timeline, curve_cache=None):
+		self.capture_frames = capture_frames
+		self.face_neutral = face_neutral
+		self.capture_timeline = capture_timeline
+		self.curve_cache = curve_cache if curve_cache != None else CurveCache()
+
+	#gets the key times and values for the mapping row (radians for Item rows)
+	def curve(self, mapping_row):
+		return self.curve_cache.get(mapping_row.curve_key(), lambda: self.evaluate(mapping_row))
+
+	#gets the key times and rotation track of an item's X, Y and Z mapping rows (see evaluate_rotation_track)
+	def rotation_track(self, axis_rows):
+		track_key = tuple(mapping_row.curve_key() if mapping_row != None else None for mapping_row in axis_rows)
+		return self.curve_cache.get(track_key, lambda: evaluate_rotation_track(self.capture_frames, axis_rows, self.capture_timeline))
+
+	#works out the key times and values for the mapping row (not cached)
+	def evaluate(self, mapping_row):
+		if mapping_row.axis != None:
+			return evaluate_rotation_curve(self.capture_frames, mapping_row.name, mapping_row.multiplier, mapping_row.value_shift, mapping_row.smooth, self.capture_timeline)
+		return evaluate_channel_curve(self.capture_frames, mapping_row.name, mapping_row.multiplier, mapping_row.value_shift, mapping_row.smooth, self.face_neutral, self.capture_timeline)
+
+#######################################################################
+# Gets the frames kept when keying every frame_step-th frame of
+# frame_count frames (the last frame is always kept, so the preview
+# ends where the take does)
+#######################################################################
+def get_decimated_frames(frame_count, frame_step):
+	frames = numpy.arange(0, frame_count, max(int(frame_step), 1))
+	if frame_count > 0 and frames[-1] != frame_count - 1:
+		frames = numpy.append(frames, frame_count - 1)
+	return frames
+
+#######################################################################
+# Curve source that keys every frame_step-th frame of another curve
+# source (a CurveEvaluator or BakedCurves), for a quick preview of the take
+#######################################################################
+class DecimatedCurves(object):
+	def __init__(self, curve_source, frame_step):
+		self.curve_source = curve_source
+		self.frame_step = max(int(frame_step), 1)
+
+	def curve(self, mapping_row):
+		key_times, key_values = self.curve_source.curve(mapping_row)
+		frames = get_decimated_frames(len(key_times), self.frame_step)
+		return key_times[frames], key_values[frames]
+
+	def rotation_track(self, axis_rows):
+		if hasattr(self.curve_source, 'rotation_track'):
+			key_times, track = self.curve_source.rotation_track(axis_rows)
+		else:
+			key_times, track = stack_rotation_track(self.curve_source, axis_rows)
+		frames = get_decimated_frames(len(key_times), self.frame_step)
+		return key_times[frames], track[:, frames]
@@ -0,0 +1,219 @@
+# python
+#######################################################################
+# Applicator Kit for Modo: capture index
+# Indexes a capture file once (the byte offset of every line and the
+# capture time of every frame) and keeps the index in the index folder,
+# so a section of a long take (in and out timecodes or frames) is read
+# and applied without touching the rest of the file
+#
+# © Copyright 2020 All Rights Reserved: Chameleon-Workshop.com
+#######################################################################
+import hashlib
+import json
+import numpy
+import os
+import os.path
+
+from .cache import get_file_hash
+from .capture import CAPTURE_FPS, get_timecode_rate, get_timecode_seconds, get_timecode_times, open_capture_reader
+
+#Declare CONSTANTS (so to speak)
+CAPTURE_INDEX_PATH = os.path.join(os.path.expanduser('~'), '.applicator_kit', 'index')
+CAPTURE_INDEX_VERSION = 1
+CAPTURE_INDEX_EXTENSION = '.npz'
+
+#######################################################################
+# Checks if a capture position (in or out) is blank (the start or end of the take)
+#######################################################################
+def is_blank_position(capture_position):
+	return capture_position == None or str(capture_position).strip() == ''
+
+#######################################################################
+# Gets the frame number of a capture position that is not a timecode
+# Raises ValueError when it is not a number
+#######################################################################
+def get_position_frame(capture_position):
+	try:
+		return int(capture_position)
+	except ValueError:
+		raise ValueError('Not a timecode or frame number: ' + capture_position)
+
+#######################################################################
+# Capture index
+# line_offsets: the byte offset of every line of the file (see CaptureReader)
+# row_times: the capture time of every row after the header (in seconds
+# from the first frame, NaN for rows that are not frames)
+# timecode_rate and start_seconds: the rate of the take's timecodes and
+# the time of day of its first frame (None when the timecodes are unusable)
+# source: the size, modified time and content hash of the indexed file
+#######################################################################
+class CaptureIndex(object):
+	def __init__(self, line_offsets, row_times, timecode_rate=None, start_seconds=None, source=None):
+		self.line_offsets = line_offsets
+		self.row_times = row_times
+		self.timecode_rate = timecode_rate
+		self.start_seconds = start_seconds
+		self.source = dict(source) if source != None else {}
+		self.frame_rows = numpy.flatnonzero(~numpy.isnan(row_times))
+		self.frame_times = row_times[self.frame_rows]
+
+	def __len__(self):
+		return len(self.row_times)
+
+	#indexes the file of the capture reader (the timecodes are read, the values are not converted)
+	@classmethod
+	def build(cls, capture_reader, source=None):
+		timecodes = capture_reader.read_timecodes()
+		frame_rows = [row for row, timecode in enumerate(timecodes) if timecode != None]
+		frame_timecodes = [timecodes[row] for row in frame_rows]
+		row_times = numpy.full(len(timecodes), numpy.nan)
+		row_times[frame_rows] = get_timecode_times(frame_timecodes)
+
+		#the timecodes can be looked up when they are the ones the capture times came from
+		timecode_rate = None
+		start_seconds = None
+		try:
+			timecode_parts = numpy.array([timecode.replace(';', ':').split(':') for timecode in frame_timecodes], dtype=numpy.float64)
+			if timecode_parts.ndim == 2 and timecode_parts.shape[1] == 4:
+				timecode_rate = get_timecode_rate(timecode_parts)
+			else:
+				timecode_rate = CAPTURE_FPS
+			start_seconds = get_timecode_seconds(frame_timecodes[0], timecode_rate)
+			last_seconds = get_timecode_seconds(frame_timecodes[-1], timecode_rate)
+			if abs((last_seconds - start_seconds) % 86400 - row_times[frame_rows[-1]] % 86400) > 1e-6:
+				timecode_rate = None
+		except (ValueError, IndexError):
+			timecode_rate = None
+		if timecode_rate == None:
+			start_seconds = None
+
+		return cls(numpy.asarray(capture_reader.line_offsets, dtype=numpy.int64), row_times, timecode_rate, start_seconds, source)
+
+	#gets the capture time (in seconds from the first frame) of a timecode
+	def get_timecode_time(self, timecode):
+		if self.timecode_rate == None:
+			raise ValueError('The capture file has no usable timecodes, use frame numbers')
+		capture_time = get_timecode_seconds(timecode, self.timecode_rate) - self.start_seconds
+		#the take may run past midnight
+		if capture_time < -43200:
+			capture_time += 86400
+		return capture_time
+
+	#gets the rows (start, stop) from capture_in to capture_out (included)
+	#each is a frame number (a row after the header, as skip frames counts them),
+	#a timecode (the first frame at or after it for in, the last at or before it for out)
+	#or blank (the start or end of the take)
+	#raises ValueError for a position that is not a frame number or timecode, or an empty range
+	def get_frame_range(self, capture_in=None, capture_out=None):
+		start = 0
+		stop = len(self)
+		if not is_blank_position(capture_in):
+			capture_in = str(capture_in).strip()
+			if ':' in capture_in:
+				frame = int(numpy.searchsorted(self.frame_times, self.get_timecode_time(capture_in) - 1e-6, side='left'))
+				start = self.frame_rows[frame] if frame < len(self.frame_rows) else len(self)
+			else:
+				start = min(max(get_position_frame(capture_in), 0), len(self))
+		if not is_blank_position(capture_out):
+			capture_out = str(capture_out).strip()
+			if ':' in capture_out:
+				frame = int(numpy.searchsorted(self.frame_times, self.get_timecode_time(capture_out) + 1e-6, side='right')) - 1
+				stop = self.frame_rows[frame] + 1 if frame >= 0 else 0
+			else:
+				stop = min(max(get_position_frame(capture_out) + 1, 0), len(self))
+
+		if start >= stop:
+			raise ValueError('No capture frames from ' + (capture_in if not is_blank_position(capture_in) else 'the start')
+				+ ' to ' + (capture_out if not is_blank_position(capture_out) else 'the end') + ' (the take has ' + str(len(self)) + ' frames)')
+		return int(start), int(stop)
+
+	#gets the capture times of the frames from start to stop (in seconds from the first of them)
+	def get_times(self, start, stop):
+		capture_times = self.row_times[start:stop]
+		capture_times = capture_times[~numpy.isnan(capture_times)]
+		if len(capture_times) > 0:
+			capture_times = capture_times - capture_times[0]
+		return capture_times
+
+	#gets the capture index from an index file (None if it cannot be read)
+	@classmethod
+	def load(cls, index_path):
+		try:
+			with numpy.load(index_path, allow_pickle=False) as index_data:
+				metadata = json.loads(str(index_data['metadata']))
+				if metadata.get('version') != CAPTURE_INDEX_VERSION:
+					return None
+				return cls(index_data['line_offsets'], index_data['row_times'], metadata['timecode_rate'], metadata['start_seconds'], metadata['source'])
+		except (IOError, OSError, ValueError, KeyError):
+			return None
+
+	#writes to a temporary file first, so a half written index is never read
+	def save(self, index_path):
+		index_folder = os.path.dirname(index_path)
+		if not os.path.isdir(index_folder):
+			os.makedirs(index_folder)
+		temp_path = index_path + '.' + str(os.getpid()) + '.tmp'
+		metadata = {'version': CAPTURE_INDEX_VERSION, 'timecode_rate': self.timecode_rate, 'start_seconds': self.start_seconds, 'source': self.source}
+		with open(temp_path, 'wb') as index_file:
+			numpy.savez(index_file, line_offsets=self.line_offsets, row_times=self.row_times, metadata=numpy.array(json.dumps(metadata)))
+		if os.path.exists(index_path):
+			os.remove(index_path)
+		os.rename(temp_path, index_path)
+		return index_path
+
+#######################################################################
+# Gets the index of a capture file
+# The index is kept in index_folder (named after the hash of the capture
+# path) and used while the file's size and modified time match. If only
+# the modified time changed the content hash decides, anything else
+# indexes the file again.
+#######################################################################
+def get_capture_index(capture_path, index_folder=None):
+	index_folder = index_folder if index_folder != None else CAPTURE_INDEX_PATH
+	index_key = '|'.join([str(CAPTURE_INDEX_VERSION), os.path.normcase(os.path.abspath(capture_path))])
+	index_path = os.path.join(index_folder, hashlib.sha1(index_key.encode('utf-8')).hexdigest() + CAPTURE_INDEX_EXTENSION)
+	source_stat = os.stat(capture_path)
+
+	capture_index = CaptureIndex.load(index_path)
+	if capture_index != None and capture_index.source.get('size') == source_stat.st_size:
+		if capture_index.source.get('mtime') == source_stat.st_mtime:
+			return capture_index
+		#touched or copied, but the content may be the same
+		if capture_index.source.get('hash') == get_file_hash(capture_path):
+			capture_index.source['mtime'] = source_stat.st_mtime
+			try:
+				capture_index.save(index_path)
+			except (IOError, OSError):
+				pass
+			return capture_index
+
+	source = {'path': os.path.abspath(capture_path), 'size': source_stat.st_size, 'mtime': source_stat.st_mtime, 'hash': get_file_hash(capture_path)}
+	with open_capture_reader(capture_path) as capture_reader:
+		capture_index = CaptureIndex.build(capture_reader, source)
+	try:
+		capture_index.save(index_path)
+	except (IOError, OSError):
+		#the index is only an optimisation (e.g. read-only home folder)
+		pass
+	return capture_index
+
+#######################################################################
+# Gets the capture frames from capture_in to capture_out (see
+# CaptureIndex.get_frame_range) as a CaptureData store
+# Only the rows of the range (after skip_frames) are read, found through
+# the capture index (capture_index, or the file's index in index_folder)
+#######################################################################
+def load_capture_range(capture_path, capture_in=None, capture_out=None, value_width=None, skip_frames=0, capture_index=None, index_folder=None):
+	if capture_index == None:
+		capture_index = get_capture_index(capture_path, index_folder)
+	start, stop = capture_index.get_frame_range(capture_in, capture_out)
+	start = max(start, min(skip_frames, stop))
+
+	with open_capture_reader(capture_path, value_width, line_offsets=capture_index.line_offsets) as capture_reader:
+		capture_data = capture_reader.read(start, stop)
+
+	#the times of the take's timecodes (a short range is too short to tell the timecode rate)
+	capture_times = capture_index.get_times(start, stop)
+	if len(capture_times) == len(capture_data):
+		capture_data.times = capture_times
+	return capture_data
@@ -0,0 +1,116 @@
+# python
+#######################################################################
+# Applicator Kit for Modo: keyframe sink
+#
+# © Copyright 2020 All Rights Reserved: Chameleon-Workshop.com
+#######################################################################
+from collections import OrderedDict
+
+from .progress import WRITE_CHUNK_KEYS
+
+#######################################################################
+# Gets the id of a channel (its item's id and its name)
+#######################################################################
+def get_channel_id(channel):
+	return channel.item.id, channel.name
+
+#######################################################################
+# Keyframe sink
+# Collects the whole curve of each channel and hands them to the backend in bulk
+# (flushing early once max_pending_keys are waiting to be written)
+# Curves that had keys dropped by reduce_curve are keyed with linear interpolation
+# The keys are written in chunks of about chunk_keys keys (a chunk can
+# hold several channels, or part of one), advancing progress (ApplyProgress)
+# by a unit per channel, so an apply can be cancelled between chunks.
+# With keep_snapshots the envelope a channel had before it was first
+# cleared or written (its keys with their interpolation and slopes, read
+# through the backend) is kept, so roll_back can put it back as it was.
+#######################################################################
+class KeyframeSink(object):
+	def __init__(self, backend, action_name=None, max_pending_keys=2000000, progress=None, keep_snapshots=False, chunk_keys=WRITE_CHUNK_KEYS):
+		self.backend = backend
+		self.action_name = action_name
+		self.max_pending_keys = max_pending_keys
+		self.progress = progress
+		self.keep_snapshots = keep_snapshots
+		self.chunk_keys = max(chunk_keys, 1)
+		self.curves = []
+		self.pending_keys = 0
+		self.channel_count = 0
+		self.key_count = 0
+		self.dropped_key_count = 0
+		#channel id > (channel, the backend's envelope before the apply, None if it had no keys)
+		self.snapshots = OrderedDict()
+		#the ids of the channels whose keys are all written
+		self.written_channels = set()
+
+	def add_curve(self, channel, key_times, key_values, dropped_key_count=0):
+		self.curves.append((channel, key_times, key_values, dropped_key_count > 0))
+		self.pending_keys += len(key_values)
+		self.dropped_key_count += dropped_key_count
+		if self.pending_keys >= self.max_pending_keys:
+			self.flush()
+
+	#keeps the envelopes of the channels (the first time each is seen)
+	def snapshot(self, channels):
+		for channel in channels:
+			channel_id = get_channel_id(channel)
+			if channel_id not in self.snapshots:
+				self.snapshots[channel_id] = (channel, self.backend.read_envelope(channel, self.action_name))
+
+	#removes all the keys of the channels
+	def clear_channels(self, channels):
+		if self.keep_snapshots == True:
+			self.snapshot(channels)
+		self.backend.clear_channels(channels, self.action_name)
+
+	def flush(self):
+		curves = self.curves
+		self.curves = []
+		self.pending_keys = 0
+		if self.keep_snapshots == True:
+			self.snapshot([channel for channel, key_times, key_values, linear in curves])
+
+		chunk = []
+		chunk_key_count = 0
+		chunk_units = 0.0
+		chunk_channels = []
+		for curve_index, (channel, key_times, key_values, linear) in enumerate(curves):
+			key_count = len(key_values)
+			start = 0
+			while True:
+				stop = min(start + self.chunk_keys - chunk_key_count, key_count)
+				chunk.append((channel, key_times[start:stop], key_values[start:stop], linear))
+				chunk_key_count += stop - start
+				chunk_units += float(stop - start) / key_count if key_count > 0 else 1.0
+				if stop == key_count:
+					chunk_channels.append(channel)
+				if chunk_key_count >= self.chunk_keys or (stop == key_count and curve_index == len(curves) - 1):
+					self._write_chunk(chunk, chunk_key_count, chunk_channels, chunk_units)
+					chunk = []
+					chunk_key_count = 0
+					chunk_units = 0.0
+					chunk_channels = []
+				start = stop
+				if start >= key_count:
+					break
+
+	def _write_chunk(self, chunk, key_count, channels, units):
+		self.backend.write_curves(chunk, self.action_name)
+		self.key_count += key_count
+		self.channel_count += len(channels)
+		self.written_channels.update(get_channel_id(channel) for channel in channels)
+		if self.progress != None:
+			self.progress.advance(units)
+
+	#puts back the envelopes the channels cleared or written had before (see keep_snapshots)
+	def roll_back(self):
+		self.curves = []
+		self.pending_keys = 0
+		snapshots = list(self.snapshots.values())
+		self.backend.clear_channels([channel for channel, envelope in snapshots], self.action_name)
+		restore_envelopes = [(channel, envelope) for channel, envelope in snapshots if envelope != None]
+		if len(restore_envelopes) > 0:
+			self.backend.write_envelopes(restore_envelopes, self.action_name)
+		self.snapshots = OrderedDict()
+		self.written_channels = set()
@@ -0,0 +1,95 @@
+# python
+#######################################################################
+# Applicator Kit for Modo: apply manifest
+# Remembers, per target (item or actor and action) of a scene, which
+# channels were keyed and a hash of the inputs of each channel's curve,
+# so a later apply can re-key only the channels whose inputs changed and
+# clear the channels that are no longer mapped
+#
+# © Copyright 2020 All Rights Reserved: Chameleon-Workshop.com
+#######################################################################
+import hashlib
+import json
+import os
+import os.path
+
+#Declare CONSTANTS (so to speak)
+MANIFEST_PATH = os.path.join(os.path.expanduser('~'), '.applicator_kit', 'manifests')
+MANIFEST_VERSION = 1
+
+#######################################################################
+# Gets the hash (SHA-1) of the input values (anything json can write)
+#######################################################################
+def get_input_hash(*inputs):
+	return hashlib.sha1(json.dumps(inputs, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+#######################################################################
+# Gets the key of a target: the root item and the action keyed (None for the edit layer)
+#######################################################################
+def get_target_key(root_item_id, action_name=None):
+	return str(root_item_id) + '|' + (action_name if action_name != None else '')
+
+#######################################################################
+# A channel keyed by an apply: the item id, the channel name and the input hash
+#######################################################################
+class ManifestChannel(object):
+	def __init__(self, item_id, channel_name, input_hash):
+		self.item_id = item_id
+		self.channel_name = channel_name
+		self.input_hash = input_hash
+
+	def to_dict(self):
+		return {'item': self.item_id, 'channel': self.channel_name, 'hash': self.input_hash}
+
+	@staticmethod
+	def from_dict(data):
+		return ManifestChannel(data['item'], data['channel'], data['hash'])
+
+#######################################################################
+# Apply manifest of a scene
+# targets: target key > channel key > ManifestChannel
+# Saved as a json file named after the hash of the scene path
+#######################################################################
+class ApplyManifest(object):
+	def __init__(self, scene_path, manifest_folder=None):
+		self.scene_path = os.path.normcase(os.path.abspath(scene_path))
+		self.manifest_folder = manifest_folder if manifest_folder != None else MANIFEST_PATH
+		self.manifest_path = os.path.join(self.manifest_folder, hashlib.sha1(self.scene_path.encode('utf-8')).hexdigest() + '.json')
+		self.targets = {}
+
+	#gets the manifest of the scene (empty if there is none, or it cannot be read)
+	@classmethod
+	def load(cls, scene_path, manifest_folder=None):
+		manifest = cls(scene_path, manifest_folder)
+		try:
+			with open(manifest.manifest_path) as manifest_file:
+				data = json.load(manifest_file)
+			if data.get('version') == MANIFEST_VERSION and data.get('scene') == manifest.scene_path:
+				for target_key, channels in data['targets'].items():
+					manifest.targets[target_key] = dict((channel_key, ManifestChannel.from_dict(channel)) for channel_key, channel in channels.items())
+		except (IOError, OSError, ValueError, KeyError):
+			manifest.targets = {}
+		return manifest
+
+	def channels(self, target_key):
+		return self.targets.get(target_key, {})
+
+	def set_channels(self, target_key, channels):
+		self.targets[target_key] = dict(channels)
+
+	def forget(self, target_key):
+		self.targets.pop(target_key, None)
+
+	#writes to a temporary file first, so a half written manifest is never read
+	def save(self):
+		if not os.path.isdir(self.manifest_folder):
+			os.makedirs(self.manifest_folder)
+		temp_path = self.manifest_path + '.' + str(os.getpid()) + '.tmp'
+		with open(temp_path, 'w') as manifest_file:
+			json.dump({'version': MANIFEST_VERSION, 'scene': self.scene_path, 'targets': dict((target_key,
+				dict((channel_key, channel.to_dict()) for channel_key, channel in channels.items())) for target_key, channels in self.targets.items())},
+				manifest_file, sort_keys=True)
+		if os.path.exists(self.manifest_path):
+			os.remove(self.manifest_path)
+		os.rename(temp_path, self.manifest_path)
+		return self.manifest_path
@@ -0,0 +1,183 @@
+# python
+#######################################################################
+# Applicator Kit for Modo: mapping file
+#
+# © Copyright 2020 All Rights Reserved: Chameleon-Workshop.com 
+#######################################################################
+import csv
+
+from .smoothing import get_smooth_spec
+
+#Declare CONSTANTS (so to speak)
+BLEND_TARGET_MORPH = 'Morph'
+BLEND_TARGET_CHANNEL = 'Channel'
+
+#######################################################################
+# Gets the rows of a csv file as list of dictionary items
+#######################################################################
+def list_csv_data(csv_path):
+	result = []
+	with open(csv_path) as csv_file:
+		csv_reader = csv.DictReader(csv_file, delimiter=',')
+		for row in csv_reader:
+			result.append(row)
+	return result
+
+#######################################################################
+# Gets the key reduction tolerance from the mapping file's Tolerance value
+# (blank or 0 keeps a key on every frame)
+#######################################################################
+def get_tolerance(tolerance):
+	tolerance = (tolerance or '').strip()
+	if tolerance == '':
+		return 0.0
+	return max(float(tolerance), 0.0)
+
+#######################################################################
+# A mapping file row, ready to apply
+# target_channel is only set for Channel BlendShape rows and axis for Item rows
+#######################################################################
+class MappingRow(object):
+	def __init__(self, row_type, name, target, target_channel, axis, multiplier, value_shift, smooth, tolerance):
+		self.row_type = row_type
+		self.name = name
+		self.target = target
+		self.target_channel = target_channel
+		self.axis = axis
+		self.multiplier = multiplier
+		self.value_shift = value_shift
+		self.smooth = smooth
+		self.tolerance = tolerance
+
+	#the values that decide the row's curve (rows with the same key have the same curve)
+	def curve_key(self):
+		return (self.axis != None, self.name, self.multiplier, self.value_shift, self.smooth)
+
+	def to_dict(self):
+		return {'Type': self.row_type, 'Name': self.name, 'Target': self.target, 'TargetChannel': self.target_channel, 'Axis': self.axis,
+			'Multiplier': self.multiplier, 'ValueShift': self.value_shift, 'Smooth': self.smooth, 'Tolerance': self.tolerance}
+
+	@staticmethod
+	def from_dict(row):
+		smooth = row['Smooth']
+		if smooth != None:
+			smooth = (smooth[0], tuple(smooth[1]))
+		return MappingRow(row['Type'], row['Name'], row['Target'], row['TargetChannel'], row['Axis'], row['Multiplier'], row['ValueShift'], smooth, row['Tolerance'])
+
+#######################################################################
+# The compiled mapping
+# Enabled rows indexed by their (upper case) target for O(1) lookups:
+#   morphs: morph name > row (only the first row is applied to a morph)
+#   channels: item name > rows (Channel BlendShape target type)
+#   channels_by_name: (item name, channel name) > rows
+#   items: item name > rotation rows
+# errors lists the malformed rows that were skipped
+#######################################################################
+class CompiledMapping(object):
+	def __init__(self):
+		self.morphs = {}
+		self.channels = {}
+		self.channels_by_name = {}
+		self.items = {}
+		self.errors = []
+
+	def add_morph(self, mapping_row):
+		self.morphs.setdefault(mapping_row.target.upper(), mapping_row)
+
+	def add_channel(self, mapping_row):
+		self.channels.setdefault(mapping_row.target.upper(), []).append(mapping_row)
+		self.channels_by_name.setdefault((mapping_row.target.upper(), mapping_row.target_channel.upper()), []).append(mapping_row)
+
+	def add_item(self, mapping_row):
+		self.items.setdefault(mapping_row.target.upper(), []).append(mapping_row)
+
+	def add_row(self, mapping_row):
+		if mapping_row.axis != None:
+			self.add_item(mapping_row)
+		elif mapping_row.target_channel != None:
+			self.add_channel(mapping_row)
+		else:
+			self.add_morph(mapping_row)
+
+	#all the rows (morphs, channels then items)
+	def rows(self):
+		result = list(self.morphs.values())
+		for mapping_rows in self.channels.values():
+			result.extend(mapping_rows)
+		for mapping_rows in self.items.values():
+			result.extend(mapping_rows)
+		return result
+
+	def row_count(self):
+		return len(self.morphs) + sum(len(rows) for rows in self.channels.values()) + sum(len(rows) for rows in self.items.values())
+
+#######################################################################
+# Transforms the mapping data into the compiled mapping
+#######################################################################
+def get_maps(data_morph_names, data_item_names, mapping_data, blend_target_type):
+	result = CompiledMapping()
+	
+	#If not mapping file provided, create mapping data that will just pass the data through as is
+	if mapping_data == None:
+		mapping_data = []
+		#add the BlendShapes
+		for data_morph_name in data_morph_names:
+			mapping_data.append({'Type':'BlendShape', 'Name': data_morph_name, 'Target':data_morph_name, 'Enabled':'Y', 'Multiplier':'1', 'ValueShift':'0', 'Smooth':'N', 'Tolerance':'0'})
+
+		#add the items
+		for data_item_name in data_item_names:
+			target_name = data_item_name.replace('Yaw', '').replace('Pitch', '').replace('Roll', '')
+			axis = data_item_name.replace('Head','').replace('LeftEye','').replace('RightEye','').replace('Yaw', 'Y').replace('Pitch', 'X').replace('Roll', 'Z')
+			mapping_data.append({'Type':'Item', 'Name': data_item_name, 'Target':target_name + '.' + axis, 'Enabled':'Y', 'Multiplier':'1', 'ValueShift':'0', 'Smooth':'N', 'Tolerance':'0'})
+
+	for row_number, mapping in enumerate(mapping_data, 2):
+		row_type = (mapping.get('Type') or '').strip()
+		name = (mapping.get('Name') or '').strip()
+		target = (mapping.get('Target') or '').strip()
+
+		#skip disabled and untargeted rows
+		if (mapping.get('Enabled') or '').strip().upper() != 'Y' or target == '':
+			continue
+
+		#parse the values
+		try:
+			multiplier = float(mapping.get('Multiplier') or 1)
+			value_shift = float(mapping.get('ValueShift') or 0)
+			smooth = get_smooth_spec(mapping.get('Smooth'))
+			tolerance = get_tolerance(mapping.get('Tolerance'))
+		except ValueError as error:
+			result.errors.append('Row ' + str(row_number) + ' (' + name + '): ' + str(error))
+			continue
+
+		if row_type == 'BlendShape':
+			if name not in data_morph_names:
+				result.errors.append('Row ' + str(row_number) + ': Unknown BlendShape "' + name + '"')
+				continue
+			#we can target the same item to multiple targets
+			for target_part in target.split('|'):
+				target_part = target_part.strip()
+				if blend_target_type == BLEND_TARGET_MORPH:
+					result.add_morph(MappingRow(row_type, name, target_part, None, None, multiplier, value_shift, smooth, tolerance))
+				elif blend_target_type == BLEND_TARGET_CHANNEL:
+					channel_parts = target_part.split('.')
+					if len(channel_parts) != 2 or channel_parts[0] == '' or channel_parts[1] == '': #got to make sure it is in the format <item>.<channel>
+						result.errors.append('Row ' + str(row_number) + ' (' + name + '): Channel target "' + target_part + '" is not <item>.<channel>')
+						continue
+					result.add_channel(MappingRow(row_type, name, channel_parts[0], channel_parts[1], None, multiplier, value_shift, smooth, tolerance))
+
+		elif row_type == 'Item':
+			if name not in data_item_names:
+				result.errors.append('Row ' + str(row_number) + ': Unknown Item "' + name + '"')
+				continue
+			#targets are in the format <item>.<axis>
+			axis = target[-1:].upper()
+			if len(target) < 3 or target[-2:-1] != '.' or axis not in ('X', 'Y', 'Z'):
+				result.errors.append('Row ' + str(row_number) + ' (' + name + '): Item target "' + target + '" is not <item>.<X|Y|Z>')
+				continue
+			result.add_item(MappingRow(row_type, name, target[:-2], None, axis, multiplier, value_shift, smooth, tolerance))
+
+		else:
+			result.errors.append('Row ' + str(row_number) + ': Unknown Type "' + row_type + '"')
+
+	return result
+	
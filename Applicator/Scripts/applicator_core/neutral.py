@@ -0,0 +1,214 @@
+# python
+#######################################################################
+# Applicator Kit for Modo: face neutral
+#
+# © Copyright 2020 All Rights Reserved: Chameleon-Workshop.com
+#######################################################################
+import json
+import numpy
+import os
+import os.path
+import re
+
+from .capture import CAPTURE_FPS, load_capture_data
+
+#Declare CONSTANTS (so to speak)
+NEUTRAL_MEAN = 'mean'
+NEUTRAL_MEDIAN = 'median'
+NEUTRAL_TRIMMED_MEAN = 'trimmed'
+NEUTRAL_STATISTICS = (NEUTRAL_MEAN, NEUTRAL_MEDIAN, NEUTRAL_TRIMMED_MEAN)
+NEUTRAL_STATISTIC_LABELS = {'Mean': NEUTRAL_MEAN, 'Median': NEUTRAL_MEDIAN, 'Trimmed Mean': NEUTRAL_TRIMMED_MEAN}
+NEUTRAL_TRIM = 0.1
+NEUTRAL_AUTO_FRAMES = int(CAPTURE_FPS)
+NEUTRAL_PROFILE_PATH = os.path.join(os.path.expanduser('~'), '.applicator_kit', 'neutrals')
+NEUTRAL_PROFILE_EXTENSION = '.json'
+
+#######################################################################
+# Named face neutral (e.g. per performer)
+# values maps each BlendShape to its neutral value, statistic, window
+# and source record how it was worked out
+#######################################################################
+class NeutralProfile(object):
+	def __init__(self, name, values, statistic=NEUTRAL_MEAN, window=None, source=None):
+		self.name = name
+		self.values = values
+		self.statistic = statistic
+		self.window = window
+		self.source = source
+
+	def to_dict(self):
+		return {'name': self.name, 'values': self.values, 'statistic': self.statistic,
+			'window': list(self.window) if self.window != None else None, 'source': self.source}
+
+	@classmethod
+	def from_dict(cls, data):
+		return cls(data['name'], { name : float(value) for name, value in data['values'].items() },
+			data.get('statistic', NEUTRAL_MEAN), data.get('window'), data.get('source'))
+
+#######################################################################
+# Gets the frames (start, end) the neutral is worked out over
+# window is a (start, end) frame range, by default the middle third
+#######################################################################
+def get_neutral_window(frame_count, window=None):
+	if window == None:
+		frame_start = int(frame_count / 3)
+		return frame_start, frame_start * 2
+	frame_start = min(max(int(window[0]), 0), frame_count)
+	frame_end = min(max(int(window[1]), frame_start), frame_count)
+	return frame_start, frame_end
+
+#######################################################################
+# gets the face zero data
+# ARKit picks up the captured face's neautral weights differently
+# so this is used to offset thoes charcteristics and give a more natral result
+# the zero value is the statistic (mean, median or trimmed mean) of the
+# clamped values over the window (by default the middle third of the frames)
+# if no zero face frames are provide, then it will default to 0
+#######################################################################
+def get_face_neutral_from_frames(data_morph_names, face_neutral_frames, statistic=NEUTRAL_MEAN, window=None, trim=NEUTRAL_TRIM):
+	result = { data_morph_name : 0.0 for data_morph_name in data_morph_names }
+	if face_neutral_frames == None:
+		return result
+	if statistic not in NEUTRAL_STATISTICS:
+		raise ValueError('Unknown neutral statistic: ' + str(statistic))
+
+	frame_start, frame_end = get_neutral_window(len(face_neutral_frames), window)
+	morph_names = [data_morph_name for data_morph_name in data_morph_names if data_morph_name in face_neutral_frames]
+	if frame_end <= frame_start or len(morph_names) == 0:
+		return result
+
+	#one clamped (frames x morphs) block for the window
+	columns = [face_neutral_frames.columns[morph_name] for morph_name in morph_names]
+	morph_values = numpy.clip(face_neutral_frames.values[frame_start:frame_end, columns].astype(numpy.float64), 0, 1)
+
+	if statistic == NEUTRAL_MEDIAN:
+		neutral_values = numpy.median(morph_values, axis=0)
+	elif statistic == NEUTRAL_TRIMMED_MEAN:
+		#drop the trim fraction of the lowest and highest values of each morph
+		trim_count = int(len(morph_values) * trim)
+		morph_values = numpy.sort(morph_values, axis=0)[trim_count:len(morph_values) - trim_count]
+		neutral_values = morph_values.mean(axis=0)
+	else:
+		#the frames added up in order (as the original neutral was), then averaged
+		neutral_values = numpy.cumsum(morph_values, axis=0)[-1] / len(morph_values)
+
+	for morph_name, neutral_value in zip(morph_names, neutral_values.tolist()):
+		result[morph_name] = round(neutral_value, 10)
+	return result
+
+#######################################################################
+# Finds the neutral window (start, end) of a capture: the window_frames
+# frames where the face is most still and least active, i.e. the lowest
+# sum over the BlendShapes of the rolling standard deviation plus the
+# rolling mean. The rolling sums come from running totals, so the search
+# is linear in the length of the take.
+# Returns None when the capture is shorter than the window
+#######################################################################
+def find_neutral_window(data_morph_names, capture_frames, window_frames=NEUTRAL_AUTO_FRAMES):
+	frame_count = len(capture_frames)
+	window_frames = max(int(window_frames), 1)
+	morph_names = [data_morph_name for data_morph_name in data_morph_names if data_morph_name in capture_frames]
+	if frame_count < window_frames or len(morph_names) == 0:
+		return None
+
+	#one BlendShape at a time keeps the working arrays to the length of the take
+	window_scores = numpy.zeros(frame_count - window_frames + 1)
+	for morph_name in morph_names:
+		morph_values = numpy.clip(capture_frames.column(morph_name).astype(numpy.float64), 0, 1)
+
+		#running totals of the values and their squares (with a leading 0)
+		value_totals = numpy.concatenate(([0.0], numpy.cumsum(morph_values)))
+		square_totals = numpy.concatenate(([0.0], numpy.cumsum(morph_values * morph_values)))
+
+		#mean and variance of every window
+		window_means = (value_totals[window_frames:] - value_totals[:-window_frames]) / window_frames
+		window_variances = (square_totals[window_frames:] - square_totals[:-window_frames]) / window_frames - window_means * window_means
+		window_scores += numpy.sqrt(numpy.maximum(window_variances, 0)) + window_means
+
+	frame_start = int(numpy.argmin(window_scores))
+	return frame_start, frame_start + window_frames
+
+#######################################################################
+# Gets the path of a neutral profile (names are kept to safe file names)
+#######################################################################
+def get_neutral_profile_path(name, profile_path=None):
+	if profile_path == None:
+		profile_path = NEUTRAL_PROFILE_PATH
+	file_name = re.sub(r'[^\w\- ]', '_', name.strip())
+	return os.path.join(profile_path, file_name + NEUTRAL_PROFILE_EXTENSION)
+
+#######################################################################
+# Saves a neutral profile
+#######################################################################
+def save_neutral_profile(neutral_profile, profile_path=None):
+	neutral_profile_path = get_neutral_profile_path(neutral_profile.name, profile_path)
+	if not os.path.isdir(os.path.dirname(neutral_profile_path)):
+		os.makedirs(os.path.dirname(neutral_profile_path))
+	with open(neutral_profile_path, 'w') as profile_file:
+		json.dump(neutral_profile.to_dict(), profile_file, indent=1, sort_keys=True)
+	return neutral_profile_path
+
+#######################################################################
+# Loads a neutral profile by name
+#######################################################################
+def load_neutral_profile(name, profile_path=None):
+	neutral_profile_path = get_neutral_profile_path(name, profile_path)
+	if not os.path.isfile(neutral_profile_path):
+		raise IOError('Neutral profile not found: ' + name)
+	with open(neutral_profile_path) as profile_file:
+		return NeutralProfile.from_dict(json.load(profile_file))
+
+#######################################################################
+# Gets the names of the saved neutral profiles
+#######################################################################
+def list_neutral_profiles(profile_path=None):
+	if profile_path == None:
+		profile_path = NEUTRAL_PROFILE_PATH
+	if not os.path.isdir(profile_path):
+		return []
+	names = []
+	for file_name in sorted(os.listdir(profile_path)):
+		if file_name.endswith(NEUTRAL_PROFILE_EXTENSION):
+			try:
+				with open(os.path.join(profile_path, file_name)) as profile_file:
+					names.append(json.load(profile_file)['name'])
+			except (IOError, ValueError, KeyError):
+				continue
+	return names
+
+#######################################################################
+# Gets the face neutral for a run as a NeutralProfile
+# From the neutral file when given, otherwise found in the capture frames
+# when neutral_auto is set (see find_neutral_window), and saved as
+# neutral_profile when that is named too. Otherwise from the saved
+# neutral_profile, otherwise 0
+# (a found window is given in capture file frames)
+#######################################################################
+def get_face_neutral(data_morph_names, neutral_path=None, neutral_profile=None, statistic=NEUTRAL_MEAN, window=None, capture_cache=None, neutral_auto=False, capture_frames=None):
+	if neutral_path or (neutral_auto and capture_frames != None):
+		if neutral_path and capture_cache != None:
+			face_neutral_frames = capture_cache.load(neutral_path)
+			source = os.path.abspath(neutral_path)
+		elif neutral_path:
+			face_neutral_frames = load_capture_data(neutral_path)
+			source = os.path.abspath(neutral_path)
+		else:
+			#the window is found in the capture itself
+			face_neutral_frames = capture_frames
+			window = find_neutral_window(data_morph_names, capture_frames)
+			if window == None:
+				window = (0, len(capture_frames))
+			source = None
+		face_neutral = NeutralProfile(neutral_profile, get_face_neutral_from_frames(data_morph_names, face_neutral_frames, statistic, window), statistic, window, source)
+		if source == None:
+			face_neutral.window = (face_neutral_frames.first_frame + window[0], face_neutral_frames.first_frame + window[1])
+		if neutral_profile:
+			save_neutral_profile(face_neutral)
+		return face_neutral
+
+	if neutral_profile:
+		face_neutral = load_neutral_profile(neutral_profile)
+		face_neutral.values = { data_morph_name : face_neutral.values.get(data_morph_name, 0.0) for data_morph_name in data_morph_names }
+		return face_neutral
+
+	return NeutralProfile(None, get_face_neutral_from_frames(data_morph_names, None))
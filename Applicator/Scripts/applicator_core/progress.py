@@ -0,0 +1,56 @@
+# python
+#######################################################################
+# Applicator Kit for Modo: apply progress and cancellation
+#
+# © Copyright 2020 All Rights Reserved: Chameleon-Workshop.com
+#######################################################################
+
+#Declare CONSTANTS (so to speak)
+#the monitor is stepped at most this many times per apply (each step is a cancellation check)
+PROGRESS_STEPS = 200
+#keys written per chunk (between progress steps)
+WRITE_CHUNK_KEYS = 20000
+#what is done with the keys already written when an apply is cancelled
+CANCEL_ROLL_BACK = 'Roll Back'
+CANCEL_KEEP_APPLIED = 'Keep Applied'
+
+#######################################################################
+# Raised when the user cancels an apply (through the progress monitor)
+#######################################################################
+class ApplyCancelled(Exception):
+	pass
+
+#######################################################################
+# Apply progress
+# The work of an apply is counted in units (a curve evaluated, or the
+# keys of a channel written) out of total. The monitor (anything with
+# step(count), returning False once the user cancelled) is stepped
+# only when the work done passes the next of its steps, so reporting
+# costs the same however many units there are.
+# Raises ApplyCancelled from advance once the monitor is cancelled.
+#######################################################################
+class ApplyProgress(object):
+	def __init__(self, total, monitor=None, steps=PROGRESS_STEPS):
+		self.total = max(float(total), 1.0)
+		self.monitor = monitor
+		self.steps = steps
+		self.done = 0.0
+		self.stepped = 0
+		self.cancelled = False
+
+	def advance(self, units=1):
+		self.done += units
+		step = min(int(self.steps * self.done / self.total), self.steps)
+		if step > self.stepped:
+			step_count = step - self.stepped
+			self.stepped = step
+			if self.monitor != None and self.monitor.step(step_count) == False:
+				self.cancelled = True
+		if self.cancelled == True:
+			raise ApplyCancelled()
+
+	#the monitor runs to the end (work counted too high is done)
+	def finish(self):
+		if self.monitor != None and self.stepped < self.steps:
+			self.monitor.step(self.steps - self.stepped)
+		self.stepped = self.steps
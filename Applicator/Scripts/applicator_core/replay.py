@@ -0,0 +1,81 @@
+# python
+#######################################################################
+# Applicator Kit for Modo: Live Link Face replay
+# Sends a recorded capture file as a Live Link Face stream (UDP), to try
+# out live mode without the phone
+#
+# Usage (from the Applicator/Scripts folder):
+#   python -m applicator_core.replay <capture.csv> [--host 127.0.0.1] [--port 11111] [--loop]
+#
+# © Copyright 2020 All Rights Reserved: Chameleon-Workshop.com
+#######################################################################
+import argparse
+import numpy
+import socket
+import sys
+import time
+
+from .capture import CAPTURE_FPS, load_capture_data
+from .stream import LIVE_LINK_NAMES, LIVE_LINK_PORT, encode_live_link_packet
+
+#Declare CONSTANTS (so to speak)
+REPLAY_DEVICE_ID = 'ApplicatorReplay'
+REPLAY_SUBJECT_NAME = 'Replay'
+
+#######################################################################
+# Sends the capture frames at their capture times (scaled by speed)
+# Returns the number of packets sent
+#######################################################################
+def replay_capture(capture_frames, host='127.0.0.1', port=LIVE_LINK_PORT, speed=1.0, loop=False, subject_name=REPLAY_SUBJECT_NAME):
+	#the capture values in packet order (names the capture does not have are sent as 0)
+	values = numpy.zeros((len(capture_frames), len(LIVE_LINK_NAMES)), dtype=numpy.float32)
+	for index, name in enumerate(LIVE_LINK_NAMES):
+		if name in capture_frames:
+			values[:, index] = capture_frames.column(name)
+	capture_times = capture_frames.times / speed
+	rate = (int(round(CAPTURE_FPS)), 1)
+
+	send_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+	packet_count = 0
+	try:
+		while True:
+			start_time = time.time()
+			for frame_index in range(len(capture_frames)):
+				wait_time = start_time + capture_times[frame_index] - time.time()
+				if wait_time > 0:
+					time.sleep(wait_time)
+				packet = encode_live_link_packet(REPLAY_DEVICE_ID, subject_name, packet_count, 0.0, rate, values[frame_index])
+				send_socket.sendto(packet, (host, port))
+				packet_count += 1
+			if loop == False or len(capture_frames) == 0:
+				break
+	finally:
+		send_socket.close()
+	return packet_count
+
+#######################################################################
+# Replays a capture file
+#######################################################################
+def main(argv=None):
+	parser = argparse.ArgumentParser(prog='applicator_core.replay', description='Send a face capture file as a Live Link Face stream.')
+	parser.add_argument('capture_file', help='Live Link Face capture csv')
+	parser.add_argument('--host', default='127.0.0.1', help='address to send to (default: %(default)s)')
+	parser.add_argument('--port', type=int, default=LIVE_LINK_PORT, help='port to send to (default: %(default)s)')
+	parser.add_argument('--speed', type=float, default=1.0, help='playback speed (default: %(default)s)')
+	parser.add_argument('--subject', default=REPLAY_SUBJECT_NAME, help='subject name sent (default: %(default)s)')
+	parser.add_argument('--loop', action='store_true', help='replay until stopped (Ctrl+C)')
+	args = parser.parse_args(argv)
+
+	if args.speed <= 0:
+		parser.error('--speed must be greater than 0')
+
+	capture_frames = load_capture_data(args.capture_file)
+	try:
+		packet_count = replay_capture(capture_frames, args.host, args.port, args.speed, args.loop, args.subject)
+	except KeyboardInterrupt:
+		return 0
+	print('Sent ' + str(packet_count) + ' frames to ' + args.host + ':' + str(args.port))
+	return 0
+
+if __name__ == '__main__':
+	sys.exit(main())
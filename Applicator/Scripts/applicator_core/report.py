@@ -0,0 +1,98 @@
+# python
+#######################################################################
+# Applicator Kit for Modo: apply run report
+# Times the stages of an apply and keeps its counters and per channel
+# figures, written as a JSON log (e.g. next to the scene) to track the
+# cost of applying across kit versions and rigs
+#
+# © Copyright 2020 All Rights Reserved: Chameleon-Workshop.com
+#######################################################################
+import json
+import os
+import os.path
+import platform
+import time
+from contextlib import contextmanager
+
+#Declare CONSTANTS (so to speak)
+APPLICATOR_VERSION = '1.3'
+REPORT_PATH = os.path.join(os.path.expanduser('~'), '.applicator_kit', 'reports')
+REPORT_SUFFIX = '_applicator_'
+REPORT_EXTENSION = '.json'
+PROFILE_EXTENSION = '.prof'
+
+#######################################################################
+# Gets the path of a new report for the scene
+# Next to the scene file, or in the reports folder for an unsaved scene
+#######################################################################
+def get_report_path(scene_path=None, report_folder=None):
+	if scene_path:
+		report_folder = os.path.dirname(os.path.abspath(scene_path))
+		report_name = os.path.splitext(os.path.basename(scene_path))[0]
+	else:
+		report_folder = report_folder if report_folder != None else REPORT_PATH
+		report_name = 'untitled'
+	return os.path.join(report_folder, report_name + REPORT_SUFFIX + time.strftime('%Y%m%d_%H%M%S') + REPORT_EXTENSION)
+
+#######################################################################
+# Gets the path of the cProfile dump that goes with a report
+#######################################################################
+def get_profile_path(report_path):
+	return os.path.splitext(report_path)[0] + PROFILE_EXTENSION
+
+#######################################################################
+# Apply run report
+# stages: stage name > seconds (a stage timed more than once adds up)
+# counters: counter name > count
+# channels: channel name > keys, dropped keys, evaluate and write seconds
+# settings: the settings of the run
+#######################################################################
+class ApplyReport(object):
+	def __init__(self, settings=None):
+		self.started = time.time()
+		self.stage_names = []
+		self.stages = {}
+		self.counters = {}
+		self.channels = {}
+		self.settings = dict(settings) if settings != None else {}
+
+	#times the block as the stage
+	@contextmanager
+	def stage(self, stage_name):
+		start_time = time.time()
+		try:
+			yield self
+		finally:
+			self.add_stage_time(stage_name, time.time() - start_time)
+
+	def add_stage_time(self, stage_name, seconds):
+		if stage_name not in self.stages:
+			self.stage_names.append(stage_name)
+			self.stages[stage_name] = 0.0
+		self.stages[stage_name] += seconds
+
+	def count(self, counter_name, amount=1):
+		self.counters[counter_name] = self.counters.get(counter_name, 0) + amount
+
+	def set_count(self, counter_name, value):
+		self.counters[counter_name] = value
+
+	def add_channel(self, channel_name, keys=0, dropped_keys=0, evaluate_seconds=0.0, write_seconds=0.0):
+		channel = self.channels.setdefault(channel_name, {'keys': 0, 'dropped_keys': 0, 'evaluate_seconds': 0.0, 'write_seconds': 0.0})
+		channel['keys'] += keys
+		channel['dropped_keys'] += dropped_keys
+		channel['evaluate_seconds'] += evaluate_seconds
+		channel['write_seconds'] += write_seconds
+
+	def to_dict(self):
+		return {'version': APPLICATOR_VERSION, 'python': platform.python_version(), 'platform': platform.platform(),
+			'started': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.started)), 'elapsed_seconds': time.time() - self.started,
+			'settings': self.settings, 'stages': [{'stage': stage_name, 'seconds': self.stages[stage_name]} for stage_name in self.stage_names],
+			'counters': self.counters, 'channels': [dict(channel=channel_name, **self.channels[channel_name]) for channel_name in sorted(self.channels)]}
+
+	def save(self, report_path):
+		if not os.path.isdir(os.path.dirname(report_path)):
+			os.makedirs(os.path.dirname(report_path))
+		with open(report_path, 'w') as report_file:
+			json.dump(self.to_dict(), report_file, indent=1, sort_keys=True)
+		return report_path
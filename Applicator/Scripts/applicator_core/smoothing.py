@@ -0,0 +1,158 @@
+# python
+#######################################################################
+# Applicator Kit for Modo: capture value smoothing
+#
+# © Copyright 2020 All Rights Reserved: Chameleon-Workshop.com 
+#######################################################################
+import math
+import numpy
+
+from .capture import CAPTURE_FPS
+
+#Declare CONSTANTS (so to speak)
+SMOOTH_MEAN = 'mean'
+SMOOTH_GAUSS = 'gauss'
+SMOOTH_SAVGOL = 'savgol'
+SMOOTH_ONE_EURO = 'oneeuro'
+SMOOTH_FILTERS = (SMOOTH_MEAN, SMOOTH_GAUSS, SMOOTH_SAVGOL, SMOOTH_ONE_EURO)
+#rolling averages up to this wide add up each window in order (as the original 7 frame average did)
+SMOOTH_ORDERED_WIDTH = 15
+
+#######################################################################
+# Gets the smoothing spec from the mapping file's Smooth value
+# N (or blank) is no smoothing and Y is the original 7 frame rolling average.
+# A filter can also be named with its settings, e.g.
+#   mean:15 | gauss:9 | gauss:9,2.0 | savgol:9 | savgol:9,3 | oneeuro:1.0,0.007
+# Returns None or a (filter name, settings) tuple
+#######################################################################
+def get_smooth_spec(smooth):
+	smooth = (smooth or '').strip().lower()
+	if smooth in ('', 'n'):
+		return None
+	if smooth == 'y':
+		return (SMOOTH_MEAN, (7,))
+
+	filter_name, _, settings = smooth.partition(':')
+	if filter_name not in SMOOTH_FILTERS:
+		raise ValueError('Unknown smoothing filter "' + smooth + '". Supported filters: ' + ', '.join(SMOOTH_FILTERS))
+	try:
+		settings = tuple(float(setting) for setting in settings.split(',') if setting.strip() != '')
+	except ValueError:
+		raise ValueError('Bad smoothing settings "' + smooth + '"')
+
+	if filter_name == SMOOTH_ONE_EURO:
+		#min cutoff, beta & derivative cutoff
+		settings = (settings + (1.0, 0.0, 1.0)[len(settings):])[:3]
+	else:
+		#window width (always odd) & the gaussian sigma / savgol polynomial order
+		width = int(settings[0]) if len(settings) > 0 else 7
+		width = max(width, 1) | 1
+		if filter_name == SMOOTH_GAUSS:
+			settings = (width, settings[1] if len(settings) > 1 else width / 6.0)
+		elif filter_name == SMOOTH_SAVGOL:
+			settings = (width, int(settings[1]) if len(settings) > 1 else 2)
+		else:
+			settings = (width,)
+	return (filter_name, settings)
+
+#######################################################################
+# Rolling average
+# the window is cut short at the start and end of the capture
+# Narrow windows (up to SMOOTH_ORDERED_WIDTH) are added up value by value
+# in order, so they give exactly the original average, wider ones use
+# running sums (the cost does not depend on the width)
+#######################################################################
+def smooth_mean(values, width):
+	value_count = len(values)
+	half_width = width // 2
+	indexes = numpy.arange(value_count)
+	range_start = numpy.maximum(indexes - half_width, 0)
+	range_end = numpy.minimum(indexes + half_width + 1, value_count)
+	if width <= SMOOTH_ORDERED_WIDTH:
+		range_sum = numpy.zeros(value_count, dtype=numpy.float64)
+		for offset in range(-min(half_width, value_count - 1), min(half_width, value_count - 1) + 1):
+			range_sum[max(-offset, 0):value_count - max(offset, 0)] += values[max(offset, 0):value_count + min(offset, 0)]
+		return range_sum / (range_end - range_start)
+	running_sum = numpy.concatenate(([0.0], numpy.cumsum(values)))
+	return (running_sum[range_end] - running_sum[range_start]) / (range_end - range_start)
+
+#######################################################################
+# Gaussian weighted average
+# the window is cut short at the start and end of the capture (and the weights rebalanced)
+#######################################################################
+def smooth_gauss(values, width, sigma):
+	value_count = len(values)
+	if value_count == 0:
+		return values.copy()
+	half_width = width // 2
+	offsets = numpy.arange(-half_width, half_width + 1)
+	kernel = numpy.exp(-0.5 * (offsets / max(sigma, 1e-6)) ** 2)
+	#the full convolution centred on each value (a 'same' convolution is as long as the kernel when the capture is shorter)
+	weighted_sum = numpy.convolve(values, kernel, mode='full')[half_width:half_width + value_count]
+	weight_total = numpy.convolve(numpy.ones(value_count), kernel, mode='full')[half_width:half_width + value_count]
+	return weighted_sum / weight_total
+
+#######################################################################
+# Savitzky-Golay filter (keeps peaks better than an average)
+# the start and end of the capture use the polynomial fitted to the first/last window
+#######################################################################
+def smooth_savgol(values, width, order):
+	value_count = len(values)
+	width = min(width, value_count if value_count % 2 == 1 else value_count - 1)
+	order = min(order, width - 1)
+	if width < 3 or order < 1:
+		return values.copy()
+
+	half_width = width // 2
+	offsets = numpy.arange(-half_width, half_width + 1, dtype=numpy.float64)
+	coefficients = numpy.linalg.pinv(numpy.vander(offsets, order + 1, increasing=True))[0]
+	result = numpy.convolve(values, coefficients[::-1], mode='same')
+
+	#fit the edges
+	edge_offsets = numpy.arange(width, dtype=numpy.float64)
+	start_fit = numpy.polyfit(edge_offsets, values[:width], order)
+	result[:half_width] = numpy.polyval(start_fit, edge_offsets[:half_width])
+	end_fit = numpy.polyfit(edge_offsets, values[-width:], order)
+	result[-half_width:] = numpy.polyval(end_fit, edge_offsets[-half_width:])
+	return result
+
+#######################################################################
+# One Euro filter (adaptive low pass: smooths jitter while keeping fast moves)
+# http://cristal.univ-lille.fr/~casiez/1euro/
+#######################################################################
+def smooth_one_euro(values, rate, min_cutoff, beta, derivative_cutoff):
+	def alpha(cutoff):
+		tau = 1.0 / (2 * math.pi * cutoff)
+		return 1.0 / (1.0 + tau * rate)
+
+	derivative_alpha = alpha(derivative_cutoff)
+	result = []
+	previous_value = None
+	previous_derivative = 0.0
+	for value in values.tolist():
+		if previous_value == None:
+			previous_value = value
+		else:
+			derivative = (value - previous_value) * rate
+			previous_derivative = previous_derivative + derivative_alpha * (derivative - previous_derivative)
+			value_alpha = alpha(min_cutoff + beta * abs(previous_derivative))
+			previous_value = previous_value + value_alpha * (value - previous_value)
+		result.append(previous_value)
+	return numpy.array(result, dtype=numpy.float64)
+
+#######################################################################
+# Smooths the capture values using the smoothing spec
+#######################################################################
+def smooth_values(values, smooth_spec, rate=CAPTURE_FPS):
+	if smooth_spec == None or len(values) == 0:
+		return values
+	filter_name, settings = smooth_spec
+	if filter_name == SMOOTH_MEAN:
+		return smooth_mean(values, *settings)
+	elif filter_name == SMOOTH_GAUSS:
+		return smooth_gauss(values, *settings)
+	elif filter_name == SMOOTH_SAVGOL:
+		return smooth_savgol(values, *settings)
+	elif filter_name == SMOOTH_ONE_EURO:
+		return smooth_one_euro(values, rate, *settings)
+	return values
@@ -0,0 +1,261 @@
+# python
+#######################################################################
+# Applicator Kit for Modo: Live Link Face streaming
+# Receives the Live Link Face network stream (UDP), keeps the latest
+# frames in a fixed-size ring buffer, records them to a take file and
+# evaluates the mapped channel values of the latest frame
+#
+# © Copyright 2020 All Rights Reserved: Chameleon-Workshop.com
+#######################################################################
+import numpy
+import socket
+import struct
+import threading
+import time
+
+from .capture import CAPTURE_TIMECODE, DATA_ITEM_NAMES, DATA_MORPH_NAMES, CaptureData, get_capture_times
+from .curves import get_channel_values, get_rotation_values
+
+#Declare CONSTANTS (so to speak)
+LIVE_LINK_PORT = 11111
+LIVE_LINK_VERSION = 6
+LIVE_LINK_PACKET_SIZE = 4096
+LIVE_LINK_BUFFER_FRAMES = 600
+LIVE_LINK_MAX_LATENCY = 0.25
+LIVE_LINK_BLEND_SHAPE_COUNT = 'BlendShapeCount'
+#the order of the values in a packet (the ARKit BlendShapes, then the head and eye rotations)
+LIVE_LINK_NAMES = ['eyeBlinkLeft', 'eyeLookDownLeft', 'eyeLookInLeft', 'eyeLookOutLeft', 'eyeLookUpLeft', 'eyeSquintLeft', 'eyeWideLeft', 'eyeBlinkRight', 'eyeLookDownRight', 'eyeLookInRight', 'eyeLookOutRight', 'eyeLookUpRight', 'eyeSquintRight', 'eyeWideRight', 'jawForward', 'jawLeft', 'jawRight', 'jawOpen', 'mouthClose', 'mouthFunnel', 'mouthPucker', 'mouthLeft', 'mouthRight', 'mouthSmileLeft', 'mouthSmileRight', 'mouthFrownLeft', 'mouthFrownRight', 'mouthDimpleLeft', 'mouthDimpleRight', 'mouthStretchLeft', 'mouthStretchRight', 'mouthRollLower', 'mouthRollUpper', 'mouthShrugLower', 'mouthShrugUpper', 'mouthPressLeft', 'mouthPressRight', 'mouthLowerDownLeft', 'mouthLowerDownRight', 'mouthUpperUpLeft', 'mouthUpperUpRight', 'browDownLeft', 'browDownRight', 'browInnerUp', 'browOuterUpLeft', 'browOuterUpRight', 'cheekPuff', 'cheekSquintLeft', 'cheekSquintRight', 'noseSneerLeft', 'noseSneerRight', 'tongueOut', 'HeadYaw', 'HeadPitch', 'HeadRoll', 'LeftEyeYaw', 'LeftEyePitch', 'LeftEyeRoll', 'RightEyeYaw', 'RightEyePitch', 'RightEyeRoll']
+#the order of the values in the ring buffer and take files (as in the capture files)
+LIVE_CAPTURE_NAMES = DATA_MORPH_NAMES + DATA_ITEM_NAMES
+
+#######################################################################
+# A decoded Live Link Face packet
+# values are in LIVE_LINK_NAMES order, rate is the timecode rate
+# (numerator, denominator) of frame_number
+#######################################################################
+class LiveLinkFrame(object):
+	def __init__(self, device_id, subject_name, frame_number, subframe, rate, values):
+		self.device_id = device_id
+		self.subject_name = subject_name
+		self.frame_number = frame_number
+		self.subframe = subframe
+		self.rate = rate
+		self.values = values
+
+	#the Live Link Face timecode (HH:MM:SS:FF.sss) of the frame
+	def timecode(self):
+		timecode_rate = max(int(round(float(self.rate[0]) / max(self.rate[1], 1))), 1)
+		seconds, frame = divmod(int(self.frame_number), timecode_rate)
+		minutes, seconds = divmod(seconds, 60)
+		hours, minutes = divmod(minutes, 60)
+		return '%02d:%02d:%02d:%02d.%03d' % (hours % 24, minutes, seconds, frame, int(min(max(self.subframe, 0.0), 0.999) * 1000))
+
+#######################################################################
+# Decodes a Live Link Face packet (big-endian):
+#   uint8 version, int32 length + device id, int32 length + subject name,
+#   int32 frame number, float32 subframe, int32 rate numerator,
+#   int32 rate denominator, uint8 value count, value count float32 values
+# Raises ValueError for a malformed packet
+#######################################################################
+def decode_live_link_packet(packet):
+	try:
+		offset = 1
+		device_length, = struct.unpack_from('>i', packet, offset)
+		offset += 4
+		device_id = packet[offset:offset + device_length].decode('utf-8', 'replace')
+		offset += device_length
+		subject_length, = struct.unpack_from('>i', packet, offset)
+		offset += 4
+		subject_name = packet[offset:offset + subject_length].decode('utf-8', 'replace')
+		offset += subject_length
+		frame_number, subframe, rate_numerator, rate_denominator, value_count = struct.unpack_from('>ifiiB', packet, offset)
+		offset += 17
+		values = numpy.frombuffer(packet, dtype='>f4', count=value_count, offset=offset).astype(numpy.float32)
+	except (struct.error, ValueError):
+		raise ValueError('Malformed Live Link Face packet (' + str(len(packet)) + ' bytes)')
+	if device_length < 0 or subject_length < 0:
+		raise ValueError('Malformed Live Link Face packet (' + str(len(packet)) + ' bytes)')
+	return LiveLinkFrame(device_id, subject_name, frame_number, subframe, (rate_numerator, rate_denominator), values)
+
+#######################################################################
+# Encodes a Live Link Face packet (see decode_live_link_packet)
+#######################################################################
+def encode_live_link_packet(device_id, subject_name, frame_number, subframe, rate, values):
+	device_id = device_id.encode('utf-8')
+	subject_name = subject_name.encode('utf-8')
+	values = numpy.asarray(values, dtype='>f4')
+	return (struct.pack('>Bi', LIVE_LINK_VERSION, len(device_id)) + device_id + struct.pack('>i', len(subject_name)) + subject_name
+		+ struct.pack('>ifiiB', int(frame_number), float(subframe), int(rate[0]), int(rate[1]), len(values)) + values.tobytes())
+
+#######################################################################
+# Fixed-size ring buffer of the latest frames
+# The frames are held in one preallocated (capacity x names) array, so
+# appending never allocates and the oldest frame is overwritten once the
+# buffer is full. Safe to append from the receiver thread while the scene
+# side reads the latest frame.
+#######################################################################
+class FrameRingBuffer(object):
+	def __init__(self, capacity=LIVE_LINK_BUFFER_FRAMES, names=LIVE_CAPTURE_NAMES):
+		self.capacity = max(int(capacity), 1)
+		self.names = list(names)
+		self.values = numpy.zeros((self.capacity, len(self.names)), dtype=numpy.float32)
+		self.timecodes = [''] * self.capacity
+		self.arrival_times = numpy.zeros(self.capacity, dtype=numpy.float64)
+		self.frame_count = 0
+		self._lock = threading.Lock()
+
+	def __len__(self):
+		return min(self.frame_count, self.capacity)
+
+	def append(self, values, timecode, arrival_time=None):
+		with self._lock:
+			index = self.frame_count % self.capacity
+			self.values[index] = values
+			self.timecodes[index] = timecode
+			self.arrival_times[index] = arrival_time if arrival_time != None else time.time()
+			self.frame_count += 1
+
+	#gets the latest frame as (frame count, values, timecode, arrival time), None while empty
+	def latest(self):
+		with self._lock:
+			if self.frame_count == 0:
+				return None
+			index = (self.frame_count - 1) % self.capacity
+			return self.frame_count, self.values[index].copy(), self.timecodes[index], self.arrival_times[index]
+
+	#gets the buffered frames (oldest first) as a CaptureData store
+	def snapshot(self):
+		with self._lock:
+			frame_count = len(self)
+			first_index = self.frame_count - frame_count
+			order = numpy.arange(first_index, self.frame_count) % self.capacity
+			capture_data = CaptureData(self.names, self.values[order], [self.timecodes[index] for index in order.tolist()], first_index)
+		capture_data.times = get_capture_times(capture_data)
+		return capture_data
+
+#######################################################################
+# Records live frames to a take file (Live Link Face csv format)
+# Rows are written as they arrive, the file is flushed when closed
+#######################################################################
+class TakeRecorder(object):
+	def __init__(self, take_path, names=LIVE_CAPTURE_NAMES):
+		self.take_path = take_path
+		self.names = list(names)
+		self.frame_count = 0
+		self._file = open(take_path, 'w')
+		self._file.write(','.join([CAPTURE_TIMECODE, LIVE_LINK_BLEND_SHAPE_COUNT] + self.names) + '\n')
+		self._row_prefix = ',' + str(len(self.names)) + ','
+
+	def write(self, values, timecode):
+		self._file.write(timecode + self._row_prefix + ','.join('%.6f' % value for value in values.tolist()) + '\n')
+		self.frame_count += 1
+
+	def close(self):
+		if not self._file.closed:
+			self._file.close()
+
+#######################################################################
+# Live Link Face receiver
+# Listens for the stream on a background thread. Each packet (of the
+# subject, when subject_name is set) is reordered into LIVE_CAPTURE_NAMES,
+# appended to the ring buffer and written to the take file (when take_path
+# is set). Packets that do not decode are counted and dropped.
+#######################################################################
+class LiveLinkReceiver(object):
+	def __init__(self, port=LIVE_LINK_PORT, host='', buffer_frames=LIVE_LINK_BUFFER_FRAMES, take_path=None, subject_name=None):
+		self.port = port
+		self.host = host
+		self.subject_name = subject_name
+		self.take_path = take_path
+		self.frames = FrameRingBuffer(buffer_frames)
+		self.recorder = None
+		self.packet_count = 0
+		self.error_count = 0
+		self._columns = numpy.array([LIVE_LINK_NAMES.index(name) for name in self.frames.names])
+		self._socket = None
+		self._thread = None
+		self._running = False
+
+	#handles one packet, returns whether it was buffered
+	def receive(self, packet, arrival_time=None):
+		self.packet_count += 1
+		try:
+			live_link_frame = decode_live_link_packet(packet)
+		except ValueError:
+			self.error_count += 1
+			return False
+		#packets without values are sent while the face is not tracked
+		if len(live_link_frame.values) < len(LIVE_LINK_NAMES):
+			return False
+		if self.subject_name and live_link_frame.subject_name != self.subject_name:
+			return False
+
+		values = live_link_frame.values[self._columns]
+		timecode = live_link_frame.timecode()
+		self.frames.append(values, timecode, arrival_time)
+		if self.recorder != None:
+			self.recorder.write(values, timecode)
+		return True
+
+	def start(self):
+		if self._running == True:
+			return
+		self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+		try:
+			self._socket.bind((self.host, self.port))
+		except (OSError, socket.error):
+			self._socket.close()
+			self._socket = None
+			raise
+		#wake up now and then to check for stop
+		self._socket.settimeout(0.1)
+		if self.take_path:
+			self.recorder = TakeRecorder(self.take_path)
+		self._running = True
+		self._thread = threading.Thread(target=self._run, name='LiveLinkReceiver')
+		self._thread.daemon = True
+		self._thread.start()
+
+	def _run(self):
+		while self._running == True:
+			try:
+				packet = self._socket.recv(LIVE_LINK_PACKET_SIZE)
+			except socket.timeout:
+				continue
+			except (OSError, socket.error):
+				break
+			self.receive(packet, time.time())
+
+	def stop(self):
+		self._running = False
+		if self._thread != None:
+			self._thread.join()
+			self._thread = None
+		if self._socket != None:
+			self._socket.close()
+			self._socket = None
+		if self.recorder != None:
+			self.recorder.close()
+
+#######################################################################
+# Evaluates the mapped values of a live frame
+# The mapping rows are gathered into arrays once, so each frame is one
+# vectorized pass. Values follow the channel and rotation curves
+# (rotations in radians), without smoothing (it needs the frames to come)
+#######################################################################
+class LiveCurveEvaluator(object):
+	def __init__(self, mapping_rows, face_neutral, names=LIVE_CAPTURE_NAMES):
+		columns = { name : index for index, name in enumerate(names) }
+		self.mapping_rows = list(mapping_rows)
+		self.columns = numpy.array([columns[mapping_row.name] for mapping_row in self.mapping_rows], dtype=numpy.int64)
+		self.multipliers = numpy.array([mapping_row.multiplier for mapping_row in self.mapping_rows], dtype=numpy.float64)
+		self.value_shifts = numpy.array([mapping_row.value_shift for mapping_row in self.mapping_rows], dtype=numpy.float64)
+		self.neutrals = numpy.array([face_neutral.get(mapping_row.name, 0.0) for mapping_row in self.mapping_rows], dtype=numpy.float64)
+		self.rotations = numpy.array([mapping_row.axis != None for mapping_row in self.mapping_rows], dtype=bool)
+
+	#gets the value of each mapping row for the frame values
+	def values(self, frame_values):
+		strength = numpy.asarray(frame_values, dtype=numpy.float64)[self.columns]
+		return numpy.where(self.rotations,
+			get_rotation_values(strength, self.multipliers, self.value_shifts),
+			get_channel_values(strength, self.multipliers, self.value_shifts, self.neutrals))
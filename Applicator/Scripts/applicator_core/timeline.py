@@ -0,0 +1,68 @@
+# python
+#######################################################################
+# Applicator Kit for Modo: capture timeline (resampling to the scene frame rate)
+#
+# © Copyright 2020 All Rights Reserved: Chameleon-Workshop.com 
+#######################################################################
+import numpy
+
+#######################################################################
+# Capture timeline shared by every curve of an apply run
+# Maps each scene frame to its time in the capture and samples capture values at
+# those times (linear interpolation between the two closest capture frames)
+# key_times: the scene time each scene frame is keyed at
+#######################################################################
+class CaptureTimeline(object):
+	def __init__(self, capture_indexes, next_capture_indexes, capture_weights, key_times):
+		self.capture_indexes = capture_indexes
+		self.next_capture_indexes = next_capture_indexes
+		self.capture_weights = capture_weights
+		self.key_times = key_times
+
+	def __len__(self):
+		return len(self.key_times)
+
+	def sample(self, values):
+		result = values[self.capture_indexes]
+		blended = self.capture_weights > 0
+		if blended.any():
+			weights = self.capture_weights[blended]
+			result[blended] = result[blended] * (1 - weights) + values[self.next_capture_indexes[blended]] * weights
+		return result
+
+#######################################################################
+# Gets the capture timeline for the scene's frame rate (any rate, including fractional rates)
+# Scene frames start at start_frame, and at the time of the capture frame skip_frames
+# (counted from the start of the capture file, frames read from an offset are already skipped)
+# frame_to_time converts a scene frame to its time (frame / fps when not given)
+#######################################################################
+def get_capture_timeline(capture_frames, fps, start_frame, skip_frames, frame_to_time=None):
+	capture_times = capture_frames.times
+	skip_frames = max(skip_frames - capture_frames.first_frame, 0)
+	capture_frames_count = len(capture_times)
+	if capture_frames_count <= skip_frames or fps <= 0:
+		empty = numpy.zeros(0, dtype=numpy.int64)
+		return CaptureTimeline(empty, empty, numpy.zeros(0), numpy.zeros(0))
+
+	#scene frame times within the capture
+	start_time = capture_times[skip_frames]
+	frame_count = int(numpy.floor((capture_times[-1] - start_time) * fps + 1e-6)) + 1
+	sample_times = start_time + numpy.arange(frame_count) / float(fps)
+
+	#the capture frames either side of each scene frame
+	next_capture_indexes = numpy.clip(numpy.searchsorted(capture_times, sample_times, side='right'), 1, capture_frames_count - 1)
+	capture_indexes = next_capture_indexes - 1
+	capture_steps = capture_times[next_capture_indexes] - capture_times[capture_indexes]
+	capture_weights = numpy.where(capture_steps > 0, (sample_times - capture_times[capture_indexes]) / numpy.where(capture_steps > 0, capture_steps, 1), 0.0)
+	capture_weights = numpy.clip(capture_weights, 0, 1)
+
+	#snap scene frames that land on a capture frame
+	on_next = capture_weights > 1 - 1e-6
+	capture_indexes[on_next] = next_capture_indexes[on_next]
+	capture_weights[on_next | (capture_weights < 1e-6)] = 0.0
+
+	if frame_to_time == None:
+		key_times = (start_frame + numpy.arange(frame_count)) / float(fps)
+	else:
+		key_times = numpy.array([frame_to_time(start_frame + x) for x in range(frame_count)], dtype=numpy.float64)
+	return CaptureTimeline(capture_indexes, next_capture_indexes, capture_weights, key_times)
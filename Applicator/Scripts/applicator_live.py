@@ -0,0 +1,143 @@
+# python
+#######################################################################
+# Applicator Kit for Modo: Live Link Face live mode
+# Starts (or stops, when running) driving the target from the Live Link
+# Face stream. The stream is recorded to a take file, which becomes the
+# Capture File when live mode is stopped, ready to apply.
+#
+# © Copyright 2020 All Rights Reserved: Chameleon-Workshop.com
+#######################################################################
+import lx
+import modo
+import os
+import os.path
+import socket
+import sys
+import time
+
+#make the kit's Scripts folder importable
+scripts_path = lx.eval('query platformservice alias ? {kit_Applicator:Scripts}')
+if scripts_path not in sys.path:
+	sys.path.append(scripts_path)
+
+try:
+	import numpy
+except ImportError:
+	numpy = None
+else:
+	from applicator_core import DATA_ITEM_NAMES, DATA_MORPH_NAMES
+	from applicator_core import NEUTRAL_MEAN, NEUTRAL_STATISTIC_LABELS
+	from applicator_core import CaptureCache, LiveLinkReceiver, get_face_neutral, get_maps, is_cast_manifest, list_csv_data, list_neutral_profiles
+	from applicator_modo import MODE_ACTOR, MODE_ITEM, LiveSession, get_live_session, resolve_bindings, start_live_session, stop_live_session
+
+#Declare CONSTANTS (so to speak)
+LIVE_TAKE_PATH = os.path.join(os.path.expanduser('~'), '.applicator_kit', 'takes')
+LIVE_TAKE_PREFIX = 'live_'
+
+#######################################################################
+# Gets the path of a new take file in the take folder
+#######################################################################
+def get_take_path(take_folder):
+	if take_folder.strip() == '':
+		take_folder = LIVE_TAKE_PATH
+	if not os.path.isdir(take_folder):
+		os.makedirs(take_folder)
+	return os.path.join(take_folder, LIVE_TAKE_PREFIX + time.strftime('%Y%m%d_%H%M%S') + '.csv')
+
+#######################################################################
+# Get the root item (the actor, when named, otherwise the selected item)
+#######################################################################
+def get_root_item(scene, actor_name):
+	if len(actor_name.strip()) > 0:
+		actor_names = []
+		for actor in scene.getGroups(gtype='actor'):
+			actor_names.append(actor.name)
+			if actor_name.strip().lower() == actor.name.lower():
+				return actor
+		modo.dialogs.alert('Bad Actor', '"' + actor_name + '" not in scene.' + '\n'
+			+ 'Available Actors: ' + '; '.join(str(x) for x in actor_names), dtype='error')
+	elif len(scene.selected) == 1:
+		return scene.selected[0]
+	#sometime the scene is included in the select, so grab the second item
+	elif len(scene.selected) == 2:
+		return scene.selected[1]
+	else:
+		modo.dialogs.alert('Select item', 'First select target from the scene.', dtype='warning')
+	return None
+
+#######################################################################
+# Main Execution
+#######################################################################
+live_session = get_live_session() if numpy != None else None
+if live_session != None:
+	#############################
+	# Stop live mode
+	#############################
+	stop_live_session()
+	message = ('Live mode stopped' + '\n \n'
+		+ '  - Frames received: ' + str(live_session.receiver.frames.frame_count) + '\n'
+		+ '  - Frames applied: ' + str(live_session.applied_count) + '\n'
+		+ '  - Frames too late: ' + str(live_session.stale_count) + '\n'
+		+ '  - Bad packets: ' + str(live_session.receiver.error_count) + '\n')
+	if live_session.receiver.recorder != None and live_session.receiver.recorder.frame_count > 0:
+		#the recorded take is ready to apply
+		lx.eval('user.value applicator.capture_file_path {%s}' % live_session.receiver.take_path)
+		message += '  - Take recorded: ' + live_session.receiver.take_path
+	elif live_session.receiver.recorder != None:
+		#nothing was received, so there is no take
+		os.remove(live_session.receiver.take_path)
+	modo.dialogs.alert('Live mode', message, dtype='info')
+
+elif numpy == None:
+	modo.dialogs.alert('NumPy not found', 'Applicator Kit requires NumPy.' + '\n'
+		+ 'Please install NumPy for the Python used by Modo.', dtype='warning')
+
+else:
+	#############################
+	# Start live mode
+	#############################
+	scene = modo.Scene()
+	mapping_file_path = lx.eval('user.value applicator.mapping_file_path ?')
+	neutral_file_path = lx.eval('user.value applicator.neutral_file_path ?')
+	neutral_profile = lx.eval('user.value applicator.neutral_profile ?').strip()
+	neutral_statistic = NEUTRAL_STATISTIC_LABELS.get(lx.eval('user.value applicator.neutral_statistic ?'), NEUTRAL_MEAN)
+	blend_target_type = lx.eval('user.value applicator.blend_target_type ?')
+	live_port = lx.eval('user.value applicator.live_port ?')
+
+	root_item = get_root_item(scene, lx.eval('user.value applicator.actor_name ?'))
+	if root_item != None and mapping_file_path.strip() == '':
+		modo.dialogs.alert('Validation error', 'Mapping File is required', dtype='warning')
+	elif root_item != None and os.path.isfile(mapping_file_path) == False:
+		modo.dialogs.alert('Validation error', 'Specified Mapping File does not exist:' + '\n' + mapping_file_path, dtype='warning')
+	elif root_item != None and is_cast_manifest(mapping_file_path):
+		modo.dialogs.alert('Validation error', 'Live mode drives a single actor or item.' + '\n' + 'Please select its own mapping file, not a cast manifest.', dtype='warning')
+	elif root_item != None and neutral_file_path.strip() != '' and os.path.isfile(neutral_file_path) == False:
+		modo.dialogs.alert('Validation error', 'Specified Neutral File does not exist:' + '\n' + neutral_file_path, dtype='warning')
+	elif root_item != None and neutral_profile != '' and neutral_file_path.strip() == '' and neutral_profile not in list_neutral_profiles():
+		modo.dialogs.alert('Validation error', 'Neutral profile "' + neutral_profile + '" not found.', dtype='warning')
+	elif root_item != None:
+		#for actors, get the actor object as root item will be a group object
+		if root_item.type == 'actor':
+			for actor in scene.getGroups(gtype='actor'):
+				if actor.name == root_item.name:
+					root_item = actor
+					break
+
+		#the same mapping and neutral as applying a take (the neutral cannot be detected in a stream)
+		mapping = get_maps(DATA_MORPH_NAMES, DATA_ITEM_NAMES, list_csv_data(mapping_file_path), blend_target_type)
+		face_neutral = get_face_neutral(DATA_MORPH_NAMES, neutral_file_path, neutral_profile, neutral_statistic, capture_cache=CaptureCache())
+		bindings, unmatched_targets = resolve_bindings(root_item, mapping, MODE_ACTOR if root_item.type == 'actor' else MODE_ITEM, blend_target_type)
+
+		take_path = get_take_path(lx.eval('user.value applicator.live_take_folder ?'))
+		receiver = LiveLinkReceiver(live_port, take_path=take_path)
+		try:
+			start_live_session(LiveSession(bindings, face_neutral.values, receiver), scene.fps)
+		except (OSError, socket.error) as error:
+			modo.dialogs.alert('Live mode', 'Could not listen on port ' + str(live_port) + ':' + '\n' + str(error), dtype='error')
+		else:
+			modo.dialogs.alert('Live mode', 'Live mode started. Run Live again to stop.' + '\n \n'
+				+ '  - Target: ' + root_item.name + '\n'
+				+ '  - Port: ' + str(live_port) + '\n'
+				+ '  - Channels driven: ' + str(len(bindings)) + '\n'
+				+ '  - Recording to: ' + take_path + '\n'
+				+ '  - Unmatched targets: ' + str(len(unmatched_targets)), dtype='info')
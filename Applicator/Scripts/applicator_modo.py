@@ -0,0 +1,749 @@
+# python
+#######################################################################
+# Applicator Kit for Modo: Modo adapter
+# Resolves the mapping against the scene and keys the curves from
+# applicator_core on to the bound channels
+#
+# © Copyright 2020 All Rights Reserved: Chameleon-Workshop.com 
+#######################################################################
+import lx
+import lxifc
+import numpy
+import time
+from collections import OrderedDict
+
+from applicator_core import (ANGLE_SCALE, BLEND_TARGET_CHANNEL, BLEND_TARGET_MORPH, CAPTURE_ROTATION_ORDER, LIVE_LINK_MAX_LATENCY, ROTATION_AXES, ROTATION_ORDERS,
+	PROGRESS_STEPS, CurveCache, LiveCurveEvaluator, ManifestChannel, convert_rotation_order, get_input_hash, reduce_curve, stack_rotation_track)
+
+#Declare CONSTANTS (so to speak)
+MODE_ACTOR = 'Actor Mode'
+MODE_ITEM = 'Item Mode'
+
+#the running live session (see start_live_session)
+_live_session = None
+#the last preview bake (see set_preview_bake)
+_preview_bake = None
+
+#######################################################################
+# Keyframe backend that writes whole curves through the envelope API
+# (one ChannelWrite per batch and one envelope per channel)
+# lx_module can be swapped for a local stand-in of lx
+# The write time of each channel is added to the report (ApplyReport) when given
+#######################################################################
+class ModoKeyframeBackend(object):
+	def __init__(self, lx_module=None, report=None):
+		self.lx = lx_module if lx_module != None else lx
+		self.report = report
+		self._chan_reads = {}
+
+	#make the action the active action layer of the actor
+	def activate_action(self, actor, action):
+		action.active = True
+		self.lx.eval('select.item {%s} set' % actor.id)
+		self.lx.eval('layer.active {%s} type:actr' % action.id)
+
+	def write_curves(self, curves, action_name):
+		lx_object = self.lx.object
+		chan_write = None
+		for channel, key_times, key_values, linear in curves:
+			if len(key_values) == 0:
+				#no envelope is added for a curve without keys
+				continue
+			start_time = time.time()
+			if chan_write == None:
+				lx_scene = lx_object.Scene(channel.item.Context())
+				layer_name = action_name if action_name != None else self.lx.symbol.s_ACTIONLAYER_EDIT
+				chan_write = lx_object.ChannelWrite(lx_scene.Channels(layer_name, 0.0))
+			envelope = lx_object.Envelope(chan_write.Envelope(channel.item, channel.index))
+			if linear == True:
+				envelope.SetInterpolation(self.lx.symbol.iENVv_INTERP_LINEAR)
+			keyframe = lx_object.Keyframe(envelope.Enumerator())
+			for key_time, key_value in zip(key_times.tolist(), key_values.tolist()):
+				keyframe.AddF(key_time, key_value)
+			if self.report != None:
+				self.report.add_channel(channel.item.name + '.' + channel.name, write_seconds=time.time() - start_time)
+
+	#whether the channel has keys on the action (the edit layer for None)
+	def is_animated(self, channel, action_name):
+		layer_name = action_name if action_name != None else self.lx.symbol.s_ACTIONLAYER_EDIT
+		if layer_name not in self._chan_reads:
+			lx_object = self.lx.object
+			lx_scene = lx_object.Scene(channel.item.Context())
+			self._chan_reads[layer_name] = lx_object.ChannelRead(lx_scene.Channels(layer_name, 0.0))
+		return bool(self._chan_reads[layer_name].IsAnimated(channel.item, channel.index))
+
+	#gets the envelope of the channel on the action (the edit layer for None), None if it has no keys
+	#as (the envelope's interpolation, [key, ...]), each key being (time, in value, out value,
+	#interpolation, breaks, in (slope, weight, slope type), out (slope, weight, slope type))
+	def read_envelope(self, channel, action_name):
+		if self.is_animated(channel, action_name) == False:
+			return None
+		layer_name = action_name if action_name != None else self.lx.symbol.s_ACTIONLAYER_EDIT
+		lx_object = self.lx.object
+		side_in = self.lx.symbol.iENVSIDE_IN
+		side_out = self.lx.symbol.iENVSIDE_OUT
+		envelope = lx_object.Envelope(self._chan_reads[layer_name].Envelope(channel.item, channel.index))
+		keyframe = lx_object.Keyframe(envelope.Enumerator())
+		keys = []
+		try:
+			keyframe.First()
+			while True:
+				slopes = tuple((keyframe.GetSlope(side), keyframe.GetWeight(side), keyframe.GetSlopeType(side)[0]) for side in (side_in, side_out))
+				keys.append((keyframe.GetTime(), keyframe.GetValueF(side_in), keyframe.GetValueF(side_out), keyframe.GetInterp(), keyframe.GetBreaks()) + slopes)
+				keyframe.Next()
+		except LookupError:
+			#past the last key
+			pass
+		return envelope.Interpolation(), keys
+
+	#puts back envelopes read by read_envelope on to the (cleared) channels, as (channel, envelope) pairs
+	def write_envelopes(self, envelopes, action_name):
+		lx_object = self.lx.object
+		side_in = self.lx.symbol.iENVSIDE_IN
+		side_out = self.lx.symbol.iENVSIDE_OUT
+		chan_write = None
+		for channel, (interpolation, keys) in envelopes:
+			if len(keys) == 0:
+				continue
+			if chan_write == None:
+				lx_scene = lx_object.Scene(channel.item.Context())
+				layer_name = action_name if action_name != None else self.lx.symbol.s_ACTIONLAYER_EDIT
+				chan_write = lx_object.ChannelWrite(lx_scene.Channels(layer_name, 0.0))
+			envelope = lx_object.Envelope(chan_write.Envelope(channel.item, channel.index))
+			envelope.SetInterpolation(interpolation)
+			keyframe = lx_object.Keyframe(envelope.Enumerator())
+			for key_time, in_value, out_value, key_interpolation, breaks, in_slope, out_slope in keys:
+				#the keyframe is on the key just added
+				keyframe.AddF(key_time, in_value)
+				keyframe.SetInterp(key_interpolation)
+				if breaks != 0:
+					keyframe.SetBreak(breaks)
+					keyframe.SetValueF(out_value, side_out)
+				#the slope type last, so auto slopes are worked out again as they were
+				for side, (slope, weight, slope_type) in ((side_in, in_slope), (side_out, out_slope)):
+					keyframe.SetSlope(slope, side)
+					keyframe.SetWeight(weight, 0, side)
+					keyframe.SetSlopeType(slope_type, side)
+
+	#removes all the keys of the channels on the action (the edit layer for None)
+	def clear_channels(self, channels, action_name):
+		lx_object = self.lx.object
+		chan_write = None
+		for channel in channels:
+			if self.is_animated(channel, action_name) == False:
+				continue
+			if chan_write == None:
+				lx_scene = lx_object.Scene(channel.item.Context())
+				layer_name = action_name if action_name != None else self.lx.symbol.s_ACTIONLAYER_EDIT
+				chan_write = lx_object.ChannelWrite(lx_scene.Channels(layer_name, 0.0))
+			lx_object.Envelope(chan_write.Envelope(channel.item, channel.index)).Clear()
+
+#######################################################################
+# Keyframe backend that keys each value with channel.set
+# (slow, but only needs the modo channel wrapper)
+# Everything else goes through one ModoKeyframeBackend for the whole
+# apply, so its channel reads are kept between calls
+#######################################################################
+class ChannelSetKeyframeBackend(object):
+	def __init__(self, lx_module=None):
+		self.envelope_backend = ModoKeyframeBackend(lx_module)
+
+	def activate_action(self, actor, action):
+		self.envelope_backend.activate_action(actor, action)
+
+	def is_animated(self, channel, action_name):
+		return self.envelope_backend.is_animated(channel, action_name)
+
+	def read_envelope(self, channel, action_name):
+		return self.envelope_backend.read_envelope(channel, action_name)
+
+	def write_envelopes(self, envelopes, action_name):
+		self.envelope_backend.write_envelopes(envelopes, action_name)
+
+	def clear_channels(self, channels, action_name):
+		self.envelope_backend.clear_channels(channels, action_name)
+
+	def write_curves(self, curves, action_name):
+		key_args = {'key': True}
+		if action_name != None:
+			key_args['action'] = action_name
+		for channel, key_times, key_values, linear in curves:
+			for key_time, key_value in zip(key_times.tolist(), key_values.tolist()):
+				channel.set(key_value, time=key_time, **key_args)
+
+#######################################################################
+# Gets the keys of the mapping row's curve, scaled and reduced
+# Returns the key times, the key values and the number of keys dropped
+# The keys are shared through curve_cache (when given) by every channel
+# with the same curve, scale and tolerance
+#######################################################################
+def get_channel_keys(mapping_row, curve_source, scale=1.0, curve_cache=None):
+	def evaluate():
+		key_times, key_values = curve_source.curve(mapping_row)
+		if scale != 1.0:
+			key_values = key_values * scale
+		reduced_times, reduced_values = reduce_curve(key_times, key_values, mapping_row.tolerance)
+		return reduced_times, reduced_values, len(key_values) - len(reduced_values)
+
+	if curve_cache == None:
+		return evaluate()
+	return curve_cache.get((mapping_row.curve_key(), scale, mapping_row.tolerance), evaluate)
+
+#######################################################################
+# Apply capture values to the target channel
+# Returns the channel keyed
+#######################################################################
+def apply_channel(item, channel_name, mapping_row, curve_source, keyframe_sink, curve_cache=None):
+	#print(item.type + ': ' + mapping_row.name + ' > ' + item.name)
+	channel = item.channel(channel_name)
+
+	#if the target type is an angle, covert value to be based between 0° & 45°
+	scale = ANGLE_SCALE if channel.evalType == 'angle' else 1.0
+
+	keyframe_sink.add_curve(channel, *get_channel_keys(mapping_row, curve_source, scale, curve_cache))
+	return channel
+
+#######################################################################
+# Gets the item's rotation channel for the axis (None for an unknown axis)
+#######################################################################
+def get_rotation_channel(item, axis):
+	if axis == 'X':
+		return item.rotation.x
+	elif axis == 'Y':
+		return item.rotation.y
+	elif axis == 'Z':
+		return item.rotation.z
+	return None
+
+#######################################################################
+# Gets the item's rotation order (one of ROTATION_ORDERS, the order the
+# axes are applied in), CAPTURE_ROTATION_ORDER when it cannot be read
+#######################################################################
+def get_rotation_order(item):
+	try:
+		rotation_order = item.rotation.channel('order').get()
+	except (AttributeError, LookupError, RuntimeError, TypeError):
+		return CAPTURE_ROTATION_ORDER
+	if isinstance(rotation_order, int):
+		return ROTATION_ORDERS[rotation_order] if 0 <= rotation_order < len(ROTATION_ORDERS) else CAPTURE_ROTATION_ORDER
+	rotation_order = str(rotation_order).lower()
+	return rotation_order if rotation_order in ROTATION_ORDERS else CAPTURE_ROTATION_ORDER
+
+#######################################################################
+# Gets the X, Y and Z mapping rows of an item's rotation bindings
+# (None for an unmapped axis, the last row for an axis mapped twice)
+#######################################################################
+def get_rotation_rows(bindings):
+	axis_rows = [None] * len(ROTATION_AXES)
+	for binding in bindings:
+		if binding.mapping_row.axis in ROTATION_AXES:
+			axis_rows[ROTATION_AXES.index(binding.mapping_row.axis)] = binding.mapping_row
+	return axis_rows
+
+#######################################################################
+# Gets the keys of an item's rotation track in the rotation order
+# The mapped angles are X, Y, Z (CAPTURE_ROTATION_ORDER) angles, so for
+# any other order the track is converted and every axis is keyed (an
+# unmapped axis is reduced with the tightest tolerance of the mapped ones)
+# Returns the key times, key values and dropped key count of each axis
+# (flat, None for an axis not keyed), shared through curve_cache when given
+#######################################################################
+def get_rotation_keys(axis_rows, curve_source, rotation_order=CAPTURE_ROTATION_ORDER, curve_cache=None):
+	def evaluate():
+		if hasattr(curve_source, 'rotation_track'):
+			key_times, track = curve_source.rotation_track(axis_rows)
+		else:
+			key_times, track = stack_rotation_track(curve_source, axis_rows)
+		track = convert_rotation_order(track, CAPTURE_ROTATION_ORDER, rotation_order)
+		tolerance = min(mapping_row.tolerance for mapping_row in axis_rows if mapping_row != None)
+		axis_keys = ()
+		for axis_index, mapping_row in enumerate(axis_rows):
+			if mapping_row == None and rotation_order == CAPTURE_ROTATION_ORDER:
+				axis_keys += (None, None, 0)
+				continue
+			reduced_times, reduced_values = reduce_curve(key_times, track[axis_index], mapping_row.tolerance if mapping_row != None else tolerance)
+			axis_keys += (reduced_times, reduced_values, len(key_times) - len(reduced_values))
+		return axis_keys
+
+	if curve_cache == None:
+		return evaluate()
+	return curve_cache.get((tuple((mapping_row.curve_key(), mapping_row.tolerance) if mapping_row != None else None for mapping_row in axis_rows), rotation_order), evaluate)
+
+#######################################################################
+# Apply capture rotations to the item
+# Its mapped axes are evaluated together as one rotation track (see
+# get_rotation_keys) and keyed in the item's rotation order in one go
+# Returns the channels keyed, with their key and dropped key counts
+#######################################################################
+def apply_rotation_track(item, axis_rows, curve_source, keyframe_sink, curve_cache=None):
+	axis_keys = get_rotation_keys(axis_rows, curve_source, get_rotation_order(item), curve_cache)
+	channels = []
+	for axis_index, axis in enumerate(ROTATION_AXES):
+		key_times, key_values, dropped_key_count = axis_keys[axis_index * 3:axis_index * 3 + 3]
+		if key_times is None:
+			continue
+		channel = get_rotation_channel(item, axis)
+		keyframe_sink.add_curve(channel, key_times, key_values, dropped_key_count)
+		channels.append((channel, len(key_values), dropped_key_count))
+	return channels
+
+#######################################################################
+# Gets the channel a binding keys (None for an unknown axis)
+#######################################################################
+def get_binding_channel(binding):
+	if binding.mapping_row.axis != None:
+		return get_rotation_channel(binding.item, binding.mapping_row.axis)
+	return binding.item.channel(binding.channel_name)
+
+#######################################################################
+# Gets the manifest key of a channel
+#######################################################################
+def get_channel_key(channel):
+	return channel.item.id + '.' + channel.name
+
+#######################################################################
+# A scene channel bound to a mapping row
+# channel_name is only set for BlendShape rows (Item rows key the rotation axis)
+#######################################################################
+class Binding(object):
+	def __init__(self, item, channel_name, mapping_row):
+		self.item = item
+		self.channel_name = channel_name
+		self.mapping_row = mapping_row
+
+#######################################################################
+# Gets the candidate items for the root item in one iterative pass
+# Item Mode: the item, its children (all levels) and the morph deformers of meshes
+# Actor Mode: the actor's items
+# Items reached through several paths are only returned once
+#######################################################################
+def list_candidate_items(root_item, mode):
+	result = []
+	visited = set()
+	if mode == MODE_ACTOR:
+		pending = list(reversed(list(root_item.items)))
+	else:
+		pending = [root_item]
+
+	while len(pending) > 0:
+		item = pending.pop()
+		if item.id in visited:
+			continue
+		visited.add(item.id)
+		item_type = item.type
+		result.append((item, item_type))
+
+		if mode == MODE_ITEM:
+			#the children are processed after the morph deformers (so push them first)
+			pending.extend(reversed(list(item.children())))
+			if item_type == 'mesh':
+				pending.extend(reversed([deformer for deformer in item.deformers if deformer.type == 'morphDeform']))
+
+	return result
+
+#######################################################################
+# Gets the bindings on the items, their children (all levels) and the
+# morph deformers of meshes (as Item Mode finds them)
+#######################################################################
+def get_item_bindings(bindings, items):
+	item_ids = set(item.id for root_item in items for item, item_type in list_candidate_items(root_item, MODE_ITEM))
+	return [binding for binding in bindings if binding.item.id in item_ids]
+
+#######################################################################
+# Resolves the mapping's targets against the scene
+# Returns the bindings (in hierarchy order) and the mapping targets that matched nothing
+# The items visited and channels matched are counted in the report (ApplyReport) when given
+#######################################################################
+def resolve_bindings(root_item, mapping, mode, blend_target_type, report=None):
+	bindings = []
+	bound = set()
+	matched_targets = set()
+
+	def add_binding(item, channel_name, mapping_row, target_key):
+		binding_key = (item.id, channel_name, mapping_row.axis, id(mapping_row))
+		matched_targets.add(target_key)
+		if binding_key not in bound:
+			bound.add(binding_key)
+			bindings.append(Binding(item, channel_name, mapping_row))
+
+	#index the candidate items by name and intersect them with the mapping targets
+	candidate_items = list_candidate_items(root_item, mode)
+	for item, item_type in candidate_items:
+		item_key = item.name.upper()
+		if blend_target_type == BLEND_TARGET_MORPH:
+			#we only apply one item to the morph as multiple will just override previous runs
+			if item_type == 'morphDeform' and item_key in mapping.morphs:
+				add_binding(item, 'strength', mapping.morphs[item_key], item_key)
+		elif blend_target_type == BLEND_TARGET_CHANNEL:
+			if item_key in mapping.channels:
+				channel_names = { channel_name.upper() : channel_name for channel_name in item.channelNames }
+				for mapping_row in mapping.channels[item_key]:
+					channel_key = mapping_row.target_channel.upper()
+					if channel_key in channel_names:
+						add_binding(item, channel_names[channel_key], mapping_row, (item_key, channel_key))
+		if (item_type == 'locator' or item_type == 'mesh') and item_key in mapping.items:
+			for mapping_row in mapping.items[item_key]:
+				add_binding(item, None, mapping_row, (item_key, mapping_row.axis))
+
+	#for channel mode, the actors's group channels
+	if mode == MODE_ACTOR and blend_target_type == BLEND_TARGET_CHANNEL:
+		for group_channel in root_item.groupChannels:
+			channel_key = (group_channel.item.name.upper(), group_channel.name.upper())
+			for mapping_row in mapping.channels_by_name.get(channel_key, []):
+				add_binding(group_channel.item, group_channel.name, mapping_row, channel_key)
+
+	#report the targets that did not match anything
+	unmatched_targets = []
+	if blend_target_type == BLEND_TARGET_MORPH:
+		unmatched_targets.extend(mapping_row.target for item_key, mapping_row in mapping.morphs.items() if item_key not in matched_targets)
+	elif blend_target_type == BLEND_TARGET_CHANNEL:
+		unmatched_targets.extend(mapping_row.target + '.' + mapping_row.target_channel for channel_key, mapping_rows in mapping.channels_by_name.items() if channel_key not in matched_targets for mapping_row in mapping_rows[:1])
+	for item_key, mapping_rows in mapping.items.items():
+		unmatched_targets.extend(mapping_row.target + '.' + mapping_row.axis for mapping_row in mapping_rows if (item_key, mapping_row.axis) not in matched_targets)
+
+	if report != None:
+		report.count('items_visited', len(candidate_items))
+		report.count('channels_matched', len(bindings))
+		report.count('unmatched_targets', len(unmatched_targets))
+	return bindings, sorted(unmatched_targets)
+
+#######################################################################
+# Applies the curves to the bound channels
+# curve_source is a CurveEvaluator (or BakedCurves from a curve file)
+# The keys of each distinct curve are worked out once (in curve_cache,
+# a new one for the apply by default) and shared by the channels it keys
+# The rotation axes of each item are keyed together, after the other channels
+# The keys and evaluation time of each channel are added to the report (ApplyReport) when given
+# progress (ApplyProgress) is advanced by a unit per binding, raising ApplyCancelled once cancelled
+#######################################################################
+def apply_bindings(bindings, curve_source, keyframe_sink, report=None, curve_cache=None, progress=None):
+	curve_cache = curve_cache if curve_cache != None else CurveCache()
+	hit_count = curve_cache.hit_count
+	rotation_bindings = OrderedDict()
+	for binding in bindings:
+		if binding.mapping_row.axis != None:
+			if binding.mapping_row.axis in ROTATION_AXES:
+				rotation_bindings.setdefault(binding.item.id, []).append(binding)
+			continue
+		start_time = time.time()
+		key_count = keyframe_sink.key_count + keyframe_sink.pending_keys
+		dropped_key_count = keyframe_sink.dropped_key_count
+		channel = apply_channel(binding.item, binding.channel_name, binding.mapping_row, curve_source, keyframe_sink, curve_cache)
+		if report != None:
+			report.add_channel(channel.item.name + '.' + channel.name, keyframe_sink.key_count + keyframe_sink.pending_keys - key_count,
+				keyframe_sink.dropped_key_count - dropped_key_count, time.time() - start_time)
+		if progress != None:
+			progress.advance(1)
+
+	for item_bindings in rotation_bindings.values():
+		start_time = time.time()
+		channels = apply_rotation_track(item_bindings[0].item, get_rotation_rows(item_bindings), curve_source, keyframe_sink, curve_cache)
+		if report != None:
+			#the track's time is shared between its axes
+			evaluate_seconds = (time.time() - start_time) / max(len(channels), 1)
+			for channel, key_count, dropped_key_count in channels:
+				report.add_channel(channel.item.name + '.' + channel.name, key_count, dropped_key_count, evaluate_seconds)
+		if progress != None:
+			progress.advance(len(item_bindings))
+	if report != None:
+		report.count('curves_shared', curve_cache.hit_count - hit_count)
+
+#######################################################################
+# What an apply has to key (see plan_incremental_apply)
+# bindings: the bindings to key
+# channels: the manifest channels (channel key > ManifestChannel) of the apply
+# clear_channels: the channels to clear first (keyed by the last apply and
+# re-keyed now, or no longer mapped)
+# removed_count: the channels no longer mapped (cleared and not re-keyed)
+# unchanged_count: the channels left as they are
+# key_channels: the keys of the channels to key
+#######################################################################
+class IncrementalApply(object):
+	def __init__(self, bindings, channels, clear_channels, removed_count, unchanged_count, key_channels=None):
+		self.bindings = bindings
+		self.channels = channels
+		self.clear_channels = clear_channels
+		self.removed_count = removed_count
+		self.unchanged_count = unchanged_count
+		self.key_channels = key_channels if key_channels != None else set()
+
+	#gets the manifest channels of the apply when it was cancelled with its keys kept
+	#written_channels: the (item id, channel name) of the channels keyed in full (see KeyframeSink)
+	#the channels it did not key in full get a blank hash, so the next apply clears and keys them again
+	def partial_channels(self, written_channels):
+		written_keys = set(item_id + '.' + channel_name for item_id, channel_name in written_channels)
+		channels = OrderedDict()
+		for channel_key, channel in self.channels.items():
+			if channel_key in self.key_channels and channel_key not in written_keys:
+				channel = ManifestChannel(channel.item_id, channel.channel_name, '')
+			channels[channel_key] = channel
+		return channels
+
+#######################################################################
+# Works out what an apply has to key, against the channels the last apply
+# to the target keyed (manifest_channels, see ApplyManifest)
+# Each channel's input hash covers the apply inputs (input_hash), the
+# channel type and the mapping rows that key it. A channel is re-keyed
+# when its hash changed or its keys are gone (e.g. undone), with
+# incremental False every bound channel is re-keyed.
+# The rotation axes of an item are keyed together (see apply_rotation_track),
+# so they are re-keyed together, and an item not in CAPTURE_ROTATION_ORDER
+# keys all three axes (its rotation order is part of their hash).
+#######################################################################
+def plan_incremental_apply(scene, bindings, input_hash, manifest_channels, keyframe_backend, action_name, incremental=True):
+	#the mapping rows of each channel (several rows can key the same channel)
+	channels = OrderedDict()
+	channel_rows = {}
+	rotation_items = OrderedDict()
+	for binding in bindings:
+		channel = get_binding_channel(binding)
+		if channel == None:
+			continue
+		channel_key = get_channel_key(channel)
+		channels[channel_key] = channel
+		channel_rows.setdefault(channel_key, []).append(binding.mapping_row.to_dict())
+		if binding.mapping_row.axis != None:
+			rotation_items.setdefault(binding.item.id, (binding.item, set()))[1].add(channel_key)
+
+	for item, axis_keys in rotation_items.values():
+		rotation_order = get_rotation_order(item)
+		if rotation_order == CAPTURE_ROTATION_ORDER:
+			continue
+		for axis in ROTATION_AXES:
+			channel = get_rotation_channel(item, axis)
+			channel_key = get_channel_key(channel)
+			channels[channel_key] = channel
+			channel_rows[channel_key] = channel_rows.get(channel_key, []) + [rotation_order]
+			axis_keys.add(channel_key)
+
+	applied_channels = {}
+	changed_keys = set()
+	clear_channels = []
+	for channel_key, channel in channels.items():
+		applied_channels[channel_key] = ManifestChannel(channel.item.id, channel.name, get_input_hash(input_hash, channel.evalType, channel_rows[channel_key]))
+		manifest_channel = manifest_channels.get(channel_key)
+		if (incremental == True and manifest_channel != None and manifest_channel.input_hash == applied_channels[channel_key].input_hash
+			and keyframe_backend.is_animated(channel, action_name) == True):
+			continue
+		changed_keys.add(channel_key)
+		if manifest_channel != None:
+			clear_channels.append(channel)
+	for item, axis_keys in rotation_items.values():
+		if len(axis_keys & changed_keys) > 0:
+			for channel_key in axis_keys - changed_keys:
+				changed_keys.add(channel_key)
+				if channel_key in manifest_channels:
+					clear_channels.append(channels[channel_key])
+
+	#the channels keyed last time that are no longer mapped (or disabled)
+	for channel_key, manifest_channel in manifest_channels.items():
+		if channel_key in channels:
+			continue
+		channel = get_scene_channel(scene, manifest_channel.item_id, manifest_channel.channel_name)
+		if channel != None:
+			clear_channels.append(channel)
+
+	key_bindings = [binding for binding in bindings if get_binding_channel(binding) != None and get_channel_key(get_binding_channel(binding)) in changed_keys]
+	return IncrementalApply(key_bindings, applied_channels, clear_channels, len(clear_channels) - len(changed_keys & set(manifest_channels)),
+		len(channels) - len(changed_keys), changed_keys)
+
+#######################################################################
+# Progress monitor of an apply (Modo's progress dialog, with its Abort button)
+# step returns False once the user aborted
+#######################################################################
+class ModoMonitor(object):
+	def __init__(self, steps=PROGRESS_STEPS, lx_module=None):
+		self.lx = lx_module if lx_module != None else lx
+		self.monitor = self.lx.Monitor()
+		self.monitor.init(steps)
+
+	def step(self, count=1):
+		try:
+			return self.monitor.step(count) != False
+		except RuntimeError:
+			#aborted
+			return False
+
+#######################################################################
+# Gets a channel of the scene by item id and channel name (None if either is gone)
+#######################################################################
+def get_scene_channel(scene, item_id, channel_name):
+	try:
+		item = scene.item(item_id)
+	except LookupError:
+		return None
+	if item == None or channel_name not in item.channelNames:
+		return None
+	return item.channel(channel_name)
+
+#######################################################################
+# Live session: drives the bound channels from a Live Link Face receiver
+# Each tick sets the channels (on the edit layer, no keys) to the mapped
+# values of the latest received frame. Frames older than max_latency are
+# not applied, so the rig never lags behind the stream by more than that.
+# The rotation axes of each item are set together, converted to the
+# item's rotation order as apply_rotation_track keys them.
+#######################################################################
+class LiveSession(object):
+	def __init__(self, bindings, face_neutral, receiver, max_latency=LIVE_LINK_MAX_LATENCY, lx_module=None):
+		self.lx = lx_module if lx_module != None else lx
+		self.receiver = receiver
+		self.max_latency = max_latency
+		self.channels = []
+		mapping_rows = []
+		scales = []
+		rotation_bindings = OrderedDict()
+		for binding in bindings:
+			if binding.mapping_row.axis != None:
+				if binding.mapping_row.axis in ROTATION_AXES:
+					rotation_bindings.setdefault(binding.item.id, []).append(binding)
+				continue
+			channel = binding.item.channel(binding.channel_name)
+			if channel == None:
+				continue
+			self.channels.append(channel)
+			mapping_rows.append(binding.mapping_row)
+			#if the target type is an angle, covert value to be based between 0° & 45°
+			scales.append(ANGLE_SCALE if channel.evalType == 'angle' else 1.0)
+
+		#(rotation order, value index of each axis (None if unmapped), channel of each axis (None if not set)) of each item
+		self.rotation_tracks = []
+		for item_bindings in rotation_bindings.values():
+			item = item_bindings[0].item
+			rotation_order = get_rotation_order(item)
+			axis_indexes = []
+			axis_channels = []
+			for axis, mapping_row in zip(ROTATION_AXES, get_rotation_rows(item_bindings)):
+				if mapping_row != None:
+					axis_indexes.append(len(mapping_rows))
+					mapping_rows.append(mapping_row)
+					scales.append(1.0)
+				else:
+					axis_indexes.append(None)
+				#every axis is set for any other order than the capture's
+				axis_channels.append(get_rotation_channel(item, axis) if mapping_row != None or rotation_order != CAPTURE_ROTATION_ORDER else None)
+			self.rotation_tracks.append((rotation_order, axis_indexes, axis_channels))
+		self.curve_evaluator = LiveCurveEvaluator(mapping_rows, face_neutral)
+		self.scales = numpy.array(scales, dtype=numpy.float64)
+		self.frame_count = 0
+		self.applied_count = 0
+		self.stale_count = 0
+		self.timer = None
+
+	#applies the latest frame (if new and recent), returns whether the channels were set
+	def tick(self):
+		latest = self.receiver.frames.latest()
+		if latest == None or latest[0] == self.frame_count:
+			return False
+		self.frame_count, frame_values, timecode, arrival_time = latest
+		if time.time() - arrival_time > self.max_latency:
+			self.stale_count += 1
+			return False
+		if len(self.channels) == 0 and len(self.rotation_tracks) == 0:
+			return False
+
+		channel_values = self.curve_evaluator.values(frame_values) * self.scales
+		set_values = list(zip(self.channels, channel_values.tolist()))
+		for rotation_order, axis_indexes, axis_channels in self.rotation_tracks:
+			track = numpy.array([[channel_values[value_index] if value_index != None else 0.0] for value_index in axis_indexes], dtype=numpy.float64)
+			track = convert_rotation_order(track, CAPTURE_ROTATION_ORDER, rotation_order)
+			set_values.extend((channel, float(track[axis_index, 0])) for axis_index, channel in enumerate(axis_channels) if channel != None)
+		if len(set_values) == 0:
+			return False
+
+		lx_object = self.lx.object
+		lx_scene = lx_object.Scene(set_values[0][0].item.Context())
+		chan_write = lx_object.ChannelWrite(lx_scene.Channels(self.lx.symbol.s_ACTIONLAYER_EDIT, 0.0))
+		for channel, channel_value in set_values:
+			chan_write.Double(channel.item, channel.index, channel_value)
+		self.applied_count += 1
+		return True
+
+#######################################################################
+# Scene timer of the live session (Modo timers fire once, so it re-arms itself)
+#######################################################################
+class LiveTimer(lxifc.Visitor):
+	def __init__(self, live_session, interval):
+		self.live_session = live_session
+		self.interval = interval
+		self.running = False
+
+	def start(self):
+		self.running = True
+		lx.service.Scheduler().AddTimer(self, self.interval)
+
+	def stop(self):
+		if self.running == True:
+			self.running = False
+			lx.service.Scheduler().RemoveTimer(self)
+
+	def vis_Evaluate(self):
+		if self.running == False:
+			return
+		try:
+			self.live_session.tick()
+		finally:
+			if self.running == True:
+				lx.service.Scheduler().AddTimer(self, self.interval)
+
+#######################################################################
+# Starts the live session at the scene frame rate (the receiver is started too)
+#######################################################################
+def start_live_session(live_session, fps):
+	global _live_session
+	stop_live_session()
+	live_session.receiver.start()
+	live_session.timer = LiveTimer(live_session, max(int(1000.0 / fps), 1))
+	live_session.timer.start()
+	_live_session = live_session
+	return live_session
+
+#######################################################################
+# Stops the running live session, returns it (None if not running)
+#######################################################################
+def stop_live_session():
+	global _live_session
+	live_session = _live_session
+	_live_session = None
+	if live_session != None:
+		live_session.timer.stop()
+		live_session.receiver.stop()
+	return live_session
+
+#######################################################################
+# Gets the running live session (None if not running)
+#######################################################################
+def get_live_session():
+	return _live_session
+
+#######################################################################
+# Preview bake: a decimated apply (every frame_step-th frame) of the
+# root item, keyed on to action_name (None for the edit layer) until a
+# full apply promotes it
+# channels: the manifest channels (see ManifestChannel) the preview keyed
+# settings_hash: the settings the preview was keyed with (Promote keys
+# the full take only while they are unchanged)
+#######################################################################
+class PreviewBake(object):
+	def __init__(self, root_item_id, action_name, channels, frame_step, settings_hash=None):
+		self.root_item_id = root_item_id
+		self.action_name = action_name
+		self.channels = channels
+		self.frame_step = frame_step
+		self.settings_hash = settings_hash
+
+#######################################################################
+# Sets the last preview bake (None once it is promoted), kept for the Modo session
+#######################################################################
+def set_preview_bake(preview_bake):
+	global _preview_bake
+	_preview_bake = preview_bake
+	return preview_bake
+
+#######################################################################
+# Gets the last preview bake of the root item (None if there is none)
+#######################################################################
+def get_preview_bake(root_item_id):
+	if _preview_bake != None and _preview_bake.root_item_id == root_item_id:
+		return _preview_bake
+	return None
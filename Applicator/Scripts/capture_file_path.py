@@ -5,11 +5,8 @@
 import lx
 import modo
 
-capture_file_type = lx.eval('user.value applicator.capture_file_type ?')
-if capture_file_type == 'Live Link Face':
-    capture_file_path = modo.dialogs.customFile('fileOpen', 'Face capture csv', ('csv',), ('CSV File',), ('*.csv',))
-elif capture_file_type == 'Face Cap':
-    capture_file_path = modo.dialogs.customFile('fileOpen', 'Face capture txt', ('txt',), ('TXT File',), ('*.txt',))
+#the capture format (Live Link Face or Face Cap) is read from the file when applying
+capture_file_path = modo.dialogs.customFile('fileOpen', 'Face capture file', ('csv', 'txt', 'npz'), ('Live Link Face CSV File', 'Face Cap TXT File', 'Applicator Curve File'), ('*.csv', '*.txt', '*.npz'))
 
 if capture_file_path != None:
     lx.eval('user.value applicator.capture_file_path [' + capture_file_path + ']')    
@@ -5,11 +5,8 @@
 import lx
 import modo
 
-capture_file_type = lx.eval('user.value applicator.capture_file_type ?')
-if capture_file_type == 'Live Link Face':
-    neutral_file_path = modo.dialogs.customFile('fileOpen', 'Neutral capture csv', ('csv',), ('CSV File',), ('*.csv',))
-elif capture_file_type == 'Face Cap':
-    neutral_file_path = modo.dialogs.customFile('fileOpen', 'Neutral capture txt', ('txt',), ('TXT File',), ('*.txt',))
+#the capture format (Live Link Face or Face Cap) is read from the file when applying
+neutral_file_path = modo.dialogs.customFile('fileOpen', 'Neutral capture file', ('csv', 'txt'), ('Live Link Face CSV File', 'Face Cap TXT File'), ('*.csv', '*.txt'))
 
 if neutral_file_path != None:
     lx.eval('user.value applicator.neutral_file_path [' + neutral_file_path + ']')    
@@ -0,0 +1,431 @@
+# python
+#######################################################################
+# Applicator Kit for Modo: benchmarks
+# Times each stage of an apply (parsing, mapping, evaluation and keying)
+# on synthetic takes and rigs, outside Modo (see fake_modo), and checks
+# the keys written against the original per-frame apply_channel and
+# apply_rotation semantics, resampled to other frame rates, with each
+# smoothing filter and with key reduction
+#
+# Usage (from the repository folder):
+#   python benchmarks/bench.py [--frames 3600 36000] [--fanout 1 4] [--rig-size 1 20] [--json results.json]
+#
+# © Copyright 2020 All Rights Reserved: Chameleon-Workshop.com
+#######################################################################
+import argparse
+import csv
+import itertools
+import json
+import math
+import numpy
+import os
+import os.path
+import shutil
+import sys
+import tempfile
+import time
+
+benchmarks_path = os.path.dirname(os.path.abspath(__file__))
+scripts_path = os.path.join(os.path.dirname(benchmarks_path), 'Applicator', 'Scripts')
+if scripts_path not in sys.path:
+	sys.path.append(scripts_path)
+
+import fake_modo
+from fake_modo import FakeScene
+
+#the stand-in has to be in place before applicator_modo is imported
+fake_modo.install(FakeScene(), scripts_path=scripts_path)
+
+from applicator_core import ANGLE_SCALE, BLEND_TARGET_CHANNEL, BLEND_TARGET_MORPH, CAPTURE_FORMAT_FACE_CAP, CAPTURE_FORMAT_LIVE_LINK_FACE, CAPTURE_VALUE_WIDTH, DATA_ITEM_NAMES, DATA_MORPH_NAMES
+from applicator_core import CAPTURE_FPS, CurveEvaluator, KeyframeSink, get_capture_timeline, get_face_neutral, get_maps, list_csv_data, load_capture_data
+from applicator_core.smoothing import SMOOTH_GAUSS, SMOOTH_MEAN, SMOOTH_ONE_EURO, SMOOTH_SAVGOL
+from applicator_modo import MODE_ACTOR, MODE_ITEM, ModoKeyframeBackend, apply_bindings, resolve_bindings
+
+from synthetic import SYNTHETIC_FPS, build_synthetic_rig, write_synthetic_capture, write_synthetic_face_cap, write_synthetic_mapping
+
+#Declare CONSTANTS (so to speak)
+BENCH_NEUTRAL_FRAMES = 300
+#channel values are rounded to 4 places and have to match the original exactly, bar the last bits of the angle scaling
+BENCH_ROUND_TOLERANCE = 1e-12
+BENCH_VALUE_TOLERANCE = 1e-6
+#other than for the original smoothing at the capture fps, a value this close to a rounding tie
+#(where the filter or the resampling adds up in another order) can round either way
+BENCH_TIE_DISTANCE = 1e-9
+#the semantics checks: scene fps, Smooth (every other mapping row), Tolerance, take length (None for --verify-frames),
+#Multiplier (None for the multipliers varying between rows) and the fps the take was recorded at
+BENCH_VERIFY_CASES = [
+	(60.0, 'Y', 0.0, None, None, SYNTHETIC_FPS),
+	(24.0, 'Y', 0.0, None, None, SYNTHETIC_FPS),
+	(29.97, 'gauss:9', 0.001, None, None, SYNTHETIC_FPS),
+	(23.976, 'savgol:9,3', 0.001, None, None, SYNTHETIC_FPS),
+	(30.0, 'oneeuro:1.0,0.007', 0.0, None, None, SYNTHETIC_FPS),
+	#takes shorter than the smoothing window
+	(24.0, 'gauss:9', 0.001, 5, None, SYNTHETIC_FPS),
+	(29.97, 'savgol:9,3', 0.0, 5, None, SYNTHETIC_FPS),
+	#a multiplier below 1 puts the values between the rounding steps of the capture's 4 decimals
+	(60.0, 'Y', 0.0, None, 0.5, SYNTHETIC_FPS),
+	(60.0, 'N', 0.0, None, 0.5, SYNTHETIC_FPS),
+	#takes recorded at 30 fps
+	(30.0, 'Y', 0.0, None, None, 30),
+	(24.0, 'N', 0.0, None, None, 30),
+]
+
+#######################################################################
+# Curve source of curves already evaluated (so keying can be timed alone)
+#######################################################################
+class EvaluatedCurves(object):
+	def __init__(self, curves):
+		self.curves = curves
+
+	def curve(self, mapping_row):
+		return self.curves[id(mapping_row)]
+
+#######################################################################
+# Times a stage: runs it repeat times and keeps the quickest
+# Returns (seconds, result of the last run)
+#######################################################################
+def time_stage(stage, repeat):
+	best_time = None
+	result = None
+	for run in range(max(repeat, 1)):
+		start_time = time.time()
+		result = stage()
+		run_time = time.time() - start_time
+		if best_time == None or run_time < best_time:
+			best_time = run_time
+	return best_time, result
+
+#######################################################################
+# Runs one scenario, returns its stage times and counts
+#######################################################################
+def run_scenario(data_path, frames, fanout, rig_size, blend_target_type, mode, fps, repeat, capture_format=CAPTURE_FORMAT_LIVE_LINK_FACE):
+	if capture_format == CAPTURE_FORMAT_FACE_CAP:
+		capture_path = os.path.join(data_path, 'capture_' + str(frames) + '.txt')
+		if not os.path.isfile(capture_path):
+			write_synthetic_face_cap(capture_path, frames)
+	else:
+		capture_path = os.path.join(data_path, 'capture_' + str(frames) + '.csv')
+		if not os.path.isfile(capture_path):
+			write_synthetic_capture(capture_path, frames)
+	neutral_path = os.path.join(data_path, 'neutral.csv')
+	if not os.path.isfile(neutral_path):
+		write_synthetic_capture(neutral_path, BENCH_NEUTRAL_FRAMES, seed=1)
+	mapping_path = write_synthetic_mapping(os.path.join(data_path, 'mapping.csv'), fanout, blend_target_type == BLEND_TARGET_CHANNEL)
+
+	scene = FakeScene(fps)
+	fake_modo.install(scene, scripts_path=scripts_path)
+	rig, actor = build_synthetic_rig(scene, fanout, rig_size)
+	root_item = actor if mode == MODE_ACTOR else rig
+	frame_to_time = lambda frame: frame / float(fps)
+
+	#parsing: the capture and neutral files, the neutral and the timeline
+	def parse():
+		capture_frames = load_capture_data(capture_path, CAPTURE_VALUE_WIDTH)
+		face_neutral = get_face_neutral(DATA_MORPH_NAMES, neutral_path)
+		return capture_frames, face_neutral, get_capture_timeline(capture_frames, fps, 0, 0, frame_to_time)
+	parse_time, (capture_frames, face_neutral, capture_timeline) = time_stage(parse, repeat)
+
+	#mapping: compile the mapping file and resolve it against the rig
+	def map_targets():
+		mapping = get_maps(DATA_MORPH_NAMES, DATA_ITEM_NAMES, list_csv_data(mapping_path), blend_target_type)
+		return mapping, resolve_bindings(root_item, mapping, mode, blend_target_type)
+	mapping_time, (mapping, (bindings, unmatched_targets)) = time_stage(map_targets, repeat)
+
+	#evaluation: every bound row's curve
+	curve_evaluator = CurveEvaluator(capture_frames, face_neutral.values, capture_timeline)
+	def evaluate():
+		curve_evaluator.curve_cache.clear()
+		return dict((id(binding.mapping_row), curve_evaluator.curve(binding.mapping_row)) for binding in bindings)
+	evaluate_time, curves = time_stage(evaluate, repeat)
+
+	#keying: angle scaling, key reduction and the keyframe writes
+	def key():
+		scene.recorder.clear()
+		keyframe_sink = KeyframeSink(ModoKeyframeBackend())
+		apply_bindings(bindings, EvaluatedCurves(curves), keyframe_sink)
+		keyframe_sink.flush()
+		return keyframe_sink
+	key_time, keyframe_sink = time_stage(key, repeat)
+
+	return {'capture_format': capture_format, 'frames': frames, 'fanout': fanout, 'rig_size': rig_size, 'blend_target_type': blend_target_type, 'mode': mode, 'fps': fps,
+		'items': len(scene.items), 'mapped_targets': mapping.row_count(), 'bindings': len(bindings), 'unmatched_targets': len(unmatched_targets),
+		'channels_keyed': keyframe_sink.channel_count, 'keys_written': keyframe_sink.key_count,
+		'parse': parse_time, 'mapping': mapping_time, 'evaluate': evaluate_time, 'key': key_time,
+		'total': parse_time + mapping_time + evaluate_time + key_time}
+
+#######################################################################
+# Gets the capture file's values as text columns (name > [text, ...])
+#######################################################################
+def read_text_columns(capture_path):
+	with open(capture_path) as capture_file:
+		csv_reader = csv.reader(capture_file)
+		names = next(csv_reader)
+		columns = dict((name, []) for name in names)
+		for row in csv_reader:
+			for name, text in zip(names, row):
+				columns[name].append(text)
+	return columns
+
+#######################################################################
+# Gets the capture time (in seconds from the first frame) of each of the
+# synthetic timecodes (HH:MM:SS:FF.sss at capture_fps)
+#######################################################################
+def get_reference_times(timecodes, capture_fps=SYNTHETIC_FPS):
+	times = []
+	for timecode in timecodes:
+		hours, minutes, seconds, frames = [float(part) for part in timecode.split(':')]
+		times.append(hours * 3600 + minutes * 60 + seconds + frames / capture_fps)
+	return [capture_time - times[0] for capture_time in times]
+
+#######################################################################
+# Smooths the values, a value at a time, as the smoothing spec's filter
+# is defined: a rolling average, a Gaussian weighted average (both cut
+# short at the ends), a Savitzky-Golay least squares fit of each window
+# (the first and last windows' fits for the ends) or the One Euro filter
+#######################################################################
+def get_reference_smoothed(values, smooth):
+	if smooth == None:
+		return values
+	filter_name, settings = smooth
+	value_count = len(values)
+	if filter_name == SMOOTH_MEAN or filter_name == SMOOTH_GAUSS:
+		half_width = settings[0] // 2
+		smoothed_values = []
+		for index in range(value_count):
+			weighted_sum = 0.0
+			weight_total = 0.0
+			for range_index in range(max(index - half_width, 0), min(index + half_width + 1, value_count)):
+				weight = 1.0 if filter_name == SMOOTH_MEAN else math.exp(-0.5 * ((range_index - index) / max(settings[1], 1e-6)) ** 2)
+				weighted_sum += values[range_index] * weight
+				weight_total += weight
+			smoothed_values.append(weighted_sum / weight_total)
+		return smoothed_values
+	if filter_name == SMOOTH_SAVGOL:
+		width = min(settings[0], value_count if value_count % 2 == 1 else value_count - 1)
+		order = min(settings[1], width - 1)
+		if width < 3 or order < 1:
+			return values
+		half_width = width // 2
+		smoothed_values = []
+		for index in range(value_count):
+			window_start = min(max(index - half_width, 0), value_count - width)
+			fit = numpy.polyfit(range(width), values[window_start:window_start + width], order)
+			smoothed_values.append(float(numpy.polyval(fit, index - window_start)))
+		return smoothed_values
+	if filter_name == SMOOTH_ONE_EURO:
+		min_cutoff, beta, derivative_cutoff = settings
+		smoothed_values = [values[0]] if value_count > 0 else []
+		derivative = 0.0
+		for value in values[1:]:
+			derivative_alpha = 1.0 / (1.0 + CAPTURE_FPS / (2 * math.pi * derivative_cutoff))
+			derivative += derivative_alpha * ((value - smoothed_values[-1]) * CAPTURE_FPS - derivative)
+			value_alpha = 1.0 / (1.0 + CAPTURE_FPS / (2 * math.pi * (min_cutoff + beta * abs(derivative))))
+			smoothed_values.append(smoothed_values[-1] + value_alpha * (value - smoothed_values[-1]))
+		return smoothed_values
+	raise ValueError(filter_name)
+
+#######################################################################
+# Gets the value at each scene frame (frame / fps from the first capture
+# frame), interpolated between the capture frames either side of it
+#######################################################################
+def get_reference_resampled(values, capture_times, fps):
+	frame_count = int(math.floor(capture_times[-1] * fps + 1e-6)) + 1
+	resampled_values = []
+	capture_index = 0
+	for frame in range(frame_count):
+		sample_time = frame / float(fps)
+		while capture_index < len(capture_times) - 2 and capture_times[capture_index + 1] <= sample_time:
+			capture_index += 1
+		if capture_index == len(capture_times) - 1:
+			resampled_values.append(values[capture_index])
+			continue
+		weight = (sample_time - capture_times[capture_index]) / (capture_times[capture_index + 1] - capture_times[capture_index])
+		weight = min(max(weight, 0.0), 1.0)
+		resampled_values.append(values[capture_index] * (1 - weight) + values[capture_index + 1] * weight)
+	return resampled_values
+
+#######################################################################
+# The original per-frame semantics of a capture value, frame by frame:
+# cut to the value width, smoothed, resampled to the scene's fps, then
+# apply_rotation (clip -1 to 1, shift, 90 degrees x multiplier, radians)
+# or apply_channel (clip 0 to 1, shift, multiplier, neutralize, round to
+# 4 places, 0 to 45 degrees for angle channels)
+# Returns the values and whether each one may round either way (it is
+# within BENCH_TIE_DISTANCE of a rounding tie and not the original
+# smoothing at the capture fps)
+#######################################################################
+def get_reference_values(text_values, capture_times, fps, mapping_row, neutral, is_angle, capture_fps=SYNTHETIC_FPS):
+	values = [float(text[:CAPTURE_VALUE_WIDTH]) for text in text_values]
+	values = get_reference_resampled(get_reference_smoothed(values, mapping_row.smooth), capture_times, fps)
+	is_original = mapping_row.smooth in (None, (SMOOTH_MEAN, (7,))) and fps == capture_fps
+
+	result = []
+	near_ties = []
+	for strength in values:
+		if mapping_row.axis != None:
+			strength = max(min(strength, 1.0), -1.0) + mapping_row.value_shift
+			result.append(math.radians(strength * 90 * mapping_row.multiplier))
+			near_ties.append(False)
+		else:
+			strength = (max(min(strength, 1.0), 0.0) + mapping_row.value_shift) * mapping_row.multiplier
+			strength = (strength - neutral) / (1 - neutral)
+			scaled_strength = abs(strength) * 10 ** 4
+			near_ties.append(is_original == False and abs(scaled_strength - math.floor(scaled_strength) - 0.5) < BENCH_TIE_DISTANCE * 10 ** 4)
+			strength = round(strength, 4)
+			result.append(strength * ANGLE_SCALE if is_angle == True else strength)
+	return result, near_ties
+
+#######################################################################
+# The original neutral: the mean of the clamped values over the middle third
+# (neutral values were never cut to the value width)
+#######################################################################
+def get_reference_neutral(text_values):
+	values = [min(max(float(text), 0.0), 1.0) for text in text_values]
+	frame_start = int(len(values) / 3)
+	if frame_start == 0:
+		return 0.0
+	return round(sum(values[frame_start:frame_start * 2]) / frame_start, 10)
+
+#######################################################################
+# Checks the keys of an apply against the original semantics
+# The scene is at fps and every other mapping row has the smooth filter.
+# Without key reduction (tolerance 0) every scene frame has a key with
+# its reference value. With it, each key kept has its frame's reference
+# value, the first and last frames are kept, and the curve through the
+# keys is within the tolerance of every frame's reference value.
+# Returns (curves checked, keys checked, largest difference, failures)
+#######################################################################
+def verify_scenario(data_path, frames, fanout, rig_size, blend_target_type, mode, fps=60.0, smooth='Y', tolerance=0.0, multiplier=None, capture_fps=SYNTHETIC_FPS):
+	capture_path = os.path.join(data_path, 'verify_' + str(frames) + '_' + str(capture_fps) + '.csv')
+	write_synthetic_capture(capture_path, frames, 2, capture_fps)
+	neutral_path = os.path.join(data_path, 'verify_neutral.csv')
+	write_synthetic_capture(neutral_path, BENCH_NEUTRAL_FRAMES, seed=3)
+	mapping_path = write_synthetic_mapping(os.path.join(data_path, 'verify_mapping.csv'), fanout, blend_target_type == BLEND_TARGET_CHANNEL, smooth, tolerance, multiplier)
+
+	scene = FakeScene(fps)
+	fake_modo.install(scene, scripts_path=scripts_path)
+	rig, actor = build_synthetic_rig(scene, fanout, rig_size)
+	root_item = actor if mode == MODE_ACTOR else rig
+
+	capture_frames = load_capture_data(capture_path, CAPTURE_VALUE_WIDTH)
+	face_neutral = get_face_neutral(DATA_MORPH_NAMES, neutral_path)
+	capture_timeline = get_capture_timeline(capture_frames, fps, 0, 0)
+	mapping = get_maps(DATA_MORPH_NAMES, DATA_ITEM_NAMES, list_csv_data(mapping_path), blend_target_type)
+	bindings, unmatched_targets = resolve_bindings(root_item, mapping, mode, blend_target_type)
+	keyframe_sink = KeyframeSink(ModoKeyframeBackend())
+	apply_bindings(bindings, CurveEvaluator(capture_frames, face_neutral.values, capture_timeline), keyframe_sink)
+	keyframe_sink.flush()
+
+	capture_columns = read_text_columns(capture_path)
+	capture_times = get_reference_times(capture_columns['Timecode'], capture_fps)
+	neutral_columns = read_text_columns(neutral_path)
+	curve_count = 0
+	key_count = 0
+	largest_difference = 0.0
+	failures = []
+	for binding in bindings:
+		mapping_row = binding.mapping_row
+		if mapping_row.axis != None:
+			channel = getattr(binding.item.rotation, mapping_row.axis.lower())
+			neutral = 0.0
+		else:
+			channel = binding.item.channel(binding.channel_name)
+			neutral = get_reference_neutral(neutral_columns[mapping_row.name])
+		reference_values, near_ties = get_reference_values(capture_columns[mapping_row.name], capture_times, fps, mapping_row, neutral,
+			mapping_row.axis == None and channel.evalType == 'angle', capture_fps)
+		keys = scene.recorder.keys.get((channel.item.name, channel.name, None), [])
+		channel_name = channel.item.name + '.' + channel.name + ' (' + str(fps) + ' fps from ' + str(capture_fps) + ' fps, ' + smooth + ', tolerance ' + str(tolerance) + ', multiplier ' + str(mapping_row.multiplier) + ')'
+
+		curve_count += 1
+		key_count += len(keys)
+		if tolerance <= 0 and len(keys) != len(reference_values):
+			failures.append(channel_name + ': ' + str(len(keys)) + ' keys, expected ' + str(len(reference_values)))
+			continue
+		value_tolerance = BENCH_VALUE_TOLERANCE if mapping_row.axis != None else BENCH_ROUND_TOLERANCE
+
+		#the keys kept
+		key_frames = []
+		for key_time, key_value in keys:
+			frame = int(round(key_time * fps))
+			if frame < 0 or frame >= len(reference_values) or abs(key_time - frame / fps) > 1e-9 or (len(key_frames) > 0 and frame <= key_frames[-1]):
+				failures.append(channel_name + ': key at ' + repr(key_time) + ' is not on a frame of the take')
+				break
+			difference = abs(key_value - reference_values[frame])
+			if near_ties[frame] == True:
+				difference = min(difference, abs(difference - 1e-4 * (ANGLE_SCALE if channel.evalType == 'angle' else 1.0)))
+			largest_difference = max(largest_difference, difference)
+			if difference > value_tolerance:
+				failures.append(channel_name + ' frame ' + str(frame) + ': ' + repr(key_value) + ', expected ' + repr(reference_values[frame]))
+				break
+			key_frames.append(frame)
+		else:
+			if len(key_frames) == 0 or key_frames[0] != 0 or key_frames[-1] != len(reference_values) - 1:
+				failures.append(channel_name + ': the first and last frames are not keyed')
+				continue
+
+			#the frames dropped
+			for key_index in range(len(keys) - 1):
+				(start_time, start_value), (end_time, end_value) = keys[key_index], keys[key_index + 1]
+				for frame in range(key_frames[key_index] + 1, key_frames[key_index + 1]):
+					line_value = start_value + (end_value - start_value) * (frame / fps - start_time) / (end_time - start_time)
+					if abs(line_value - reference_values[frame]) > tolerance + value_tolerance:
+						failures.append(channel_name + ' frame ' + str(frame) + ' (dropped): ' + repr(line_value) + ', expected ' + repr(reference_values[frame]))
+						break
+
+	return curve_count, key_count, largest_difference, failures
+
+#######################################################################
+# Runs the benchmarks
+#######################################################################
+def main(argv=None):
+	parser = argparse.ArgumentParser(prog='bench.py', description='Benchmark the Applicator Kit apply stages on synthetic takes and rigs.')
+	parser.add_argument('--frames', type=int, nargs='+', default=[3600, 36000], help='take lengths in capture frames (default: %(default)s)')
+	parser.add_argument('--fanout', type=int, nargs='+', default=[1, 4], help='targets per BlendShape (default: %(default)s)')
+	parser.add_argument('--rig-size', type=int, nargs='+', default=[1, 20], help='meshes in the rig (default: %(default)s)')
+	parser.add_argument('--blend-target-type', choices=(BLEND_TARGET_MORPH, BLEND_TARGET_CHANNEL), nargs='+', default=[BLEND_TARGET_MORPH], help='BlendShape target types (default: %(default)s)')
+	parser.add_argument('--capture-format', choices=(CAPTURE_FORMAT_LIVE_LINK_FACE, CAPTURE_FORMAT_FACE_CAP), nargs='+', default=[CAPTURE_FORMAT_LIVE_LINK_FACE],
+		help='capture file formats (default: %(default)s)')
+	parser.add_argument('--mode', choices=(MODE_ITEM, MODE_ACTOR), default=MODE_ITEM, help='target mode (default: %(default)s)')
+	parser.add_argument('--fps', type=float, default=24.0, help='scene frame rate (default: %(default)s)')
+	parser.add_argument('--repeat', type=int, default=3, help='runs per stage, the quickest is kept (default: %(default)s)')
+	parser.add_argument('--verify-frames', type=int, default=600, help='take length for the semantics check, 0 to skip it (default: %(default)s)')
+	parser.add_argument('--json', help='also write the results to this json file')
+	args = parser.parse_args(argv)
+
+	data_path = tempfile.mkdtemp(prefix='applicator_bench_')
+	results = {'scenarios': [], 'verify': []}
+	failed = False
+	try:
+		#the keys have to match the original semantics before the timings mean anything
+		if args.verify_frames > 0:
+			for blend_target_type, (fps, smooth, tolerance, frames, multiplier, capture_fps) in itertools.product(args.blend_target_type, BENCH_VERIFY_CASES):
+				frames = frames if frames != None else args.verify_frames
+				curve_count, key_count, largest_difference, failures = verify_scenario(data_path, frames, 2, 2, blend_target_type, args.mode, fps, smooth, tolerance,
+					multiplier, capture_fps)
+				results['verify'].append({'blend_target_type': blend_target_type, 'fps': fps, 'smooth': smooth, 'tolerance': tolerance, 'frames': frames,
+					'multiplier': multiplier, 'capture_fps': capture_fps, 'curves': curve_count, 'keys': key_count, 'largest_difference': largest_difference,
+					'failures': failures})
+				print('verify %-7s %6.3f fps (from %2d) %-17s tolerance %-5g frames %5d multiplier %-4s curves %5d keys %8d largest difference %.3g: %s' % (blend_target_type,
+					fps, capture_fps, smooth, tolerance, frames, multiplier if multiplier != None else '-', curve_count, key_count, largest_difference,
+					'OK' if len(failures) == 0 else 'FAILED'))
+				for failure in failures[:10]:
+					print('  ' + failure)
+				failed = failed or len(failures) > 0
+
+		print('%-14s %8s %6s %5s %-7s %8s %8s %9s %8s %8s %8s %8s %8s' % ('format', 'frames', 'fanout', 'rig', 'target', 'bindings', 'items', 'keys',
+			'parse', 'mapping', 'evaluate', 'key', 'total'))
+		for capture_format, frames, fanout, rig_size, blend_target_type in itertools.product(args.capture_format, args.frames, args.fanout, args.rig_size, args.blend_target_type):
+			result = run_scenario(data_path, frames, fanout, rig_size, blend_target_type, args.mode, args.fps, args.repeat, capture_format)
+			results['scenarios'].append(result)
+			print('%-14s %8d %6d %5d %-7s %8d %8d %9d %8.3f %8.3f %8.3f %8.3f %8.3f' % (capture_format, frames, fanout, rig_size, blend_target_type, result['bindings'],
+				result['items'], result['keys_written'], result['parse'], result['mapping'], result['evaluate'], result['key'], result['total']))
+	finally:
+		shutil.rmtree(data_path, ignore_errors=True)
+
+	if args.json:
+		with open(args.json, 'w') as json_file:
+			json.dump(results, json_file, indent=1)
+	return 1 if failed == True else 0
+
+if __name__ == '__main__':
+	sys.exit(main())
@@ -0,0 +1,428 @@
+# python
+#######################################################################
+# Applicator Kit for Modo: benchmark stand-in for lx, lxifc and modo
+# A small recording scene (items, channels, morph deformers, actors and
+# actions) with just enough of the lx and modo modules for the kit's
+# scripts and applicator_modo to run outside Modo. Every key, channel
+# value, command and dialog is recorded for the benchmarks to check.
+#
+# © Copyright 2020 All Rights Reserved: Chameleon-Workshop.com
+#######################################################################
+import sys
+import types
+
+#Declare CONSTANTS (so to speak)
+ACTION_LAYER_EDIT = 'edit'
+ROTATION_CHANNEL_NAMES = ['rot.X', 'rot.Y', 'rot.Z']
+#envelope sides (lx.symbol.iENVSIDE_IN / OUT)
+SIDE_IN = 1
+SIDE_OUT = 2
+
+#######################################################################
+# Records what the kit does to the scene
+# keys: (item name, channel name, action) > [(time, value), ...]
+# key_states: (item name, channel name, action) > {time: {key state > value}}
+#   (the interpolation, breaks, out value and slopes set on a key)
+# interpolations: (item name, channel name, action) > envelope interpolation
+# values: (item name, channel name) > value set on the edit layer
+#######################################################################
+class SceneRecorder(object):
+	def __init__(self):
+		self.keys = {}
+		self.key_states = {}
+		self.interpolations = {}
+		self.values = {}
+		self.commands = []
+		self.alerts = []
+		self.timers = []
+		#the progress monitor's steps, and the step the user aborts at (None to run to the end)
+		self.monitor_steps = 0
+		self.abort_step = None
+
+	def add_key(self, channel, key_time, key_value, action_name):
+		self.keys.setdefault((channel.item.name, channel.name, action_name), []).append((key_time, key_value))
+
+	def key_count(self):
+		return sum(len(keys) for keys in self.keys.values())
+
+	#the keys, key states and interpolations of the channels of an action
+	def action_channels(self, action_name):
+		return [(channels, key) for channels in (self.keys, self.key_states, self.interpolations) for key in channels if key[2] == action_name]
+
+	def clear(self):
+		self.keys = {}
+		self.key_states = {}
+		self.interpolations = {}
+		self.values = {}
+		self.commands = []
+		self.alerts = []
+
+#######################################################################
+# A channel of a fake item
+#######################################################################
+class FakeChannel(object):
+	def __init__(self, item, name, index, eval_type='float'):
+		self.item = item
+		self.name = name
+		self.index = index
+		self.evalType = eval_type
+
+	#channel.set (keys when key is set, otherwise sets the edit layer value)
+	def set(self, value, time=None, key=False, action=ACTION_LAYER_EDIT):
+		if key == True:
+			self.item.scene.recorder.add_key(self, time, value, action if action != ACTION_LAYER_EDIT else None)
+		else:
+			self.item.scene.recorder.values[(self.item.name, self.name)] = value
+
+	#channel.get (the edit layer value, 0 until it is set)
+	def get(self):
+		return self.item.scene.recorder.values.get((self.item.name, self.name), 0)
+
+#######################################################################
+# The rotation channels of a fake item (item.rotation.x etc.)
+# and its rotation order (item.rotation.channel('order'), 0 for XYZ)
+#######################################################################
+class FakeRotation(object):
+	def __init__(self, item):
+		self.x = item.channel(ROTATION_CHANNEL_NAMES[0])
+		self.y = item.channel(ROTATION_CHANNEL_NAMES[1])
+		self.z = item.channel(ROTATION_CHANNEL_NAMES[2])
+		self.order = FakeChannel(item, 'order', -1, 'integer')
+
+	def channel(self, channel_name):
+		if channel_name != 'order':
+			raise LookupError(channel_name)
+		return self.order
+
+#######################################################################
+# A fake scene item
+# Locators and meshes have rotation channels, morph deformers a strength
+# channel, and any item can be given user channels (name > eval type)
+#######################################################################
+class FakeItem(object):
+	def __init__(self, scene, name, item_type, user_channels=None):
+		self.scene = scene
+		self.name = name
+		self.type = item_type
+		self.id = item_type + str(len(scene.items))
+		self.parent = None
+		self.deformers = []
+		self._children = []
+		self._channels = []
+		self._channels_by_name = {}
+		if item_type in ('locator', 'mesh'):
+			for channel_name in ROTATION_CHANNEL_NAMES:
+				self.add_channel(channel_name, 'angle')
+		elif item_type == 'morphDeform':
+			self.add_channel('strength', 'percent')
+		for channel_name, eval_type in (user_channels or {}).items():
+			self.add_channel(channel_name, eval_type)
+		scene.items.append(self)
+
+	def add_channel(self, channel_name, eval_type='float'):
+		channel = FakeChannel(self, channel_name, len(self._channels), eval_type)
+		self._channels.append(channel)
+		self._channels_by_name[channel_name] = channel
+		return channel
+
+	def add_child(self, item):
+		item.parent = self
+		self._children.append(item)
+		return item
+
+	@property
+	def channelNames(self):
+		return [channel.name for channel in self._channels]
+
+	@property
+	def rotation(self):
+		return FakeRotation(self)
+
+	def channel(self, channel_name):
+		return self._channels_by_name.get(channel_name)
+
+	def children(self):
+		return list(self._children)
+
+	def Context(self):
+		return self.scene
+
+#######################################################################
+# A fake actor (a group of items and group channels, with action clips)
+#######################################################################
+class FakeActor(FakeItem):
+	def __init__(self, scene, name):
+		FakeItem.__init__(self, scene, name, 'actor')
+		self.items = []
+		self.groupChannels = []
+
+	def addItems(self, *items):
+		for item in items:
+			if isinstance(item, (list, tuple)):
+				self.items.extend(item)
+			else:
+				self.items.append(item)
+
+#######################################################################
+# A fake action clip
+#######################################################################
+class FakeAction(FakeItem):
+	def __init__(self, scene, name):
+		FakeItem.__init__(self, scene, name, 'actionclip')
+		self.active = False
+
+	@property
+	def name(self):
+		return self._name
+
+	#the keys are recorded by action name, so they move with it
+	@name.setter
+	def name(self, name):
+		old_name = getattr(self, '_name', None)
+		self._name = name
+		if old_name != None and old_name != name:
+			for channels, key in self.scene.recorder.action_channels(old_name):
+				channels[(key[0], key[1], name)] = channels.pop(key)
+
+#######################################################################
+# A fake scene
+#######################################################################
+class FakeScene(object):
+	def __init__(self, fps=60.0):
+		self.fps = fps
+		self.filename = None
+		self.items = []
+		self.actors = []
+		self.selected = []
+		self.recorder = SceneRecorder()
+
+	def addItem(self, item_type, name=None):
+		if item_type == 'actionclip':
+			return FakeAction(self, name)
+		return FakeItem(self, name, item_type)
+
+	def add_actor(self, name):
+		actor = FakeActor(self, name)
+		self.actors.append(actor)
+		return actor
+
+	def getGroups(self, gtype=None):
+		return list(self.actors)
+
+	def removeItems(self, items, children=False):
+		for item in (items if isinstance(items, (list, tuple)) else [items]):
+			if item in self.items:
+				self.items.remove(item)
+			for actor in self.actors:
+				if item in actor.items:
+					actor.items.remove(item)
+			if item.type == 'actionclip':
+				for channels, key in self.recorder.action_channels(item.name):
+					del channels[key]
+
+	def item(self, item_id):
+		for item in self.items:
+			if item.id == item_id or item.name == item_id:
+				return item
+		raise LookupError(item_id)
+
+#######################################################################
+# Envelope of a channel on an action layer (keys are recorded)
+#######################################################################
+class FakeEnvelope(object):
+	def __init__(self, channel, action_name):
+		self.channel = channel
+		self.action_name = action_name
+		self.recorder = channel.item.scene.recorder
+		self.channel_key = (channel.item.name, channel.name, action_name)
+
+	def Interpolation(self):
+		return self.recorder.interpolations.get(self.channel_key, 0)
+
+	def SetInterpolation(self, interpolation):
+		self.recorder.interpolations[self.channel_key] = interpolation
+
+	def Enumerator(self):
+		self.key_index = 0
+		return self
+
+	def _keys(self):
+		return self.recorder.keys.get(self.channel_key, [])
+
+	#the state of the key the keyframe is on (set_state to change it)
+	def _state(self, name, default=0, set_state=None):
+		key_states = self.recorder.key_states.setdefault(self.channel_key, {}).setdefault(self.GetTime(), {})
+		if set_state != None:
+			key_states[name] = set_state
+		return key_states.get(name, default)
+
+	def First(self):
+		self.key_index = 0
+		if len(self._keys()) == 0:
+			raise LookupError('no keys')
+
+	def Next(self):
+		self.key_index += 1
+		if self.key_index >= len(self._keys()):
+			raise LookupError('no more keys')
+
+	def GetTime(self):
+		return self._keys()[self.key_index][0]
+
+	def GetValueF(self, side):
+		if side == SIDE_OUT and self.GetBreaks() != 0:
+			return self._state('out value')
+		return self._keys()[self.key_index][1]
+
+	def SetValueF(self, value, side):
+		self._state('out value', set_state=value)
+
+	def GetInterp(self):
+		return self._state('interpolation')
+
+	def SetInterp(self, interpolation):
+		self._state('interpolation', set_state=interpolation)
+
+	def GetBreaks(self):
+		return self._state('breaks')
+
+	def SetBreak(self, breaks):
+		self._state('breaks', set_state=breaks)
+
+	def GetSlope(self, side):
+		return self._state(('slope', side), 0.0)
+
+	def SetSlope(self, slope, side):
+		self._state(('slope', side), set_state=slope)
+
+	def GetWeight(self, side):
+		return self._state(('weight', side), 0.0)
+
+	def SetWeight(self, weight, reset, side):
+		self._state(('weight', side), set_state=weight)
+
+	def GetSlopeType(self, side):
+		return self._state(('slope type', side)), 0
+
+	def SetSlopeType(self, slope_type, side):
+		self._state(('slope type', side), set_state=slope_type)
+
+	#the keyframe is left on the key added
+	def AddF(self, key_time, key_value):
+		self.recorder.add_key(self.channel, key_time, key_value, self.action_name)
+		self.key_index = len(self._keys()) - 1
+
+	def Clear(self):
+		self.recorder.keys.pop(self.channel_key, None)
+		self.recorder.key_states.pop(self.channel_key, None)
+		self.recorder.interpolations.pop(self.channel_key, None)
+
+#######################################################################
+# ChannelWrite (and ChannelRead) of an action layer
+# (a channel is animated once it has keys)
+#######################################################################
+class FakeChannelWrite(object):
+	def __init__(self, action_name):
+		self.action_name = action_name if action_name != ACTION_LAYER_EDIT else None
+
+	def Envelope(self, item, index):
+		return FakeEnvelope(item._channels[index], self.action_name)
+
+	def Double(self, item, index, value):
+		item.scene.recorder.values[(item.name, item._channels[index].name)] = value
+
+	def IsAnimated(self, item, index):
+		return len(item.scene.recorder.keys.get((item.name, item._channels[index].name, self.action_name), [])) > 0
+
+class FakeLxScene(object):
+	def __init__(self, scene):
+		self.scene = scene
+
+	def Channels(self, action_name, time):
+		return FakeChannelWrite(action_name)
+
+#######################################################################
+# Attribute holder for the stand-in modules' namespaces
+#######################################################################
+class Namespace(object):
+	def __init__(self, **attributes):
+		self.__dict__.update(attributes)
+
+#the scene and user values the stand-in modules work on (see install)
+_installed = Namespace(scene=None, user_values={}, scripts_path='', script_args=[])
+
+def _lx_eval(command):
+	_installed.scene.recorder.commands.append(command)
+	if command.startswith('query platformservice alias'):
+		return _installed.scripts_path
+	if command.startswith('user.value applicator.') and command.endswith(' ?'):
+		return _installed.user_values[command.split()[1].split('.', 1)[1]]
+	return None
+
+class _Value(object):
+	def FrameToTime(self, frame):
+		return frame / float(_installed.scene.fps)
+
+class _Scheduler(object):
+	def AddTimer(self, visitor, milliseconds):
+		_installed.scene.recorder.timers.append(visitor)
+
+	def RemoveTimer(self, visitor):
+		if visitor in _installed.scene.recorder.timers:
+			_installed.scene.recorder.timers.remove(visitor)
+
+#######################################################################
+# Progress monitor (aborts at the recorder's abort_step)
+#######################################################################
+class FakeMonitor(object):
+	def init(self, total):
+		self.total = total
+
+	def step(self, count=1):
+		recorder = _installed.scene.recorder
+		recorder.monitor_steps += count
+		if recorder.abort_step != None and recorder.monitor_steps >= recorder.abort_step:
+			raise RuntimeError('bad result: ABORT')
+		return True
+
+def _alert(title, message, dtype='info'):
+	_installed.scene.recorder.alerts.append((title, message, dtype))
+
+def _yes_no(title, message):
+	_installed.scene.recorder.alerts.append((title, message, 'yesNo'))
+	return 'yes'
+
+#######################################################################
+# Installs the stand-in lx, lxifc and modo modules, working on the scene
+# user_values are the applicator.* user values (without the prefix),
+# scripts_path is the kit's Scripts folder and script_args the script's
+# arguments (lx.args)
+# (installing again switches the modules to the new scene)
+#######################################################################
+def install(scene, user_values=None, scripts_path='', script_args=()):
+	_installed.scene = scene
+	_installed.user_values = user_values if user_values != None else {}
+	_installed.scripts_path = scripts_path
+	_installed.script_args = list(script_args)
+
+	if getattr(sys.modules.get('lx'), 'eval', None) != _lx_eval:
+		lx = types.ModuleType('lx')
+		lx.eval = _lx_eval
+		lx.args = lambda: list(_installed.script_args)
+		lx.Monitor = FakeMonitor
+		lx.object = Namespace(Scene=FakeLxScene, ChannelWrite=lambda channel_write: channel_write, ChannelRead=lambda channel_read: channel_read,
+			Envelope=lambda envelope: envelope, Keyframe=lambda keyframe: keyframe)
+		lx.symbol = Namespace(s_ACTIONLAYER_EDIT=ACTION_LAYER_EDIT, iENVv_INTERP_LINEAR=1, iENVSIDE_IN=SIDE_IN, iENVSIDE_OUT=SIDE_OUT)
+		lx.service = Namespace(Value=_Value, Scheduler=_Scheduler)
+
+		lxifc = types.ModuleType('lxifc')
+		lxifc.Visitor = object
+
+		modo = types.ModuleType('modo')
+		modo.Scene = lambda: _installed.scene
+		modo.dialogs = Namespace(alert=_alert, yesNo=_yes_no)
+
+		sys.modules['lx'] = lx
+		sys.modules['lxifc'] = lxifc
+		sys.modules['modo'] = modo
+	return sys.modules['lx'], sys.modules['modo']
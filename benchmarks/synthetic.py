@@ -0,0 +1,150 @@
+# python
+#######################################################################
+# Applicator Kit for Modo: synthetic benchmark data
+# Writes Live Link Face and Face Cap style capture files and mapping files, and builds
+# fake rigs (see fake_modo) for them, scaled by take length, mapping
+# fan-out (targets per BlendShape) and rig size (meshes in the rig)
+#
+# © Copyright 2020 All Rights Reserved: Chameleon-Workshop.com
+#######################################################################
+import csv
+import numpy
+
+from applicator_core import DATA_ITEM_NAMES, DATA_MORPH_NAMES
+
+from fake_modo import FakeItem
+
+#Declare CONSTANTS (so to speak)
+SYNTHETIC_FPS = 60
+SYNTHETIC_START_HOUR = 10
+SYNTHETIC_ITEMS = {'HeadYaw': 'Head.Y', 'HeadPitch': 'Head.X', 'HeadRoll': 'Head.Z', 'LeftEyeYaw': 'LeftEye.Y', 'LeftEyePitch': 'LeftEye.X',
+	'LeftEyeRoll': 'LeftEye.Z', 'RightEyeYaw': 'RightEye.Y', 'RightEyePitch': 'RightEye.X', 'RightEyeRoll': 'RightEye.Z'}
+SYNTHETIC_CONTROLS = 'Controls'
+SYNTHETIC_FACE_CAP_BLENDSHAPES = 'bs'
+SYNTHETIC_FACE_CAP_ROTATIONS = ['HeadPitch', 'HeadYaw', 'HeadRoll', 'LeftEyePitch', 'LeftEyeYaw', 'RightEyePitch', 'RightEyeYaw']
+
+#######################################################################
+# Gets the timecodes (HH:MM:SS:FF.sss) of evenly spaced capture frames at fps
+#######################################################################
+def get_synthetic_timecodes(frame_count, fps=SYNTHETIC_FPS):
+	frames = numpy.arange(frame_count)
+	seconds = frames // fps + SYNTHETIC_START_HOUR * 3600
+	return ['%02d:%02d:%02d:%02d.000' % (second // 3600 % 24, second // 60 % 60, second % 60, frame % fps)
+		for second, frame in zip(seconds.tolist(), frames.tolist())]
+
+#######################################################################
+# Gets the values (DATA_MORPH_NAMES then DATA_ITEM_NAMES) of frame_count
+# synthetic frames at fps
+# The BlendShapes drift between 0 and 1 (with some jitter and the odd value
+# out of range) and the rotations swing within +/-0.6
+#######################################################################
+def get_synthetic_values(frame_count, seed=0, fps=SYNTHETIC_FPS):
+	random = numpy.random.RandomState(seed)
+	times = numpy.arange(frame_count)[:, None] / float(fps)
+	morph_count = len(DATA_MORPH_NAMES)
+	item_count = len(DATA_ITEM_NAMES)
+
+	morph_values = 0.5 + 0.55 * numpy.sin(times * random.uniform(0.2, 3.0, morph_count) + random.uniform(0, 6.3, morph_count))
+	morph_values += random.normal(0, 0.02, morph_values.shape)
+	item_values = 0.6 * numpy.sin(times * random.uniform(0.1, 1.0, item_count) + random.uniform(0, 6.3, item_count))
+	return numpy.hstack([morph_values, item_values])
+
+#######################################################################
+# Writes a synthetic Live Link Face capture file of frame_count frames
+# recorded at fps
+#######################################################################
+def write_synthetic_capture(capture_path, frame_count, seed=0, fps=SYNTHETIC_FPS):
+	values = get_synthetic_values(frame_count, seed, fps)
+	timecodes = get_synthetic_timecodes(frame_count, fps)
+	value_count = str(len(DATA_MORPH_NAMES) + len(DATA_ITEM_NAMES))
+	with open(capture_path, 'w') as capture_file:
+		capture_file.write(','.join(['Timecode', 'BlendShapeCount'] + DATA_MORPH_NAMES + DATA_ITEM_NAMES) + '\n')
+		for timecode, row in zip(timecodes, values.tolist()):
+			capture_file.write(timecode + ',' + value_count + ',' + ','.join('%.6f' % value for value in row) + '\n')
+	return capture_path
+
+#######################################################################
+# Writes a synthetic Face Cap capture file of frame_count frames
+# The same values as write_synthetic_capture, with the rotations in
+# degrees and the BlendShapes named the Face Cap way (eyeBlink_L)
+#######################################################################
+def write_synthetic_face_cap(capture_path, frame_count, seed=0):
+	values = get_synthetic_values(frame_count, seed)
+	morph_count = len(DATA_MORPH_NAMES)
+	item_values = dict(zip(DATA_ITEM_NAMES, values[:, morph_count:].T * 90))
+	#head rotation x, y, z, left eye x, y, right eye x, y
+	rotations = numpy.column_stack([item_values[name] for name in SYNTHETIC_FACE_CAP_ROTATIONS])
+	face_cap_names = [name[:-4] + '_L' if name.endswith('Left') else name[:-5] + '_R' if name.endswith('Right') else name for name in DATA_MORPH_NAMES]
+
+	with open(capture_path, 'w') as capture_file:
+		capture_file.write('info,version,1.0\n')
+		capture_file.write(','.join([SYNTHETIC_FACE_CAP_BLENDSHAPES] + face_cap_names) + '\n')
+		for frame, (rotation_row, morph_row) in enumerate(zip(rotations.tolist(), values[:, :morph_count].tolist())):
+			capture_file.write('k,' + str(int(frame * 1000 / SYNTHETIC_FPS)) + ',0.0,0.0,0.0,' + ','.join('%.4f' % value for value in rotation_row) + ','
+				+ ','.join('%.6f' % value for value in morph_row) + '\n')
+	return capture_path
+
+#######################################################################
+# Gets the target names of a BlendShape (fanout targets)
+#######################################################################
+def get_synthetic_targets(morph_name, fanout):
+	if fanout <= 1:
+		return [morph_name]
+	return [morph_name + '_' + str(index) for index in range(fanout)]
+
+#######################################################################
+# Writes a synthetic mapping file
+# Every BlendShape targets fanout morphs (or Controls channels), with a
+# spread of multipliers (or the multiplier given for every row), value
+# shifts and smoothing, and the head and eyes are mapped to the Head,
+# LeftEye and RightEye items
+#######################################################################
+def write_synthetic_mapping(mapping_path, fanout=1, channel_targets=False, smooth=True, tolerance=0.0, multiplier=None):
+	#every other row is smoothed, with the 7 frame average (True) or the named filter (e.g. gauss:9)
+	smooth = 'Y' if smooth == True else 'N' if smooth in (False, None) else smooth
+	with open(mapping_path, 'w') as mapping_file:
+		csv_writer = csv.writer(mapping_file, lineterminator='\n')
+		csv_writer.writerow(['Type', 'Name', 'Target', 'Enabled', 'Multiplier', 'ValueShift', 'Smooth', 'Tolerance'])
+		for index, morph_name in enumerate(DATA_MORPH_NAMES):
+			targets = get_synthetic_targets(morph_name, fanout)
+			if channel_targets == True:
+				targets = [SYNTHETIC_CONTROLS + '.' + target for target in targets]
+			csv_writer.writerow(['BlendShape', morph_name, '|'.join(targets), 'Y', multiplier if multiplier != None else 1.0 + (index % 3) * 0.25, (index % 4 - 1) * 0.05,
+				smooth if index % 2 == 0 else 'N', tolerance])
+		for index, (item_name, target) in enumerate(sorted(SYNTHETIC_ITEMS.items())):
+			csv_writer.writerow(['Item', item_name, target, 'Y', multiplier if multiplier != None else 1.0 + (index % 2) * 0.5, (index % 3 - 1) * 0.1,
+				smooth if index % 2 == 1 else 'N', tolerance])
+	return mapping_path
+
+#######################################################################
+# Builds a synthetic rig in the fake scene
+# rig_size meshes under a Rig locator share the target morphs between
+# them (each mesh also has an unmapped morph and decoys unmapped child
+# locators, as real rigs do), plus the Head and eye locators and a
+# Controls locator with a user channel per target (every other one an
+# angle channel). Everything is also added to an actor.
+# Returns the Rig locator and the actor
+#######################################################################
+def build_synthetic_rig(scene, fanout=1, rig_size=1, decoys=4, actor_name='Face'):
+	actor = scene.add_actor(actor_name)
+	rig = FakeItem(scene, 'Rig', 'locator')
+	targets = [target for morph_name in DATA_MORPH_NAMES for target in get_synthetic_targets(morph_name, fanout)]
+
+	meshes = []
+	for mesh_index in range(max(rig_size, 1)):
+		mesh = rig.add_child(FakeItem(scene, 'FaceMesh' + str(mesh_index), 'mesh'))
+		for decoy_index in range(decoys):
+			mesh.add_child(FakeItem(scene, 'Decoy' + str(mesh_index) + '_' + str(decoy_index), 'locator'))
+		mesh.deformers.append(FakeItem(scene, 'Unmapped' + str(mesh_index), 'morphDeform'))
+		meshes.append(mesh)
+	for target_index, target in enumerate(targets):
+		meshes[target_index % len(meshes)].deformers.append(FakeItem(scene, target, 'morphDeform'))
+
+	head = rig.add_child(FakeItem(scene, 'Head', 'locator'))
+	head.add_child(FakeItem(scene, 'LeftEye', 'locator'))
+	head.add_child(FakeItem(scene, 'RightEye', 'locator'))
+	rig.add_child(FakeItem(scene, SYNTHETIC_CONTROLS, 'locator',
+		dict((target, 'angle' if index % 2 == 1 else 'float') for index, target in enumerate(targets))))
+
+	actor.addItems([item for item in scene.items if item.type != 'actor'])
+	return rig, actor